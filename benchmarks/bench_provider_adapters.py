@@ -0,0 +1,101 @@
+"""
+Provider adapter benchmark for Orchesity IDE OSS
+Compares the pooled keep-alive adapter against a fresh client per call,
+using the local mock provider server over real sockets.
+
+Usage:
+    python -m benchmarks.bench_provider_adapters --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+
+import httpx
+import uvicorn
+
+from src.core.config import Settings
+from src.models import OrchestrationRequest, LLMProvider
+from src.services.providers import ProviderAdapterRegistry
+from src.services.providers.mock_server import create_mock_app, mock_base_urls
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run(label: str, call, total: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{label:<22} {total / elapsed:8.1f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:6.2f}ms  "
+        f"p95={latencies[int(len(latencies) * 0.95)] * 1000:6.2f}ms"
+    )
+
+
+async def main(total: int, concurrency: int, latency: float) -> None:
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_mock_app(latency=latency),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    settings = Settings(
+        openai_api_key="bench",
+        provider_base_urls=mock_base_urls(f"http://127.0.0.1:{port}"),
+        max_concurrent_requests=concurrency,
+    )
+    request = OrchestrationRequest(prompt="benchmark", providers=[LLMProvider.OPENAI])
+
+    registry = ProviderAdapterRegistry(settings)
+    adapter = registry.get(LLMProvider.OPENAI)
+    path, payload, headers = adapter.build_request(request, adapter.default_model)
+
+    async def unpooled() -> None:
+        async with httpx.AsyncClient(base_url=adapter.base_url) as client:
+            response = await client.post(path, json=payload, headers=headers)
+            response.raise_for_status()
+
+    async def pooled() -> None:
+        await adapter.complete(request)
+
+    print(f"{total} requests, concurrency {concurrency}, mock latency {latency}s")
+    await _run("new client per call", unpooled, total, concurrency)
+    await _run("pooled adapter", pooled, total, concurrency)
+
+    await registry.aclose()
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
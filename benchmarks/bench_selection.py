@@ -0,0 +1,110 @@
+"""
+Provider selection benchmark for Orchesity IDE OSS
+Compares per-object scoring (`choose_provider`, scalar strategies) with the
+vectorized columnar store at growing provider/model catalog sizes, and
+weighted random draws with `random.choices` against the alias table.
+
+Usage:
+    python -m benchmarks.bench_selection --sizes 4 50 500 --rounds 2000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from src.core.config import Settings  # noqa: F401  (resolves import order)
+from src.models import LLMProvider
+from src.services import dwa_strategies
+from src.services.DWA import (
+    AliasTable,
+    ProviderMetrics,
+    SelectionPolicy,
+    choose_provider,
+)
+from src.services.columnar import ColumnarMetrics
+
+
+def _catalog(size: int, rng: random.Random) -> List[ProviderMetrics]:
+    providers = list(LLMProvider)
+    catalog = []
+    for i in range(size):
+        endpoint = ProviderMetrics(
+            name=f"endpoint-{i}",
+            provider_type=providers[i % len(providers)],
+            cost=rng.uniform(0.001, 0.05),
+            speed=rng.uniform(0.2, 4.0),
+            accuracy=rng.uniform(0.5, 1.0),
+            availability=rng.uniform(0.0, 1.0),
+            consecutive_failures=rng.choice([0, 0, 0, 1, 6]),
+            last_success_time=time.time() - rng.uniform(0, 7200),
+        )
+        catalog.append(endpoint)
+    return catalog
+
+
+def _time(call: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        call()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main(sizes: List[int], rounds: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"{'selection':<28} {'endpoints':>9} {'scalar':>10} {'vectorized':>11}")
+    for size in sizes:
+        catalog = _catalog(size, rng)
+        store = ColumnarMetrics()
+        for endpoint in catalog:
+            store.upsert(endpoint)
+
+        def active() -> List[ProviderMetrics]:
+            return [p for p in catalog if p.availability > 0.1]
+
+        for policy in list(SelectionPolicy)[:4]:
+            scalar = _time(lambda: choose_provider(active(), policy), rounds)
+            vectorized = _time(
+                lambda: store.top_k(store.policy_scores(policy.value), 1), rounds
+            )
+            _report(policy.value, size, scalar, vectorized)
+
+        for name in ("balanced_strategy", "reliability_first_strategy"):
+            strategy = getattr(dwa_strategies, name)
+            scalar = _time(lambda: max(active(), key=strategy), rounds)
+            vectorized = _time(
+                lambda: store.top_k(store.strategy_scores(name), 1), rounds
+            )
+            _report(name, size, scalar, vectorized)
+
+        weights = {"cost": 1.0, "speed": 1.0, "accuracy": 2.0}
+        vectorized = _time(
+            lambda: store.top_k(store.weighted_scores(weights), 3), rounds
+        )
+        print(f"{'weights (top 3)':<28} {size:>9} {'-':>10} {vectorized:>9.1f}us")
+
+        names = [endpoint.name for endpoint in catalog]
+        weights = [max(w, 0.0) for w in store.policy_scores("weighted_composite")]
+        table = AliasTable(dict(zip(names, weights)))
+        scalar = _time(lambda: rng.choices(names, weights), rounds)
+        alias = _time(lambda: table.sample(rng), rounds)
+        print(
+            f"{'weighted random draw':<28} {size:>9} {scalar:>8.1f}us {alias:>9.1f}us "
+            f"({scalar / alias:.1f}x, alias table)"
+        )
+
+
+def _report(label: str, size: int, scalar: float, vectorized: float) -> None:
+    print(
+        f"{label:<28} {size:>9} {scalar:>8.1f}us {vectorized:>9.1f}us "
+        f"({scalar / vectorized:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 50, 500])
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.sizes, args.rounds, args.seed)
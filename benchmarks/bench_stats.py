@@ -0,0 +1,79 @@
+"""
+Streaming statistics benchmark for Orchesity IDE OSS
+Measures the per-update cost of the DWA metric estimators against the
+list-based moving average they replace, and the accuracy of the P²
+latency quantiles against exact ones.
+
+Usage:
+    python -m benchmarks.bench_stats --updates 200000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from src.core.config import Settings  # noqa: F401  (resolves import order)
+from src.models import LLMProvider
+from src.services.DWA import DynamicWeightAlgorithm
+from src.services.stats import DecayedAverage, Ewma, LatencyStats, P2Quantile
+
+
+def _moving_average(window: int) -> Callable[[float], float]:
+    """The previous DWA update: append, pop(0) and re-sum the window"""
+    history: List[float] = []
+
+    def update(value: float) -> float:
+        history.append(value)
+        if len(history) > window:
+            history.pop(0)
+        return sum(history) / len(history)
+
+    return update
+
+
+def _measure(label: str, update: Callable[[float], object], samples: List[float]):
+    start = time.perf_counter()
+    for value in samples:
+        update(value)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / len(samples) * 1e9:9.1f} ns/update")
+
+
+def main(updates: int, seed: int) -> None:
+    rng = random.Random(seed)
+    samples = [rng.lognormvariate(0, 0.5) for _ in range(updates)]
+
+    print(f"Per-update cost over {updates} latency samples")
+    _measure("moving average (window 10)", _moving_average(10), samples)
+    _measure("moving average (window 1000)", _moving_average(1000), samples)
+    _measure("Ewma", Ewma(0.2).update, samples)
+    _measure("DecayedAverage", DecayedAverage(60.0).update, samples)
+    _measure("P2Quantile", P2Quantile(0.95).update, samples)
+    _measure("LatencyStats (p50, p95)", LatencyStats(0.2).update, samples)
+
+    dwa = DynamicWeightAlgorithm(providers=[LLMProvider.OPENAI])
+    _measure(
+        "DWA record_request_result",
+        lambda value: dwa.record_request_result("openai", True, value),
+        samples,
+    )
+
+    latency = dwa.provider_metrics["openai"].latency
+    exact = statistics.quantiles(samples, n=100)
+    print("\nQuantile accuracy (P² vs exact)")
+    for q, expected in [(0.5, exact[49]), (0.95, exact[94])]:
+        estimate = latency.quantile(q)
+        print(
+            f"p{int(q * 100):<3} exact={expected:.4f} estimate={estimate:.4f} "
+            f"error={abs(estimate - expected) / expected:.2%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.updates, args.seed)
@@ -0,0 +1,111 @@
+"""
+Selection policy simulation for Orchesity IDE OSS
+Replays simulated provider calls through the DWA under each selection
+policy and reports how traffic spreads and how regret grows.
+
+Each simulated provider succeeds with a fixed probability and answers with
+log-normal latency. A call's reward is `call_reward` (1 / (1 + latency)
+for a success, 0 for a failure); regret is the expected reward lost
+against always calling the best provider.
+
+Usage:
+    python -m benchmarks.simulate_bandits --rounds 5000
+"""
+
+import argparse
+import logging
+import math
+import random
+from typing import Dict, List, Tuple
+
+from src.core.config import Settings  # noqa: F401  (resolves import order)
+from src.models import LLMProvider
+from src.services.DWA import DynamicWeightAlgorithm, SelectionPolicy
+
+# provider -> (success probability, median latency in seconds)
+PROVIDERS: Dict[LLMProvider, Tuple[float, float]] = {
+    LLMProvider.OPENAI: (0.97, 0.8),
+    LLMProvider.ANTHROPIC: (0.98, 0.6),
+    LLMProvider.GEMINI: (0.90, 0.5),
+    LLMProvider.GROK: (0.85, 1.5),
+}
+LATENCY_SIGMA = 0.4
+
+POLICIES = [
+    SelectionPolicy.WEIGHTED_COMPOSITE,
+    SelectionPolicy.ROUND_ROBIN,
+    SelectionPolicy.WEIGHTED_RANDOM,
+    SelectionPolicy.THOMPSON_SAMPLING,
+    SelectionPolicy.UCB1,
+]
+
+
+def expected_reward(success: float, median: float, samples: int = 20000) -> float:
+    """E[success / (1 + latency)], estimated once per provider"""
+    rng = random.Random(0)
+    mu = math.log(median)
+    total = sum(1 / (1 + rng.lognormvariate(mu, LATENCY_SIGMA)) for _ in range(samples))
+    return success * total / samples
+
+
+def simulate(
+    policy: SelectionPolicy, rounds: int, seed: int, checkpoints: List[int]
+) -> Tuple[Dict[str, int], Dict[int, float]]:
+    rng = random.Random(seed)
+    dwa = DynamicWeightAlgorithm(
+        providers=list(PROVIDERS), selection_policy=policy, rng=random.Random(seed)
+    )
+    rewards = {p.value: expected_reward(*PROVIDERS[p]) for p in PROVIDERS}
+    best = max(rewards.values())
+
+    picks = {p.value: 0 for p in PROVIDERS}
+    regret, curve = 0.0, {}
+    for step in range(1, rounds + 1):
+        name = dwa.select_best_provider()
+        success_rate, median = PROVIDERS[LLMProvider(name)]
+        success = rng.random() < success_rate
+        latency = rng.lognormvariate(math.log(median), LATENCY_SIGMA)
+        dwa.record_request_result(name, success, latency)
+        # DWA drops providers at 10% availability or 5 failures in a row and
+        # leaves bringing them back to the circuit breakers; keep every
+        # provider selectable so the comparison is between the policies
+        metrics = dwa.provider_metrics[name]
+        metrics.availability = max(metrics.availability, 0.2)
+        metrics.consecutive_failures = min(metrics.consecutive_failures, 4)
+        dwa.metrics_changed(name)
+
+        picks[name] += 1
+        regret += best - rewards[name]
+        if step in checkpoints:
+            curve[step] = regret
+    return picks, curve
+
+
+def main(rounds: int, seed: int) -> None:
+    logging.getLogger("src").setLevel(logging.WARNING)
+    checkpoints = sorted({c for c in (100, 500, 1000, 5000, rounds) if c <= rounds})
+
+    print("Expected reward per call:")
+    for provider, (success, median) in PROVIDERS.items():
+        reward = expected_reward(success, median)
+        print(
+            f"  {provider.value:<10} success={success:.2f} "
+            f"median={median:.1f}s reward={reward:.3f}"
+        )
+
+    header = " ".join(f"{'@' + str(c):>8}" for c in checkpoints)
+    names = " ".join(f"{p.value:>9}" for p in PROVIDERS)
+    print(f"\n{'policy':<20} {names}   regret {header}")
+    for policy in POLICIES:
+        picks, curve = simulate(policy, rounds, seed, checkpoints)
+        shares = " ".join(f"{picks[p.value] / rounds:>9.1%}" for p in PROVIDERS)
+        regrets = " ".join(f"{curve[c]:>8.1f}" for c in checkpoints)
+        print(f"{policy.value:<20} {shares}          {regrets}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.rounds, args.seed)
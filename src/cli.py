@@ -4,6 +4,10 @@ Command-line interface for Orchesity IDE OSS
 """
 
 import argparse
+import asyncio
+import os
+import signal
+import socket
 import sys
 import uvicorn
 from pathlib import Path
@@ -15,6 +19,104 @@ sys.path.insert(0, str(project_root))
 from src.config import settings
 
 
+async def start_orchestrator(cli_settings):
+    """Initialize an in-process orchestrator with its cache and metrics"""
+    from src.services.cache import CacheService
+    from src.services.metrics import MetricsService
+    from src.services.llm_orchestrator import LLMOrchestratorService
+
+    cache = None
+    if not cli_settings.lightweight_mode:
+        cache = CacheService(cli_settings)
+        await cache.initialize()
+    metrics = MetricsService(cli_settings)
+    await metrics.initialize()
+    orchestrator = LLMOrchestratorService(cli_settings, cache, metrics)
+    await orchestrator.initialize()
+    return orchestrator
+
+
+async def stop_orchestrator(orchestrator):
+    """Shut down an orchestrator created by start_orchestrator"""
+    await orchestrator.shutdown()
+    await orchestrator.metrics.shutdown()
+    if orchestrator.cache:
+        await orchestrator.cache.shutdown()
+
+
+async def run_worker(concurrency=None, name=None):
+    """Consume queued async orchestrations until interrupted"""
+    from src.core.config import Settings
+    from src.services.jobs import create_job_store
+    from src.services.work_queue import RedisWorkQueue
+    from src.services.worker import OrchestrationWorker
+
+    worker_settings = Settings()
+    if worker_settings.job_backend != "redis":
+        print("⚠️  JOB_BACKEND is not 'redis': the API will not see job results")
+
+    orchestrator = await start_orchestrator(worker_settings)
+    jobs = create_job_store(worker_settings)
+    queue = RedisWorkQueue.from_settings(worker_settings)
+
+    worker = OrchestrationWorker(
+        orchestrator,
+        queue,
+        jobs,
+        consumer=name or f"{socket.gethostname()}-{os.getpid()}",
+        concurrency=concurrency or worker_settings.worker_concurrency,
+        max_deliveries=worker_settings.worker_max_deliveries,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"👷 Worker {worker.consumer} started (concurrency {worker.concurrency})")
+    try:
+        await worker.run(stop)
+    finally:
+        await queue.close()
+        await jobs.close()
+        await stop_orchestrator(orchestrator)
+    print(f"👋 Worker stopped after {worker.processed} jobs")
+
+
+async def run_batch(input_path, output_path, concurrency=None, retry_failed=False):
+    """Run a JSONL file of requests in-process, resuming from the output file"""
+    from src.core.config import Settings
+    from src.services.batch import BatchFileJob, BatchRunner
+
+    batch_settings = Settings()
+    orchestrator = await start_orchestrator(batch_settings)
+    runner = BatchRunner(
+        orchestrator,
+        max_concurrency=concurrency or batch_settings.batch_max_concurrency,
+        batch_size=batch_settings.batch_size,
+    )
+    job = BatchFileJob(runner, input_path, output_path, retry_failed=retry_failed)
+    try:
+        report = await job.run()
+    finally:
+        await stop_orchestrator(orchestrator)
+
+    def seconds(value):
+        return "n/a" if value is None else f"{value:.3f}s"
+
+    hit_rate = report["cache_hit_rate"]
+    print(
+        f"✅ Batch finished: {report['completed']} completed, {report['failed']} failed"
+    )
+    print(f"   Skipped (already done): {report['skipped']}")
+    print(f"   Duration: {report['duration']:.2f}s")
+    print(f"   Throughput: {report['throughput']:.2f} items/s")
+    print(f"   Latency p50: {seconds(report['latency_p50'])}")
+    print(f"   Latency p95: {seconds(report['latency_p95'])}")
+    print(f"   Cache hit rate: {'n/a' if hit_rate is None else f'{hit_rate:.1%}'}")
+    return report
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -24,6 +126,8 @@ def main():
 Examples:
   orchesity-cli serve          # Start the web server
   orchesity-cli serve --port 8080  # Start on custom port
+  orchesity-cli worker --concurrency 8  # Run a background job worker
+  orchesity-cli batch in.jsonl -o out.jsonl  # Run a JSONL file of requests
   orchesity-cli --help         # Show this help
         """,
     )
@@ -48,6 +152,43 @@ Examples:
         "--reload", action="store_true", help="Enable auto-reload for development"
     )
 
+    # Worker command
+    worker_parser = subparsers.add_parser(
+        "worker", help="Run a worker for queued async orchestrations"
+    )
+    worker_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Jobs to run at once (default: WORKER_CONCURRENCY)",
+    )
+    worker_parser.add_argument(
+        "--name", default=None, help="Consumer name (default: <hostname>-<pid>)"
+    )
+
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        "batch", help="Run a JSONL file of orchestration requests offline"
+    )
+    batch_parser.add_argument("input", help="JSONL file with one request per line")
+    batch_parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="JSONL file for results; rerunning resumes from it",
+    )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Items to run at once (default: BATCH_MAX_CONCURRENCY)",
+    )
+    batch_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Run items that failed in a previous run again",
+    )
+
     # Parse arguments
     args = parser.parse_args()
 
@@ -63,6 +204,18 @@ Examples:
             reload=args.reload,
             log_level="info",
         )
+    elif args.command == "worker":
+        asyncio.run(run_worker(args.concurrency, args.name))
+    elif args.command == "batch":
+        try:
+            asyncio.run(
+                run_batch(args.input, args.output, args.concurrency, args.retry_failed)
+            )
+        except KeyboardInterrupt:
+            print(
+                f"⏸️  Interrupted; rerun the same command to resume from {args.output}"
+            )
+            sys.exit(130)
     else:
         parser.print_help()
 
@@ -3,6 +3,14 @@ Core package for Orchesity IDE OSS
 Contains dependency injection, configuration, and base services
 """
 
-from .container import ServiceContainer, get_container, init_container, lifespan_context
-
 __all__ = ["ServiceContainer", "get_container", "init_container", "lifespan_context"]
+
+
+def __getattr__(name):
+    # The container imports the services, which import src.core.config, so it
+    # is loaded on first use: importing a service first must not cycle back here
+    if name in __all__:
+        from . import container
+
+        return getattr(container, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -14,6 +14,8 @@ from ..services.cache import CacheService
 from ..services.llm_orchestrator import LLMOrchestratorService
 from ..services.metrics import MetricsService
 from ..services.health import HealthService
+from ..services.jobs import JobStore, create_job_store
+from ..services.work_queue import RedisWorkQueue
 
 T = TypeVar("T")
 
@@ -28,6 +30,8 @@ class ServiceContainer:
     orchestrator: Optional[LLMOrchestratorService] = None
     metrics: Optional[MetricsService] = None
     health: Optional[HealthService] = None
+    jobs: Optional[JobStore] = None
+    work_queue: Optional[RedisWorkQueue] = None
 
     _services: Dict[str, Any] = None
 
@@ -67,6 +71,13 @@ class ServiceContainer:
             await self.orchestrator.initialize()
             logger.info("LLM orchestrator initialized")
 
+            # Initialize async job store
+            self.jobs = create_job_store(self.settings)
+            logger.info(f"Job store initialized ({self.settings.job_backend})")
+            if self.settings.job_queue_backend == "redis":
+                self.work_queue = RedisWorkQueue.from_settings(self.settings)
+                logger.info(f"Work queue initialized ({self.work_queue.stream})")
+
         except Exception as e:
             logger.error(f"Failed to initialize services: {e}")
             raise
@@ -80,6 +91,14 @@ class ServiceContainer:
                 await self.orchestrator.shutdown()
                 logger.info("LLM orchestrator shutdown")
 
+            if self.work_queue:
+                await self.work_queue.close()
+                logger.info("Work queue shutdown")
+
+            if self.jobs:
+                await self.jobs.close()
+                logger.info("Job store shutdown")
+
             if self.health:
                 await self.health.shutdown()
                 logger.info("Health service shutdown")
@@ -119,6 +138,9 @@ class ServiceContainer:
         elif service_type == HealthService and self.health:
             self._services[service_name] = self.health
             return self.health
+        elif service_type == JobStore and self.jobs:
+            self._services[service_name] = self.jobs
+            return self.jobs
         elif service_type == DatabaseConnection and self.database:
             self._services[service_name] = self.database
             return self.database
@@ -50,13 +50,21 @@ try:
     from src.services.health import HealthService
     from src.services.metrics import MetricsService
     from src.services.llm_orchestrator import LLMOrchestratorService
+    from src.services.jobs import create_job_store
+    from src.services.work_queue import RedisWorkQueue
 
     container.health = HealthService(settings)
     container.metrics = MetricsService(settings)
-    container.orchestrator = LLMOrchestratorService(settings, container.cache, container.metrics)
-    container._services['healthservice'] = container.health
-    container._services['metricsservice'] = container.metrics
-    container._services['llmorchestratorservice'] = container.orchestrator
+    container.orchestrator = LLMOrchestratorService(
+        settings, container.cache, container.metrics
+    )
+    container._services["healthservice"] = container.health
+    container._services["metricsservice"] = container.metrics
+    container._services["llmorchestratorservice"] = container.orchestrator
+    container.jobs = create_job_store(settings)
+    container._services["jobstore"] = container.jobs
+    if settings.job_queue_backend == "redis":
+        container.work_queue = RedisWorkQueue.from_settings(settings)
 except Exception as e:
     # If initialization fails, services will be None - tests should handle this
     pass
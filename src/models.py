@@ -2,8 +2,10 @@
 Pydantic models for Orchesity IDE OSS
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+import re
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
 
 
@@ -16,6 +18,119 @@ class LLMProvider(str, Enum):
     GROK = "grok"
 
 
+class OrchestrationMode(str, Enum):
+    """How results from multiple providers are gathered"""
+
+    ALL = "all"
+    FIRST = "first"
+    QUORUM = "quorum"
+    HEDGED = "hedged"
+    FALLBACK = "fallback"
+    CASCADE = "cascade"
+    CONSENSUS = "consensus"
+
+
+class RequestPriority(str, Enum):
+    """Scheduling class of a request; interactive work runs before batch work"""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+# Modes written as "<mode>:N"
+MODES_WITH_COUNT = {OrchestrationMode.QUORUM}
+# Modes written as "<mode>" or "<mode>:N"
+MODES_WITH_OPTIONAL_COUNT = {OrchestrationMode.CONSENSUS}
+
+
+# Bounds on user-supplied quality check patterns (run against model output)
+PATTERN_MAX_LENGTH = 200
+PATTERN_MAX_INPUT = 20_000
+
+
+def _repeats_quantified_group(pattern: str) -> bool:
+    """Whether a group with a quantifier or alternation inside is repeated
+
+    Shapes like `(a+)+` or `(a|ab)*` backtrack exponentially on input that
+    almost matches, so they are refused outright.
+    """
+    groups = []  # per open group: whether it contains a quantifier or `|`
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            # Skip the character class; `]` right after `[` or `[^` is literal
+            i += 2 if pattern[i + 1 : i + 2] == "^" else 1
+            i += 1 if pattern[i : i + 1] == "]" else 0
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif char == "(":
+            groups.append(False)
+        elif char == ")" and groups:
+            risky = groups.pop()
+            repeated = pattern[i + 1 : i + 2] in ("*", "+", "{")
+            if risky and repeated:
+                return True
+            if groups and (risky or repeated):
+                groups[-1] = True
+        elif groups and (char in "*+{|" or (char == "?" and pattern[i - 1] != "(")):
+            groups[-1] = True
+        i += 1
+    return False
+
+
+class QualityCheck(BaseModel):
+    """Local check an answer must pass before cascade mode accepts it"""
+
+    min_length: int = Field(1, ge=0, description="Minimum answer length")
+    max_length: Optional[int] = Field(None, ge=1, description="Maximum answer length")
+    require_json: bool = Field(False, description="Answer must be valid JSON")
+    pattern: Optional[str] = Field(
+        None,
+        max_length=PATTERN_MAX_LENGTH,
+        description="Regular expression the answer must match",
+    )
+
+    @field_validator("pattern")
+    @classmethod
+    def validate_pattern(cls, v):
+        """Reject patterns that do not compile or may backtrack exponentially"""
+        if v is not None:
+            try:
+                re.compile(v)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern: {e}")
+            if _repeats_quantified_group(v):
+                raise ValueError(
+                    "Invalid pattern: repeated groups may not contain "
+                    "quantifiers or alternation"
+                )
+        return v
+
+
+class SelectionWeights(BaseModel):
+    """Per-request weights for ranking providers, higher favours a metric
+
+    Cost and speed favour cheaper and faster providers; accuracy and
+    availability favour more accurate and more available ones.
+    """
+
+    cost: float = Field(0.0, ge=0, description="Weight of low cost")
+    speed: float = Field(0.0, ge=0, description="Weight of low latency")
+    accuracy: float = Field(0.0, ge=0, description="Weight of accuracy")
+    availability: float = Field(0.0, ge=0, description="Weight of availability")
+
+    @model_validator(mode="after")
+    def validate_any_weight(self):
+        """Reject weight vectors that would score every provider the same"""
+        if not any((self.cost, self.speed, self.accuracy, self.availability)):
+            raise ValueError("At least one selection weight must be positive")
+        return self
+
+
 class OrchestrationRequest(BaseModel):
     """Request model for LLM orchestration"""
 
@@ -24,11 +139,88 @@ class OrchestrationRequest(BaseModel):
         default_factory=lambda: [LLMProvider.OPENAI],
         description="List of LLM providers to use",
     )
+    model: Optional[str] = Field(
+        None, description="Model override (defaults to each provider's default)"
+    )
     max_tokens: Optional[int] = Field(1000, description="Maximum tokens to generate")
     temperature: Optional[float] = Field(
         0.7, description="Creativity temperature (0-1)"
     )
     stream: bool = Field(False, description="Whether to stream the response")
+    mode: str = Field(
+        OrchestrationMode.ALL.value,
+        description=(
+            "Orchestration mode: 'all', 'first', 'quorum:N', 'hedged', "
+            "'fallback', 'cascade' or 'consensus[:N]'"
+        ),
+    )
+    timeout: Optional[float] = Field(
+        None,
+        gt=0,
+        le=300,
+        description="End-to-end deadline in seconds (defaults to REQUEST_TIMEOUT)",
+    )
+    session_id: Optional[str] = Field(
+        None, description="Session or tenant the request is scheduled fairly under"
+    )
+    priority: RequestPriority = Field(
+        RequestPriority.INTERACTIVE,
+        description="Scheduling class: 'interactive' or 'batch'",
+    )
+    quality_check: Optional[QualityCheck] = Field(
+        None, description="Check for cascade mode answers (defaults to non-empty)"
+    )
+    selection_weights: Optional[SelectionWeights] = Field(
+        None, description="Rank providers by these weights instead of the policy"
+    )
+
+    @field_validator("mode")
+    @classmethod
+    def validate_mode(cls, v):
+        """Validate the orchestration mode and its optional ':N' argument"""
+        name, _, arg = v.partition(":")
+        try:
+            mode = OrchestrationMode(name)
+        except ValueError:
+            raise ValueError(f"Unknown orchestration mode: {name}")
+        if mode in MODES_WITH_COUNT or (mode in MODES_WITH_OPTIONAL_COUNT and arg):
+            if not arg.isdigit() or int(arg) < 1:
+                raise ValueError(
+                    f"Mode '{name}' requires a positive count, e.g. '{name}:2'"
+                )
+        elif arg:
+            raise ValueError(f"Mode '{name}' does not take an argument")
+        return v
+
+    @model_validator(mode="after")
+    def validate_quorum_size(self):
+        """Reject a quorum or consensus the requested providers can never reach"""
+        _, count = self.parse_mode()
+        providers = len(set(self.providers))
+        if count is not None and count > providers:
+            raise ValueError(
+                f"Mode '{self.mode}' needs at least {count} providers, "
+                f"got {providers}"
+            )
+        return self
+
+    def parse_mode(self) -> Tuple[OrchestrationMode, Optional[int]]:
+        """Split the mode into its name and optional integer argument"""
+        name, _, arg = self.mode.partition(":")
+        return OrchestrationMode(name), int(arg) if arg else None
+
+
+class BatchOrchestrationRequest(BaseModel):
+    """Request model for running many orchestrations in one call"""
+
+    items: List[OrchestrationRequest] = Field(
+        ..., min_length=1, description="Requests to orchestrate"
+    )
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Max items running at once (capped by BATCH_MAX_CONCURRENCY)",
+    )
 
 
 class OrchestrationResponse(BaseModel):
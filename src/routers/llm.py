@@ -2,17 +2,41 @@
 LLM orchestration router for Orchesity IDE OSS
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Optional, TypeVar
 import asyncio
-import time
+import json
 import logging
-from ..models import OrchestrationRequest, OrchestrationResponse, LLMResult, LLMProvider
+from ..models import (
+    BatchOrchestrationRequest,
+    OrchestrationRequest,
+    OrchestrationResponse,
+    OrchestrationMode,
+    LLMResult,
+    LLMProvider,
+)
 from ..core.container import ServiceContainer
 from ..services.llm_orchestrator import LLMOrchestratorService
+from ..services.admission import AdmissionRejected
+from ..services.deadline import DeadlineExceeded
+from ..services.batch import BatchRunner
+from ..services.jobs import JobStore, new_request_id
+from ..services.worker import run_orchestration_job
 
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Non-standard "client closed request" status, as logged by nginx
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its orchestration finished"""
+
 
 def create_router(container: ServiceContainer) -> APIRouter:
     """Create LLM router with dependency injection"""
@@ -22,6 +46,10 @@ def create_router(container: ServiceContainer) -> APIRouter:
         """Dependency injection for orchestrator service"""
         return container.get_service(LLMOrchestratorService)
 
+    def get_jobs() -> JobStore:
+        """Dependency injection for the async job store"""
+        return container.get_service(JobStore)
+
     def get_settings():
         """Get settings from container"""
         return container.settings
@@ -29,53 +57,147 @@ def create_router(container: ServiceContainer) -> APIRouter:
     @router.post("/orchestrate", response_model=OrchestrationResponse)
     async def orchestrate_llms(
         request: OrchestrationRequest,
+        http_request: Request,
         background_tasks: BackgroundTasks,
         orchestrator: LLMOrchestratorService = Depends(get_orchestrator),
+        jobs: JobStore = Depends(get_jobs),
     ):
         """Orchestrate requests across multiple LLM providers"""
         try:
             # Generate request ID
-            request_id = f"req_{int(time.time() * 1000)}"
+            request_id = new_request_id()
 
             logger.info(f"Starting orchestration request: {request_id}")
 
-            # Check if we should use async processing
-            use_async = len(request.providers) > 1 or request.stream
+            if request.stream:
+                # Provider selection happens before the first event, so its
+                # errors still map to regular HTTP error responses
+                events = orchestrator.orchestrate_stream(request)
+                first_event = await until_disconnected(http_request, events.__anext__())
+                return StreamingResponse(
+                    stream_sse(request_id, first_event, events),
+                    media_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Request-ID": request_id},
+                )
 
-            if use_async:
-                # Async processing for multiple providers or streaming
-                background_tasks.add_task(
-                    process_orchestration_async, request_id, request, orchestrator
+            if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+                # Progressive results: the first record is the fastest provider's
+                # answer, so waiting for it keeps errors as HTTP responses
+                records = orchestrator.orchestrate_progressive(request)
+                first_record = await until_disconnected(
+                    http_request, records.__anext__()
+                )
+                return StreamingResponse(
+                    stream_ndjson(request_id, first_record, records),
+                    media_type=NDJSON_MEDIA_TYPE,
+                    headers={"X-Request-ID": request_id},
                 )
 
+            # Check if we should use async processing; latency-oriented modes
+            # return as soon as their condition is met, so they stay synchronous
+            mode, _ = request.parse_mode()
+            use_async = mode == OrchestrationMode.ALL and len(request.providers) > 1
+
+            if use_async:
+                # Async processing for multiple providers; poll /status for results
+                job = await jobs.create(request_id)
+                if container.work_queue:
+                    # Run on a separate worker process (orchesity-cli worker)
+                    await container.work_queue.enqueue(request_id, request)
+                else:
+                    background_tasks.add_task(
+                        run_orchestration_job, request_id, request, orchestrator, jobs
+                    )
+
                 return OrchestrationResponse(
-                    request_id=request_id, status="processing", results=[], errors=[]
+                    request_id=request_id,
+                    status=job.status.value,
+                    results=[],
+                    errors=[],
                 )
             else:
                 # Sync processing for single provider
-                results, errors = await orchestrator.orchestrate(request)
+                results, errors = await until_disconnected(
+                    http_request, orchestrator.orchestrate(request)
+                )
 
                 return OrchestrationResponse(
                     request_id=request_id,
                     status="completed",
-                    results=results,
+                    results=[result.model_dump() for result in results],
                     errors=errors,
                 )
 
+        except ClientDisconnected:
+            # Nobody is left to read the response; the status is for access logs
+            logger.info(f"Client disconnected, orchestration cancelled: {request_id}")
+            if orchestrator.metrics:
+                orchestrator.metrics.increment_counter("client_disconnects")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        except AdmissionRejected as e:
+            logger.warning(f"Orchestration rejected: {e}")
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=str(e),
+                headers={"Retry-After": e.retry_after_header},
+            )
+        except DeadlineExceeded as e:
+            logger.warning(f"Orchestration timed out: {e}")
+            raise HTTPException(status_code=504, detail=str(e))
         except Exception as e:
             logger.error(f"Orchestration failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.post("/orchestrate/batch")
+    async def orchestrate_batch(
+        batch: BatchOrchestrationRequest,
+        orchestrator: LLMOrchestratorService = Depends(get_orchestrator),
+    ):
+        """Orchestrate many requests, streaming NDJSON results as items finish"""
+        settings = get_settings()
+        if len(batch.items) > settings.batch_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch exceeds {settings.batch_max_items} items",
+            )
+
+        request_id = new_request_id("batch")
+        logger.info(
+            f"Starting batch orchestration: {request_id} ({len(batch.items)} items)"
+        )
+        runner = BatchRunner(
+            orchestrator,
+            max_concurrency=min(
+                batch.max_concurrency or settings.batch_max_concurrency,
+                settings.batch_max_concurrency,
+            ),
+            batch_size=settings.batch_size,
+        )
+        return StreamingResponse(
+            stream_ndjson(request_id, None, runner.run(batch.items)),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"X-Request-ID": request_id},
+        )
+
     @router.get("/status/{request_id}")
-    async def get_orchestration_status(request_id: str):
+    async def get_orchestration_status(
+        request_id: str,
+        wait: float = Query(
+            0, ge=0, description="Seconds to wait for the job to finish (long-poll)"
+        ),
+        jobs: JobStore = Depends(get_jobs),
+    ):
         """Get the status of an async orchestration request"""
-        # TODO: Implement proper async request tracking
-        # For now, return a placeholder response
-        return {
-            "request_id": request_id,
-            "status": "completed",  # Placeholder
-            "message": "Async orchestration tracking not yet implemented",
-        }
+        if wait > 0:
+            job = await jobs.wait(request_id, min(wait, get_settings().job_max_wait))
+        else:
+            job = await jobs.get(request_id)
+
+        if job is None:
+            raise HTTPException(
+                status_code=404, detail=f"Unknown or expired request: {request_id}"
+            )
+        return job.model_dump(mode="json")
 
     @router.get("/providers")
     async def get_available_providers(
@@ -147,7 +269,6 @@ def create_router(container: ServiceContainer) -> APIRouter:
             test_request = OrchestrationRequest(
                 prompt="Hello, this is a test message. Please respond with 'Test successful'.",
                 providers=[provider_enum],
-                model="test-model",
                 max_tokens=50,
             )
 
@@ -204,20 +325,82 @@ def create_router(container: ServiceContainer) -> APIRouter:
     return router
 
 
-async def process_orchestration_async(
-    request_id: str, request: OrchestrationRequest, orchestrator: LLMOrchestratorService
-):
-    """Process orchestration request asynchronously"""
-    logger.info(f"Processing async orchestration: {request_id}")
+async def wait_for_disconnect(http_request: Request) -> None:
+    """Return once the client closes the connection
 
-    try:
-        results, errors = await orchestrator.orchestrate(request)
+    The request body has already been read, so the next ASGI message is
+    the disconnect; unlike polling `is_disconnected()` this costs nothing
+    while the client stays connected.
+    """
+    while True:
+        message = await http_request.receive()
+        if message["type"] == "http.disconnect":
+            return
 
-        # TODO: Store results in database/cache for retrieval via /status/{request_id}
-        # For now, just log the completion
-        logger.info(
-            f"Async orchestration completed: {request_id} - {len(results)} results, {len(errors)} errors"
-        )
 
+async def until_disconnected(http_request: Request, awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, cancelling it if the client disconnects first
+
+    Cancellation reaches every provider call the orchestration started, so
+    their admission, scheduler and load slots are released before this
+    raises `ClientDisconnected`.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.create_task(wait_for_disconnect(http_request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not task.done():
+            task.cancel()
+        watcher.cancel()
+        await asyncio.gather(task, watcher, return_exceptions=True)
+    if task.cancelled():
+        raise ClientDisconnected()
+    return task.result()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an orchestration event as a server-sent event"""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_sse(
+    request_id: str, first_event: Dict[str, Any], events: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """Forward orchestration events to the client as they arrive"""
+    yield format_sse({**first_event, "request_id": request_id})
+    try:
+        async for event in events:
+            yield format_sse(event)
+    except Exception as e:
+        logger.error(f"Streaming orchestration failed: {request_id} - {e}")
+        yield format_sse({"event": "error", "error": str(e)})
+    finally:
+        await events.aclose()
+
+
+def format_ndjson(request_id: str, record: Dict[str, Any]) -> str:
+    """Encode an orchestration record as one line of NDJSON"""
+    if record["type"] == "summary":
+        record = {"request_id": request_id, "status": "completed", **record}
+    return json.dumps(record) + "\n"
+
+
+async def stream_ndjson(
+    request_id: str,
+    first_record: Optional[Dict[str, Any]],
+    records: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[str]:
+    """Forward orchestration records to the client as they are produced"""
+    if first_record is not None:
+        yield format_ndjson(request_id, first_record)
+    try:
+        async for record in records:
+            yield format_ndjson(request_id, record)
     except Exception as e:
-        logger.error(f"Async orchestration failed: {request_id} - {e}")
+        logger.error(f"Progressive orchestration failed: {request_id} - {e}")
+        yield format_ndjson(
+            request_id, {"type": "summary", "status": "failed", "error": str(e)}
+        )
+    finally:
+        await records.aclose()
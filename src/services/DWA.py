@@ -4,27 +4,86 @@ DynamicWeightAlgorithm v2 (OSS Edition)
 A simplified provider weighting and orchestration engine.
 
 Features (OSS):
-- Simple moving average updates for metrics
+- Streaming metric updates (EMA, variance, latency quantiles)
 - Custom weighting strategy hook
+- Bandit selection policies (Thompson sampling, UCB1) and true round robin
+- Weighted random selection with an O(1) alias table
 - Batch requests
 - Basic semantic cache (exact match only)
 - Multi-LLM fallback
 - Error handling
 
-Note: Advanced features (EMA updates, adaptive drift tracing, auto-healing,
-bandit policies, semantic similarity search) are available in enterprise.
+Note: Advanced features (adaptive drift tracing, auto-healing,
+semantic similarity search) are available in enterprise.
 """
 
+import asyncio
+import math
 import random
 import time
-from typing import List, Dict, Any, Optional, Callable, Tuple, Generator
+from bisect import bisect_left, insort
+from collections import deque
+from typing import (
+    List,
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Tuple,
+    Generator,
+    Awaitable,
+    Deque,
+    Iterable,
+    Set,
+    Mapping,
+    TypeVar,
+    Union,
+)
 from dataclasses import dataclass, field
 from enum import Enum
 
 from ..models import LLMProvider
 from ..utils.logger import get_logger
+from .columnar import VECTORIZED_STRATEGIES, ColumnarMetrics
+from .stats import (
+    DEFAULT_QUANTILES,
+    DecayedAverage,
+    Ewma,
+    LatencyStats,
+    window_alpha,
+)
 
 logger = get_logger(__name__)
+T = TypeVar("T")
+
+# Metrics smooth over roughly this many recent samples
+HISTORY_SIZE = 10
+SMOOTHING = window_alpha(HISTORY_SIZE)
+# Availability weighs call outcomes by age, halving their weight this often
+AVAILABILITY_HALF_LIFE = 60.0
+
+
+def _recent_samples() -> Deque[float]:
+    return deque(maxlen=HISTORY_SIZE)
+
+
+def metric_stats(
+    latency_quantiles: Iterable[float] = DEFAULT_QUANTILES,
+) -> Dict[str, Union[Ewma, DecayedAverage]]:
+    """Streaming statistics for each synced metric
+
+    Availability is a time-decayed average: call outcomes count by their
+    age rather than by how many calls came after them, so a traffic burst
+    does not wash out what happened a moment ago.
+    """
+    return {
+        "cost": Ewma(SMOOTHING),
+        "speed": LatencyStats(
+            SMOOTHING, sorted(set(DEFAULT_QUANTILES) | set(latency_quantiles))
+        ),
+        "accuracy": Ewma(SMOOTHING),
+        "availability": DecayedAverage(AVAILABILITY_HALF_LIFE),
+    }
 
 
 @dataclass
@@ -39,17 +98,33 @@ class ProviderMetrics:
     availability: float = 1.0
     feedback: float = 0.0
 
-    # History tracking for moving averages
-    cost_history: List[float] = field(default_factory=list)
-    speed_history: List[float] = field(default_factory=list)
-    accuracy_history: List[float] = field(default_factory=list)
-    availability_history: List[float] = field(default_factory=list)
+    # Recent raw samples, for custom weighting strategies
+    cost_history: Deque[float] = field(default_factory=_recent_samples)
+    speed_history: Deque[float] = field(default_factory=_recent_samples)
+    accuracy_history: Deque[float] = field(default_factory=_recent_samples)
+    availability_history: Deque[float] = field(default_factory=_recent_samples)
+
+    # Streaming statistics behind cost, speed, accuracy and availability
+    stats: Dict[str, Union[Ewma, DecayedAverage]] = field(default_factory=metric_stats)
 
     # Failure tracking
     consecutive_failures: int = 0
     last_success_time: Optional[float] = None
     last_error: Optional[str] = None
 
+    # Temporarily unavailable (e.g. rate limited) until this timestamp
+    unavailable_until: Optional[float] = None
+
+    # Bandit statistics: calls, successful calls and summed call rewards
+    pulls: int = 0
+    successes: int = 0
+    reward_total: float = 0.0
+
+    @property
+    def latency(self) -> LatencyStats:
+        """Latency mean, variance and quantiles (p50/p95 and any configured)"""
+        return self.stats["speed"]
+
 
 class SelectionPolicy(str, Enum):
     """Provider selection policies"""
@@ -59,6 +134,56 @@ class SelectionPolicy(str, Enum):
     MIN_LATENCY = "min_latency"
     WEIGHTED_COMPOSITE = "weighted_composite"
     ROUND_ROBIN = "round_robin"
+    THOMPSON_SAMPLING = "thompson_sampling"
+    UCB1 = "ucb1"
+    WEIGHTED_RANDOM = "weighted_random"
+
+
+# Policies whose order only changes when metrics do
+RANKED_POLICIES = {
+    SelectionPolicy.MAX_ACCURACY,
+    SelectionPolicy.MIN_COST,
+    SelectionPolicy.MIN_LATENCY,
+    SelectionPolicy.WEIGHTED_COMPOSITE,
+}
+
+# Latencies below this are treated as this, so scores stay finite
+LATENCY_FLOOR = 0.01
+
+# Alias draws per requested provider before sampling the rest exactly
+SAMPLE_ATTEMPTS = 4
+
+
+# --- Bandit Scores ---
+def call_reward(success: bool, latency: float) -> float:
+    """Reward of one call in [0, 1]: fast successes score close to 1"""
+    return 1.0 / (1.0 + max(latency, 0.0)) if success else 0.0
+
+
+def thompson_score(provider: ProviderMetrics, rng=random) -> float:
+    """One posterior draw of success probability per second of latency
+
+    The success probability is drawn from Beta(1 + successes, 1 + failures).
+    The mean latency is drawn from a normal around the EWMA latency whose
+    spread narrows with the samples behind it (starting from one pseudo
+    sample of 1 s² variance), so rarely used providers keep getting tried.
+    """
+    success = rng.betavariate(
+        1 + provider.successes, 1 + provider.pulls - provider.successes
+    )
+    samples = min(provider.latency.count, HISTORY_SIZE)
+    spread = math.sqrt((provider.latency.variance + 1.0) / (samples + 1))
+    latency = rng.gauss(provider.speed, spread)
+    return success / max(latency, LATENCY_FLOOR)
+
+
+def ucb1_score(provider: ProviderMetrics, total_pulls: int) -> float:
+    """Mean call reward plus the UCB1 exploration bonus"""
+    if provider.pulls == 0:
+        return math.inf
+    return provider.reward_total / provider.pulls + math.sqrt(
+        2 * math.log(max(total_pulls, 1)) / provider.pulls
+    )
 
 
 # --- Provider Metrics Update (OSS Placeholder) ---
@@ -83,12 +208,23 @@ def update_metrics(
 
 
 # --- Simple Provider Selection ---
+def round_robin_order(items: List[T], index: int) -> List[T]:
+    """`items` rotated to start at turn `index`"""
+    if not items:
+        return items
+    start = index % len(items)
+    return items[start:] + items[:start]
+
+
 def choose_provider(
     providers: List[ProviderMetrics],
     policy: SelectionPolicy = SelectionPolicy.MAX_ACCURACY,
+    round_robin_index: int = 0,
 ) -> Tuple[Optional[str], Dict[str, float], Dict[str, Any]]:
     """
     Select provider based on specified policy.
+    Round robin picks the provider whose turn `round_robin_index` is, the
+    way `DynamicWeightAlgorithm` rotates with its own counter.
     Returns: (best_name, scores, policy_info)
     """
     if not providers:
@@ -117,8 +253,24 @@ def choose_provider(
 
         best = max(available_providers, key=composite_score)
         scores = {p.name: composite_score(p) for p in available_providers}
-    else:  # ROUND_ROBIN or fallback
-        best = random.choice(available_providers)
+    elif policy == SelectionPolicy.THOMPSON_SAMPLING:
+        scores = {p.name: thompson_score(p) for p in available_providers}
+        best = max(available_providers, key=lambda p: scores[p.name])
+    elif policy == SelectionPolicy.UCB1:
+        total_pulls = sum(p.pulls for p in available_providers)
+        scores = {p.name: ucb1_score(p, total_pulls) for p in available_providers}
+        best = max(available_providers, key=lambda p: scores[p.name])
+    elif policy == SelectionPolicy.WEIGHTED_RANDOM:
+        scores = {
+            p.name: -selection_key(p, SelectionPolicy.WEIGHTED_COMPOSITE)
+            for p in available_providers
+        }
+        weights = list(scores.values())
+        best = random.choices(
+            available_providers, weights=weights if sum(weights) > 0 else None
+        )[0]
+    else:  # ROUND_ROBIN
+        best = round_robin_order(available_providers, round_robin_index)[0]
         scores = {p.name: 1.0 for p in available_providers}
 
     policy_info = {
@@ -130,6 +282,151 @@ def choose_provider(
     return best.name, scores, policy_info
 
 
+# --- Ranked Provider Index ---
+def selection_key(provider: ProviderMetrics, policy: SelectionPolicy) -> float:
+    """Sort key of a provider under a policy, lower is better
+
+    Orders providers the same way `choose_provider` picks them.
+    """
+    if policy == SelectionPolicy.MAX_ACCURACY:
+        return -provider.accuracy
+    if policy == SelectionPolicy.MIN_COST:
+        return provider.cost or math.inf
+    if policy == SelectionPolicy.MIN_LATENCY:
+        return provider.speed
+    if policy == SelectionPolicy.WEIGHTED_COMPOSITE:
+        if provider.speed <= 0:
+            return 0.0
+        return -(provider.accuracy * provider.availability) / provider.speed
+    return 0.0
+
+
+class RankedProviderIndex:
+    """Active providers kept sorted by selection score
+
+    Entries are `(failing, key, position, name)`: providers with 5 or more
+    consecutive failures rank after healthy ones, ties go to the provider
+    registered first. Only providers marked as changed are re-scored, each
+    with a bisect into the sorted entries, so lookups no longer re-score
+    every provider. Providers excluded until `unavailable_until` re-enter
+    the index once that time has passed.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[bool, float, int, str]] = []
+        self.generation = -1  # DWA metrics generation the index reflects
+        self.revision = 0  # bumped whenever entries are re-scored
+        self._keys: Dict[str, Tuple[bool, float, int, str]] = {}
+        self._positions: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._cooling: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        """Re-score `name` on the next refresh"""
+        self._positions.setdefault(name, len(self._positions))
+        self._dirty.add(name)
+
+    def mark_all(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.mark(name)
+
+    def refresh(
+        self,
+        metrics: Dict[str, ProviderMetrics],
+        policy: SelectionPolicy,
+        generation: int,
+        now: float,
+    ) -> None:
+        """Re-score changed providers and those whose cooldown ended"""
+        for name, until in list(self._cooling.items()):
+            if until <= now:
+                self._dirty.add(name)
+        if generation == self.generation and not self._dirty:
+            return
+
+        for name in self._dirty:
+            old = self._keys.pop(name, None)
+            if old is not None:
+                del self.entries[bisect_left(self.entries, old)]
+            self._cooling.pop(name, None)
+
+            provider = metrics.get(name)
+            if provider is None or provider.availability <= 0.1:
+                continue
+            if provider.unavailable_until and provider.unavailable_until > now:
+                self._cooling[name] = provider.unavailable_until
+                continue
+            key = (
+                provider.consecutive_failures >= 5,
+                selection_key(provider, policy),
+                self._positions[name],
+                name,
+            )
+            insort(self.entries, key)
+            self._keys[name] = key
+
+        self._dirty.clear()
+        self.generation = generation
+        self.revision += 1
+
+    def top_k(self, k: int, exclude: Iterable[str] = ()) -> List[Tuple[bool, str]]:
+        """First `k` entries not in `exclude`, as `(failing, name)`"""
+        excluded = set(exclude)
+        top: List[Tuple[bool, str]] = []
+        for failing, _, _, name in self.entries:
+            if len(top) >= k:
+                break
+            if name not in excluded:
+                top.append((failing, name))
+        return top
+
+
+# --- Weighted Sampling ---
+class AliasTable:
+    """Walker's alias table: O(1) draws of names in proportion to weights
+
+    Built in O(n) (Vose's method). Each of the n columns holds a name, its
+    acceptance probability and an alias; a draw picks a column uniformly
+    and keeps its name or takes its alias. Negative and non-finite weights
+    count as 0; if no weight is positive every name is equally likely.
+    """
+
+    __slots__ = ("names", "weights", "_prob", "_alias")
+
+    def __init__(self, weights: Mapping[str, float]):
+        self.names = list(weights)
+        self.weights = {
+            name: weight if math.isfinite(weight) and weight > 0 else 0.0
+            for name, weight in weights.items()
+        }
+        n, total = len(self.names), sum(self.weights.values())
+        if total > 0:
+            scaled = [self.weights[name] * n / total for name in self.names]
+        else:
+            scaled = [1.0] * n
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Columns left in either list are full up to rounding and keep prob 1
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def sample(self, rng=random) -> str:
+        column = rng.randrange(len(self.names))
+        if rng.random() < self._prob[column]:
+            return self.names[column]
+        return self.names[self._alias[column]]
+
+
 # --- DynamicWeightAlgorithm OSS ---
 class DynamicWeightAlgorithm:
     """
@@ -137,11 +434,31 @@ class DynamicWeightAlgorithm:
     Integrates with Orchesity IDE OSS orchestration system
     """
 
-    def __init__(self, providers=None, selection_policy=SelectionPolicy.MAX_ACCURACY):
+    def __init__(
+        self,
+        providers=None,
+        selection_policy=SelectionPolicy.MAX_ACCURACY,
+        latency_quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        rng: Optional[random.Random] = None,
+        token_prices: Optional[Mapping[str, float]] = None,
+    ):
         self.provider_metrics: Dict[str, ProviderMetrics] = {}
+        self.latency_quantiles = tuple(latency_quantiles)
+        # Price per 1K tokens by provider; successful calls sync cost from it
+        self.token_prices: Dict[str, float] = dict(token_prices or {})
         self.custom_weighting_strategy: Optional[Callable] = None
-        self.selection_policy = selection_policy
         self.round_robin_index = 0
+        self._rng = rng or random.Random()
+        # Weighted random table and the (generation, index revision) it reflects
+        self._alias: Optional[AliasTable] = None
+        self._alias_version: Optional[Tuple[int, int]] = None
+
+        # Bumped on every metrics change; versions the ranked index
+        self.generation = 0
+        self._index = RankedProviderIndex()
+        # Vectorized copy of the metrics for weighted scoring
+        self.columns = ColumnarMetrics()
+        self.selection_policy = selection_policy
 
         # Initialize with provided providers
         if providers:
@@ -157,26 +474,44 @@ class DynamicWeightAlgorithm:
                 speed=1.0,  # Default starting speed
                 availability=1.0,
                 cost=0.01,  # Default cost per token
+                stats=metric_stats(self.latency_quantiles),
             )
+            self.metrics_changed(provider.value)
         logger.info(f"Initialized DWA with {len(self.provider_metrics)} providers")
 
-    # --- Metric Sync (simple moving average) ---
-    def _sync(self, provider: ProviderMetrics, attr: str, value: float, max_history=10):
-        """Sync metric using simple moving average"""
-        hist_attr = f"{attr}_history"
-        history = getattr(provider, hist_attr)
-        history.append(value)
+    @property
+    def selection_policy(self) -> SelectionPolicy:
+        return self._selection_policy
+
+    @selection_policy.setter
+    def selection_policy(self, policy: SelectionPolicy) -> None:
+        self._selection_policy = policy
+        self.generation += 1
+        self._index.mark_all(self.provider_metrics)
 
-        # Keep only recent history
-        if len(history) > max_history:
-            history.pop(0)
+    def metrics_changed(self, provider_name: str) -> None:
+        """Note that a provider's metrics changed so it is re-ranked
 
-        # Update metric with moving average
-        avg = sum(history) / len(history)
-        setattr(provider, attr, avg)
+        Called by every DWA update; call it after changing `ProviderMetrics`
+        fields directly.
+        """
+        self.generation += 1
+        self._index.mark(provider_name)
+        if provider_name in self.provider_metrics:
+            self.columns.upsert(self.provider_metrics[provider_name])
+
+    # --- Metric Sync (exponential moving average) ---
+    def _sync(self, provider: ProviderMetrics, attr: str, value: float):
+        """Sync metric in constant time using its streaming statistics"""
+        getattr(provider, f"{attr}_history").append(value)
+        stats = provider.stats[attr]
+        stats.update(value)
+        setattr(provider, attr, stats.mean)
+        self.metrics_changed(provider.name)
 
         logger.debug(
-            f"Updated {provider.name} {attr}: {avg:.3f} (from {len(history)} samples)"
+            f"Updated {provider.name} {attr}: {stats.mean:.3f} "
+            f"(from {stats.count} samples)"
         )
 
     def sync_cost(self, provider_name: str, new_cost: float):
@@ -218,6 +553,16 @@ class DynamicWeightAlgorithm:
         # Update availability
         self.sync_availability(provider_name, 1.0 if success else 0.0)
 
+        # Update cost from the call's token usage at the provider's price
+        price = self.token_prices.get(provider_name)
+        if success and tokens_used and price is not None:
+            self.sync_cost(provider_name, tokens_used * price / 1000)
+
+        # Update bandit statistics
+        provider.pulls += 1
+        provider.successes += int(success)
+        provider.reward_total += call_reward(success, response_time)
+
         # Update failure tracking
         if success:
             provider.consecutive_failures = 0
@@ -226,6 +571,7 @@ class DynamicWeightAlgorithm:
         else:
             provider.consecutive_failures += 1
             provider.last_error = error
+        self.metrics_changed(provider_name)
 
         logger.info(
             f"Recorded result for {provider_name}: success={success}, "
@@ -239,41 +585,205 @@ class DynamicWeightAlgorithm:
             return self.custom_weighting_strategy(self.provider_metrics[provider_name])
         return 1.0  # default equal weight
 
+    def get_weights(self) -> Dict[str, float]:
+        """Weights of every provider, vectorized for the built-in strategies"""
+        strategy = self.custom_weighting_strategy
+        name = getattr(strategy, "__name__", None)
+        if strategy and name in VECTORIZED_STRATEGIES:
+            weights = self.columns.strategy_scores(name)
+            return dict(zip(self.columns.names, weights.tolist()))
+        return {name: self.get_weight(name) for name in self.provider_metrics}
+
     def set_custom_weighting_strategy(
         self, strategy: Callable[[ProviderMetrics], float]
     ):
         """Set a custom weighting strategy function"""
         self.custom_weighting_strategy = strategy
+        self.generation += 1  # weighted random samples by the new weights
         logger.info("Custom weighting strategy applied")
 
     def update_weights(self, feedback=None):
         """Placeholder for adaptive logic (enterprise only)"""
         pass
 
+    def mark_unavailable(self, provider_name: str, until: float):
+        """Exclude a provider from selection until the given timestamp"""
+        if provider_name in self.provider_metrics:
+            self.provider_metrics[provider_name].unavailable_until = until
+            self.metrics_changed(provider_name)
+            logger.info(f"Provider {provider_name} unavailable until {until:.3f}")
+
     def get_active_providers(self) -> List[ProviderMetrics]:
         """Get list of active providers"""
-        return [p for p in self.provider_metrics.values() if p.availability > 0.1]
+        now = time.time()
+        return [
+            p
+            for p in self.provider_metrics.values()
+            if p.availability > 0.1
+            and (p.unavailable_until is None or p.unavailable_until <= now)
+        ]
+
+    def select_top_k(
+        self,
+        k: int,
+        exclude: Optional[Iterable[str]] = None,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> List[str]:
+        """The `k` best distinct active providers under the current policy
+
+        Reads the ranked index, re-scoring only providers whose metrics
+        changed since the last call. Healthy providers come before those
+        with 5 or more consecutive failures. With per-request `weights`
+        (over cost, speed, accuracy and availability) the providers are
+        scored by that weight vector instead, in one vectorized pass; weights
+        that are all zero fall back to the policy.
+        """
+        if weights and any(weight > 0 for weight in weights.values()):
+            scores = self.columns.weighted_scores(weights)
+            return self.columns.top_k(scores, k, exclude or ())
+
+        self._index.refresh(
+            self.provider_metrics, self.selection_policy, self.generation, time.time()
+        )
+        policy = self.selection_policy
+        if policy in RANKED_POLICIES:
+            return [name for _, name in self._index.top_k(k, exclude or ())]
+        if policy == SelectionPolicy.WEIGHTED_RANDOM:
+            picks = self._weighted_sample(k, exclude or ())
+            if len(picks) < k:
+                eligible = self._index.top_k(len(self._index.entries), exclude or ())
+                picks += [name for failing, name in eligible if failing]
+            return picks[:k]
+
+        # Other policies order the eligible providers per call; the index
+        # keeps them in registration order, healthy before failing
+        eligible = self._index.top_k(len(self._index.entries), exclude or ())
+        healthy = [name for failing, name in eligible if not failing]
+        failing = [name for failing, name in eligible if failing]
+        if policy == SelectionPolicy.ROUND_ROBIN:
+            healthy = round_robin_order(healthy, self.round_robin_index)
+            self.round_robin_index += 1
+        else:
+            healthy = self._bandit_order(healthy)
+            failing = self._bandit_order(failing)
+        return (healthy + failing)[:k]
+
+    def _weighted_sample(self, k: int, exclude: Iterable[str]) -> List[str]:
+        """Up to `k` distinct healthy providers drawn by sampling weight
+
+        Draws from the cached alias table and skips excluded or repeated
+        names; if those hold most of the weight, the remaining picks are
+        sampled exactly from the providers left.
+        """
+        table = self._alias_table()
+        excluded = set(exclude)
+        picks: List[str] = []
+        if not len(table):
+            return picks
+        for _ in range(SAMPLE_ATTEMPTS * k):
+            if len(picks) >= k:
+                return picks
+            name = table.sample(self._rng)
+            if name not in excluded and name not in picks:
+                picks.append(name)
+
+        remaining = {
+            name: weight
+            for name, weight in table.weights.items()
+            if name not in excluded and name not in picks
+        }
+        while remaining and len(picks) < k:
+            name = AliasTable(remaining).sample(self._rng)
+            picks.append(name)
+            del remaining[name]
+        return picks
+
+    def _alias_table(self) -> AliasTable:
+        """Alias table over the healthy providers, rebuilt when weights change
+
+        Weights come from the custom weighting strategy if one is set, else
+        the weighted composite score. Ranked index refreshes cover metric
+        updates and cooldowns ending; the generation covers strategy changes.
+        """
+        version = (self.generation, self._index.revision)
+        if self._alias is None or self._alias_version != version:
+            healthy = [
+                name
+                for failing, name in self._index.top_k(len(self._index.entries))
+                if not failing
+            ]
+            self._alias = AliasTable(self._sampling_weights(healthy))
+            self._alias_version = version
+        return self._alias
+
+    def _sampling_weights(self, names: List[str]) -> Dict[str, float]:
+        if self.custom_weighting_strategy:
+            weights = self.get_weights()
+            return {name: weights[name] for name in names}
+        return {
+            name: -selection_key(
+                self.provider_metrics[name], SelectionPolicy.WEIGHTED_COMPOSITE
+            )
+            for name in names
+        }
+
+    def _bandit_order(self, names: List[str]) -> List[str]:
+        """Providers by descending bandit score, ties in registration order"""
+        providers = [self.provider_metrics[name] for name in names]
+        if self.selection_policy == SelectionPolicy.THOMPSON_SAMPLING:
+            scores = [thompson_score(p, self._rng) for p in providers]
+        else:
+            total_pulls = sum(p.pulls for p in providers)
+            scores = [ucb1_score(p, total_pulls) for p in providers]
+        order = sorted(range(len(names)), key=lambda i: -scores[i])
+        return [names[i] for i in order]
 
     def select_best_provider(self, exclude_providers=None) -> Optional[str]:
         """Select the best provider based on current policy"""
-        available_providers = self.get_active_providers()
-
-        if exclude_providers:
-            available_providers = [
-                p for p in available_providers if p.name not in exclude_providers
-            ]
-
-        if not available_providers:
+        top = self.select_top_k(1, exclude=exclude_providers)
+        if not top:
             return None
 
-        best_name, scores, policy_info = choose_provider(
-            available_providers, self.selection_policy
+        logger.info(
+            f"Selected provider: {top[0]} using {self.selection_policy.value} policy"
         )
+        return top[0]
 
-        logger.info(
-            f"Selected provider: {best_name} using {policy_info.get('policy')} policy"
+    def rank_providers(
+        self,
+        provider_names: List[str],
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> List[str]:
+        """Order providers by the current policy (or `weights`), best first
+
+        Providers that are not active (unavailable or failing) go last, in
+        the order given.
+        """
+        requested = set(provider_names)
+        ranked = self.select_top_k(
+            len(provider_names),
+            exclude=[n for n in self.provider_metrics if n not in requested],
+            weights=weights,
         )
-        return best_name
+        ranked.extend(name for name in provider_names if name not in ranked)
+        return ranked
+
+    def rank_cheapest(self, provider_names: List[str]) -> List[str]:
+        """Order providers cheapest first, then fastest, inactive ones last
+
+        Cost is the average price of a call, synced from token usage for
+        providers with a `token_prices` entry. Unpriced providers keep the
+        default cost, so among them the order is by speed alone.
+        """
+        active = {p.name for p in self.get_active_providers()}
+
+        def cost_then_speed(name: str) -> Tuple[bool, float, float]:
+            metrics = self.provider_metrics.get(name)
+            if metrics is None:
+                return (True, float("inf"), float("inf"))
+            return (name not in active, metrics.cost, metrics.speed)
+
+        return sorted(provider_names, key=cost_then_speed)
 
     # --- OSS Additions ---
     def batch_requests(
@@ -337,6 +847,72 @@ class DynamicWeightAlgorithm:
             "attempted_providers": len(providers),
         }
 
+    async def multi_llm_fallback_async(
+        self,
+        providers: List[str],
+        call: Callable[[str], Awaitable[Any]],
+        hop_timeout: float,
+        timeout: float,
+        counts_as_failure: Optional[Callable[[Exception], bool]] = None,
+    ) -> Dict[str, Any]:
+        """Try providers in ranked order until one succeeds, without blocking
+
+        `call(provider_name)` performs the real provider call. Each hop is
+        cut off after `hop_timeout` seconds, and no hop starts or runs past
+        the overall `timeout`. Every attempt is recorded with
+        `record_request_result`, except errors `counts_as_failure` rejects
+        (such as the caller's own throttling), which are reported but leave
+        the provider's metrics alone.
+        """
+        expires_at = time.monotonic() + timeout
+        errors: List[Tuple[str, str]] = []
+        ranked = self.rank_providers(
+            [name for name in providers if name in self.provider_metrics]
+        )
+
+        for attempt, provider_name in enumerate(ranked, start=1):
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                errors.append((provider_name, "Deadline exceeded before attempt"))
+                break
+
+            hop_start = time.monotonic()
+            record = True
+            try:
+                result = await asyncio.wait_for(
+                    call(provider_name), timeout=min(hop_timeout, remaining)
+                )
+            except asyncio.TimeoutError:
+                error_msg = f"Timed out after {time.monotonic() - hop_start:.2f}s"
+            except Exception as e:
+                error_msg = str(e) or type(e).__name__
+                record = counts_as_failure is None or counts_as_failure(e)
+            else:
+                self.record_request_result(
+                    provider_name,
+                    True,
+                    time.monotonic() - hop_start,
+                    tokens_used=getattr(result, "tokens_used", None),
+                )
+                return {
+                    "provider": provider_name,
+                    "result": result,
+                    "errors": errors,
+                    "attempted_providers": attempt,
+                }
+
+            if record:
+                self.record_request_result(
+                    provider_name, False, time.monotonic() - hop_start, error_msg
+                )
+            errors.append((provider_name, error_msg))
+
+        return {
+            "error": "All providers failed",
+            "errors": errors,
+            "attempted_providers": len(errors),
+        }
+
     def _simulate_provider_call(
         self, provider_name: str, input_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -366,9 +942,12 @@ class DynamicWeightAlgorithm:
                 "speed": provider.speed,
                 "cost": provider.cost,
                 "availability": provider.availability,
+                "latency_p50": provider.latency.p50,
+                "latency_p95": provider.latency.p95,
                 "consecutive_failures": provider.consecutive_failures,
                 "last_success_time": provider.last_success_time,
                 "last_error": provider.last_error,
+                "unavailable_until": provider.unavailable_until,
                 "weight": self.get_weight(name),
             }
         return stats
@@ -380,6 +959,7 @@ class DynamicWeightAlgorithm:
             "active_providers": len(self.get_active_providers()),
             "selection_policy": self.selection_policy.value,
             "custom_strategy": self.custom_weighting_strategy is not None,
+            "generation": self.generation,
             "last_update": getattr(self, "_last_update", None),
         }
 
@@ -389,6 +969,7 @@ class DynamicWeightAlgorithm:
             provider = self.provider_metrics[provider_name]
             provider.consecutive_failures = 0
             provider.last_error = None
+            provider.unavailable_until = None
             provider.accuracy = 0.8
             provider.speed = 1.0
             provider.availability = 1.0
@@ -397,6 +978,11 @@ class DynamicWeightAlgorithm:
             provider.speed_history.clear()
             provider.accuracy_history.clear()
             provider.availability_history.clear()
+            provider.pulls = provider.successes = 0
+            provider.reward_total = 0.0
+            for stats in provider.stats.values():
+                stats.reset()
+            self.metrics_changed(provider_name)
             logger.info(f"Reset metrics for provider: {provider_name}")
 
 
@@ -0,0 +1,144 @@
+"""
+Admission control for Orchesity IDE OSS
+Bounds concurrent provider calls and queues excess work with backpressure
+"""
+
+import asyncio
+import math
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..models import LLMProvider
+from .metrics import MetricsService
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a provider call cannot be admitted"""
+
+    def __init__(
+        self,
+        provider: Optional[LLMProvider],
+        reason: str,
+        retry_after: float,
+        status_code: int = 429,
+    ):
+        target = provider.value if provider else "all providers"
+        super().__init__(f"{target}: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After header value in whole seconds"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    """Per-provider bounded concurrency with a bounded, time-limited wait queue
+
+    Each provider gets a semaphore sized from its `ProviderLoad.max_load`.
+    Callers beyond that limit wait in a queue of at most `max_queue_size`
+    entries for at most `max_queue_time` seconds; anything else is rejected
+    immediately so the API can answer 429/503 instead of piling up calls.
+    """
+
+    def __init__(
+        self,
+        loads: Dict[LLMProvider, Any],
+        max_queue_size: int,
+        max_queue_time: float,
+        metrics: Optional[MetricsService] = None,
+    ):
+        self.loads = loads
+        self.max_queue_size = max_queue_size
+        self.max_queue_time = max_queue_time
+        self.metrics = metrics
+        self._semaphores: Dict[LLMProvider, asyncio.Semaphore] = {
+            provider: asyncio.Semaphore(load.max_load)
+            for provider, load in loads.items()
+        }
+
+    def _estimate_retry_after(self, provider: LLMProvider) -> float:
+        """Rough time until a slot frees up, from queue depth and latency"""
+        load = self.loads[provider]
+        per_call = load.response_time or 1.0
+        return per_call * (load.queued + 1) / max(1, load.max_load)
+
+    @asynccontextmanager
+    async def admit(self, provider: LLMProvider) -> AsyncIterator[None]:
+        """Hold a concurrency slot for the provider for the duration of a call"""
+        load = self.loads[provider]
+        semaphore = self._semaphores[provider]
+
+        if semaphore.locked():
+            await self._wait_for_slot(provider, semaphore)
+        else:
+            # A free slot is taken without yielding to the event loop
+            await semaphore.acquire()
+
+        load.current_load += 1
+        self._publish(provider)
+        try:
+            yield
+        finally:
+            load.current_load -= 1
+            semaphore.release()
+            self._publish(provider)
+
+    async def _wait_for_slot(
+        self, provider: LLMProvider, semaphore: asyncio.Semaphore
+    ) -> None:
+        """Queue for a slot, rejecting when the queue is full or the wait too long"""
+        load = self.loads[provider]
+        if load.queued >= self.max_queue_size:
+            self._count("admission_rejected")
+            raise AdmissionRejected(
+                provider,
+                "admission queue is full",
+                self._estimate_retry_after(provider),
+                status_code=429,
+            )
+
+        load.queued += 1
+        self._publish(provider)
+        wait_start = time.time()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.max_queue_time)
+        except asyncio.TimeoutError:
+            self._count("admission_timeouts")
+            raise AdmissionRejected(
+                provider,
+                f"no capacity within {self.max_queue_time:.1f}s",
+                self._estimate_retry_after(provider),
+                status_code=503,
+            )
+        finally:
+            load.queued -= 1
+            self._publish(provider)
+
+        if self.metrics:
+            self.metrics.record_histogram(
+                "admission_wait_time", time.time() - wait_start
+            )
+
+    def _count(self, name: str) -> None:
+        if self.metrics:
+            self.metrics.increment_counter(name)
+
+    def _publish(self, provider: LLMProvider) -> None:
+        """Expose queue depth and in-flight calls as gauges"""
+        if self.metrics:
+            load = self.loads[provider]
+            self.metrics.set_gauge(
+                f"admission_queue_depth.{provider.value}", load.queued
+            )
+            self.metrics.set_gauge(
+                f"admission_in_flight.{provider.value}", load.current_load
+            )
@@ -0,0 +1,313 @@
+"""
+Batch orchestration for Orchesity IDE OSS
+Runs many orchestration requests under global and per-provider concurrency caps
+"""
+
+import asyncio
+import json
+import os
+import time
+import logging
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from ..models import OrchestrationRequest, LLMProvider, RequestPriority
+from .admission import AdmissionRejected
+from .deadline import DeadlineExceeded
+from .llm_orchestrator import LLMOrchestratorService
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRunner:
+    """Schedule a list of requests through the orchestrator
+
+    Items are grouped with `DynamicWeightAlgorithm.batch_requests` and
+    dispatched group by group. At most `max_concurrency` items run at once
+    overall, and each requested provider runs at most its `max_load` items
+    at once, so a large batch queues here instead of overflowing the
+    admission queues.
+    Records are yielded in completion order, keyed by item index.
+    """
+
+    def __init__(
+        self,
+        orchestrator: LLMOrchestratorService,
+        max_concurrency: int,
+        batch_size: int = 8,
+    ):
+        self.orchestrator = orchestrator
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_provider: Dict[LLMProvider, asyncio.Semaphore] = {
+            provider: asyncio.Semaphore(load.max_load)
+            for provider, load in orchestrator.providers_load.items()
+        }
+
+    def _groups(
+        self, items: List[Tuple[int, OrchestrationRequest]]
+    ) -> List[List[Tuple[int, OrchestrationRequest]]]:
+        dwa = self.orchestrator.dwa
+        if dwa:
+            return list(dwa.batch_requests(items, self.batch_size))
+        return [items]
+
+    async def run(
+        self, requests: List[OrchestrationRequest]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one `result` record per item as it completes, then a `summary`"""
+        start_time = time.time()
+        finished: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+        completed = failed = 0
+
+        async def dispatch() -> None:
+            for group in self._groups(list(enumerate(requests))):
+                for index, request in group:
+                    # Only create a task once it may run, so huge batches do
+                    # not materialize hundreds of waiting coroutines up front
+                    await self._global.acquire()
+                    task = asyncio.create_task(self._run_item(index, request))
+                    task.add_done_callback(lambda _: self._global.release())
+                    task.add_done_callback(finished.put_nowait)
+                    tasks.append(task)
+
+        dispatcher = asyncio.create_task(dispatch())
+        try:
+            for _ in range(len(requests)):
+                record = (await self._next_finished(finished, dispatcher)).result()
+                if record["status"] == "completed":
+                    completed += 1
+                else:
+                    failed += 1
+                yield record
+        finally:
+            dispatcher.cancel()
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(dispatcher, *pending, return_exceptions=True)
+
+        yield {
+            "type": "summary",
+            "items": len(requests),
+            "completed": completed,
+            "failed": failed,
+            "duration": time.time() - start_time,
+        }
+
+    @staticmethod
+    async def _next_finished(
+        finished: asyncio.Queue, dispatcher: asyncio.Task
+    ) -> asyncio.Task:
+        """The next finished item task, raising the dispatcher's error first"""
+        getter = asyncio.ensure_future(finished.get())
+        try:
+            if not dispatcher.done():
+                await asyncio.wait(
+                    {getter, dispatcher}, return_when=asyncio.FIRST_COMPLETED
+                )
+            if not getter.done() and dispatcher.done():
+                # No more items will be dispatched if this raises
+                dispatcher.result()
+            return await getter
+        finally:
+            getter.cancel()
+
+    async def _run_item(
+        self, index: int, request: OrchestrationRequest
+    ) -> Dict[str, Any]:
+        """Run one item under its providers' caps and describe the outcome"""
+        start_time = time.time()
+        if "priority" not in request.model_fields_set:
+            # Batch work yields to interactive requests unless told otherwise
+            request = request.model_copy(update={"priority": RequestPriority.BATCH})
+        try:
+            async with AsyncExitStack() as stack:
+                # Acquire in a fixed order so items sharing providers cannot deadlock
+                for provider in sorted(set(request.providers), key=lambda p: p.value):
+                    semaphore = self._per_provider.get(provider)
+                    if semaphore:
+                        await semaphore.acquire()
+                        stack.callback(semaphore.release)
+                results, errors = await self.orchestrator.orchestrate(request)
+        except (AdmissionRejected, DeadlineExceeded) as e:
+            status_code = getattr(e, "status_code", 504)
+            return self._failed(index, e, status_code, time.time() - start_time)
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {e}")
+            return self._failed(index, e, 500, time.time() - start_time)
+
+        if not results and errors:
+            # Every provider failed; a failed record keeps the item retryable
+            message = "all providers failed: " + "; ".join(
+                f"{error.get('provider')}: {error.get('error')}" for error in errors
+            )
+            record = self._failed(index, message, 502, time.time() - start_time)
+            record["errors"] = errors
+            return record
+
+        return {
+            "type": "result",
+            "index": index,
+            "status": "completed",
+            "results": [result.model_dump(mode="json") for result in results],
+            "errors": errors,
+            "duration": time.time() - start_time,
+        }
+
+    @staticmethod
+    def _failed(
+        index: int, error: Any, status_code: int, duration: float = 0.0
+    ) -> Dict[str, Any]:
+        return {
+            "type": "result",
+            "index": index,
+            "status": "failed",
+            "error": str(error),
+            "status_code": status_code,
+            "duration": duration,
+        }
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class BatchFileJob:
+    """Run a JSONL file of requests through a BatchRunner, resumably
+
+    Every non-empty input line is an orchestration request, optionally with
+    an `id` that is copied to its output record. Records are appended to the
+    output file and flushed as items finish, so the output doubles as the
+    checkpoint: a rerun skips items that already have a record and runs the
+    rest. Failed items are run again only with `retry_failed`.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        input_path: Path,
+        output_path: Path,
+        retry_failed: bool = False,
+    ):
+        self.runner = runner
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.retry_failed = retry_failed
+
+    def _restore_checkpoint(self) -> Set[int]:
+        """Indexes already finished; rewrites the output without stale records"""
+        if not self.output_path.exists():
+            return set()
+
+        kept: List[str] = []
+        with open(self.output_path, encoding="utf-8") as output:
+            for line in output:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short when the previous run was killed
+                    continue
+                if record.get("status") == "completed" or not self.retry_failed:
+                    kept.append(json.dumps(record))
+
+        partial = self.output_path.with_suffix(self.output_path.suffix + ".tmp")
+        with open(partial, "w", encoding="utf-8") as output:
+            output.writelines(f"{line}\n" for line in kept)
+        os.replace(partial, self.output_path)
+        return {json.loads(line)["index"] for line in kept}
+
+    def _read_input(
+        self, finished: Set[int]
+    ) -> Tuple[List[Tuple[int, Any, OrchestrationRequest]], List[Dict[str, Any]]]:
+        """Unfinished requests, plus failed records for unreadable lines"""
+        pending, invalid = [], []
+        with open(self.input_path, encoding="utf-8") as source:
+            for index, line in enumerate(source):
+                if not line.strip() or index in finished:
+                    continue
+                item_id = None
+                try:
+                    payload = json.loads(line)
+                    if not isinstance(payload, dict):
+                        raise ValueError("expected a JSON object")
+                    item_id = payload.pop("id", None)
+                    request = OrchestrationRequest.model_validate(payload)
+                except (ValueError, AttributeError) as e:
+                    record = BatchRunner._failed(index, e, 422)
+                    record["error"] = f"invalid request: {e}"
+                    if item_id is not None:
+                        record["id"] = item_id
+                    invalid.append(record)
+                    continue
+                pending.append((index, item_id, request))
+        return pending, invalid
+
+    def _cache_counters(self) -> Tuple[int, int]:
+        metrics = self.runner.orchestrator.metrics
+        if not metrics:
+            return 0, 0
+        hits = metrics.get_metric_summary("cache_hits") or {}
+        misses = metrics.get_metric_summary("cache_misses") or {}
+        return hits.get("value", 0), misses.get("value", 0)
+
+    async def run(self) -> Dict[str, Any]:
+        """Process every unfinished item and return the run's report"""
+        finished = self._restore_checkpoint()
+        pending, invalid = self._read_input(finished)
+        hits_before, misses_before = self._cache_counters()
+        start_time = time.time()
+        latencies: List[float] = []
+        completed = failed = 0
+
+        logger.info(
+            f"Batch file {self.input_path}: {len(pending)} items to run, "
+            f"{len(finished)} already finished"
+        )
+        with open(self.output_path, "a", encoding="utf-8") as output:
+
+            def write(record: Dict[str, Any]) -> None:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+            for record in invalid:
+                write(record)
+                failed += 1
+
+            requests = [request for _, _, request in pending]
+            async for record in self.runner.run(requests):
+                if record["type"] != "result":
+                    continue
+                index, item_id, _ = pending[record["index"]]
+                record["index"] = index
+                if item_id is not None:
+                    record["id"] = item_id
+                write(record)
+                latencies.append(record["duration"])
+                if record["status"] == "completed":
+                    completed += 1
+                else:
+                    failed += 1
+
+        duration = time.time() - start_time
+        hits_after, misses_after = self._cache_counters()
+        hits = hits_after - hits_before
+        lookups = hits + misses_after - misses_before
+        return {
+            "items": len(pending) + len(invalid),
+            "skipped": len(finished),
+            "completed": completed,
+            "failed": failed,
+            "duration": duration,
+            "throughput": (completed + failed) / duration if duration > 0 else 0.0,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "cache_hit_rate": hits / lookups if lookups else None,
+        }
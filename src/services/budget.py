@@ -0,0 +1,53 @@
+"""
+Ratio budgets for Orchesity IDE OSS
+Bounds extra work (hedges, retries) to a fraction of primary requests
+"""
+
+import threading
+from typing import Any, Dict
+
+
+class RatioBudget:
+    """Token budget that allows `ratio` extra calls per primary request
+
+    Every primary request deposits `ratio` tokens (capped at `burst`) and
+    every extra call spends one whole token, so over time extra calls stay
+    below `ratio` of the request volume while short bursts are absorbed.
+    The budget starts empty, so no extra calls are made before any requests.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._deposits = 0
+        self._spent = 0
+        self._denied = 0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Record a primary request"""
+        with self._lock:
+            self._deposits += 1
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Consume one token for an extra call if the budget allows it"""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._spent += 1
+                return True
+            self._denied += 1
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current budget state for stats endpoints"""
+        with self._lock:
+            return {
+                "ratio": self.ratio,
+                "tokens": round(self._tokens, 3),
+                "requests": self._deposits,
+                "spent": self._spent,
+                "denied": self._denied,
+            }
@@ -0,0 +1,34 @@
+"""
+Cascade quality checks for Orchesity IDE OSS
+Fast local validation deciding whether a cheap tier's answer is good enough
+"""
+
+import json
+import re
+from typing import Optional
+
+from ..models import PATTERN_MAX_INPUT, QualityCheck
+
+
+# A whole answer wrapped in one markdown code fence, e.g. ```json ... ```
+_CODE_FENCE = re.compile(r"^```[\w-]*\s*\n(.*?)\n?```$", re.DOTALL)
+
+
+def check_answer(text: str, check: QualityCheck) -> Optional[str]:
+    """Return why `text` fails the check, or None if it passes"""
+    answer = text.strip()
+    if len(answer) < max(check.min_length, 1):
+        return "answer is empty" if not answer else "answer is too short"
+    if check.max_length is not None and len(answer) > check.max_length:
+        return f"answer is longer than {check.max_length} characters"
+    if check.require_json:
+        fenced = _CODE_FENCE.match(answer)
+        try:
+            json.loads(fenced.group(1) if fenced else answer)
+        except ValueError:
+            return "answer is not valid JSON"
+    if check.pattern is not None:
+        # Only the start of the answer is searched, bounding the match time
+        if not re.search(check.pattern, answer[:PATTERN_MAX_INPUT]):
+            return "answer does not match the required pattern"
+    return None
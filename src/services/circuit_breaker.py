@@ -0,0 +1,216 @@
+"""
+Circuit breakers for Orchesity IDE OSS
+Per-provider closed/open/half-open state machine driven by failure rate
+"""
+
+import asyncio
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from ..models import LLMProvider
+from .admission import AdmissionRejected
+from .deadline import Deadline
+from .metrics import MetricsService
+from .providers import ProviderError
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(AdmissionRejected):
+    """Raised when a provider's circuit does not admit the call"""
+
+    def __init__(self, provider: LLMProvider, retry_after: float):
+        super().__init__(provider, "circuit open", retry_after, status_code=503)
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Whether an error says something about the provider's health
+
+    Client errors (bad request, auth) are the caller's fault and do not trip
+    the breaker; timeouts, throttling, 5xx and transport errors do.
+    """
+    if isinstance(error, ProviderError) and error.status_code is not None:
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    return True
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single provider
+
+    - closed: calls flow; outcomes within the last `window_seconds` are kept
+      and the circuit opens once at least `min_requests` were seen and the
+      failure rate reaches `failure_rate_threshold`
+    - open: calls are rejected for `open_seconds`
+    - half-open: up to `half_open_max_calls` trial calls are let through;
+      if they all succeed the circuit closes, any failure re-opens it
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        min_requests: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        metrics: Optional[MetricsService] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.metrics = metrics
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trials_succeeded = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving open to half-open once the cooldown elapsed"""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def allows_traffic(self) -> bool:
+        """Whether a new call would currently be admitted"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return self._trials_started < self.half_open_max_calls
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will admit trial calls again"""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def acquire(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        if not self.allows_traffic():
+            raise CircuitOpenError(self.provider, self.retry_after() or 1.0)
+        if self._state == CircuitState.HALF_OPEN:
+            self._trials_started += 1
+
+    def release(self) -> None:
+        """Give back a half-open trial slot for a call that never completed"""
+        if self._state == CircuitState.HALF_OPEN and self._trials_started > 0:
+            self._trials_started -= 1
+
+    def record_success(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._trials_succeeded += 1
+            if self._trials_succeeded >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+        self._record(False)
+        if self._state == CircuitState.CLOSED and self._should_trip():
+            self._transition(CircuitState.OPEN)
+
+    @asynccontextmanager
+    async def guard(self, deadline: Optional[Deadline] = None) -> AsyncIterator[None]:
+        """Wrap a provider call, recording its outcome on the breaker
+
+        A call cancelled because `deadline` ran out is a failure, like any
+        other timeout; other cancellations (client disconnect, a sibling
+        call winning) say nothing about the provider.
+        """
+        self.acquire()
+        try:
+            yield
+        except AdmissionRejected:
+            # The provider was never exercised
+            self.release()
+            raise
+        except asyncio.CancelledError:
+            if deadline is not None and deadline.expired:
+                self.record_failure()
+            else:
+                self.release()
+            raise
+        except Exception as e:
+            if counts_as_failure(e):
+                self.record_failure()
+            else:
+                self.release()
+            raise
+        else:
+            self.record_success()
+
+    def _record(self, success: bool) -> None:
+        now = self._clock()
+        self._outcomes.append((now, success))
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, success in self._outcomes if not success)
+        return failures / len(self._outcomes)
+
+    def _should_trip(self) -> bool:
+        return (
+            len(self._outcomes) >= self.min_requests
+            and self._failure_rate() >= self.failure_rate_threshold
+        )
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        self._trials_started = 0
+        self._trials_succeeded = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = self._clock()
+            self._times_opened += 1
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+
+        logger.warning(
+            f"Circuit for {self.provider.value}: {previous.value} -> {state.value}"
+        )
+        if self.metrics:
+            self.metrics.increment_counter(f"circuit_{state.value}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for stats endpoints"""
+        state = self.state
+        return {
+            "state": state.value,
+            "failure_rate": round(self._failure_rate(), 3),
+            "window_requests": len(self._outcomes),
+            "retry_after": round(self.retry_after(), 3),
+            "half_open_trials": self._trials_started,
+            "times_opened": self._times_opened,
+        }
@@ -0,0 +1,287 @@
+"""
+Columnar provider metrics for Orchesity IDE OSS
+NumPy columns of endpoint metrics, scored with vectorized policy expressions
+"""
+
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+
+COLUMNS = (
+    "cost",
+    "speed",
+    "accuracy",
+    "availability",
+    "failures",
+    "unavailable_until",
+    "last_success_time",
+    "accuracy_variance",
+    "accuracy_samples",
+    "speed_variance",
+    "speed_samples",
+    "pulls",
+    "successes",
+    "reward_total",
+)
+
+# Metrics a per-request weight vector may weigh
+WEIGHTED_METRICS = ("cost", "speed", "accuracy", "availability")
+
+# Mirrors DWA's HISTORY_SIZE and LATENCY_FLOOR for the bandit scores
+LATENCY_WINDOW = 10
+LATENCY_FLOOR = 0.01
+
+
+class ColumnarMetrics:
+    """Provider metrics stored as one NumPy array per metric
+
+    Rows are endpoint ids in registration order, so `argmax`-style ties go
+    to the endpoint registered first, like `choose_provider`. `upsert`
+    copies a `ProviderMetrics` into its row; the scoring methods evaluate
+    a policy, strategy or weight vector for every endpoint at once.
+    """
+
+    def __init__(self, capacity: int = 16, rng: Optional[np.random.Generator] = None):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._columns = {name: np.zeros(capacity) for name in COLUMNS}
+        self._rng = rng or np.random.default_rng(random.getrandbits(64))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][: len(self.names)]
+
+    def upsert(self, provider) -> int:
+        """Copy a provider's metrics into its row, registering it if new"""
+        row = self.ids.get(provider.name)
+        if row is None:
+            row = len(self.names)
+            if row == len(self._columns["cost"]):
+                for name, values in self._columns.items():
+                    self._columns[name] = np.concatenate([values, np.zeros(row)])
+            self.ids[provider.name] = row
+            self.names.append(provider.name)
+
+        columns = self._columns
+        columns["cost"][row] = provider.cost
+        columns["speed"][row] = provider.speed
+        columns["accuracy"][row] = provider.accuracy
+        columns["availability"][row] = provider.availability
+        columns["failures"][row] = provider.consecutive_failures
+        columns["unavailable_until"][row] = provider.unavailable_until or -np.inf
+        columns["last_success_time"][row] = (
+            np.nan if provider.last_success_time is None else provider.last_success_time
+        )
+        accuracy, latency = provider.stats["accuracy"], provider.latency
+        columns["accuracy_variance"][row] = accuracy.variance
+        columns["accuracy_samples"][row] = accuracy.count
+        columns["speed_variance"][row] = latency.variance
+        columns["speed_samples"][row] = latency.count
+        columns["pulls"][row] = provider.pulls
+        columns["successes"][row] = provider.successes
+        columns["reward_total"][row] = provider.reward_total
+        return row
+
+    def active_mask(self, now: Optional[float] = None) -> np.ndarray:
+        """Endpoints `get_active_providers` would return"""
+        now = time.time() if now is None else now
+        return (self.column("availability") > 0.1) & (
+            self.column("unavailable_until") <= now
+        )
+
+    def policy_scores(self, policy: str, strategy: Optional[str] = None) -> np.ndarray:
+        """Scores under a `SelectionPolicy`, higher is better
+
+        `weighted_random` samples by the `dwa_strategies` weights named by
+        `strategy`, like the DWA does with a custom weighting strategy set,
+        and by the composite score otherwise. Round robin rotates through
+        DWA state and has no vectorized form.
+        """
+        accuracy = self.column("accuracy")
+        cost, speed = self.column("cost"), self.column("speed")
+        if policy == "max_accuracy":
+            return accuracy.copy()
+        if policy == "min_cost":
+            return np.where(cost != 0, -cost, -np.inf)
+        if policy == "min_latency":
+            return -speed
+        if policy == "weighted_composite":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                composite = accuracy * self.column("availability") / speed
+            return np.where(speed > 0, composite, 0.0)
+        if policy == "thompson_sampling":
+            return self._thompson_scores()
+        if policy == "ucb1":
+            return self._ucb1_scores()
+        if policy == "weighted_random":
+            return self._weighted_random_scores(strategy)
+        raise ValueError(f"No vectorized form of policy: {policy}")
+
+    def _thompson_scores(self) -> np.ndarray:
+        """Vectorized `thompson_score` draws"""
+        pulls, successes = self.column("pulls"), self.column("successes")
+        success = self._rng.beta(1 + successes, 1 + pulls - successes)
+        samples = np.minimum(self.column("speed_samples"), LATENCY_WINDOW)
+        spread = np.sqrt((self.column("speed_variance") + 1.0) / (samples + 1))
+        latency = self._rng.normal(self.column("speed"), spread)
+        return success / np.maximum(latency, LATENCY_FLOOR)
+
+    def _weighted_random_scores(self, strategy: Optional[str] = None) -> np.ndarray:
+        """Efraimidis-Spirakis keys: `top_k` of them is a weighted sample
+
+        Taking the k largest `log(u) / weight` samples k endpoints without
+        replacement, in proportion to their weights.
+        """
+        if strategy:
+            weights = self.strategy_scores(strategy)
+        else:
+            weights = self.policy_scores("weighted_composite")
+        keys = np.log(self._rng.random(len(self.names)))
+        with np.errstate(divide="ignore"):
+            return np.where(weights > 0, keys / weights, -np.inf)
+
+    def _ucb1_scores(self) -> np.ndarray:
+        """Vectorized `ucb1_score`"""
+        pulls = self.column("pulls")
+        total = max(pulls.sum(), 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = self.column("reward_total") / pulls + np.sqrt(
+                2 * np.log(total) / pulls
+            )
+        return np.where(pulls > 0, scores, np.inf)
+
+    def weighted_scores(self, weights: Mapping[str, float]) -> np.ndarray:
+        """Weighted sum of metrics scaled to [0, 1], higher is better
+
+        Accuracy and availability are used as is; cost and speed score the
+        cheapest (fastest) endpoint 1 and the others by their ratio to it.
+        """
+        unknown = set(weights) - set(WEIGHTED_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown selection weights: {sorted(unknown)}")
+        scores = np.zeros(len(self.names))
+        for metric in ("accuracy", "availability"):
+            if weights.get(metric):
+                scores += weights[metric] * self.column(metric)
+        for metric in ("cost", "speed"):
+            if weights.get(metric):
+                scores += weights[metric] * _relative_to_best(self.column(metric))
+        return scores
+
+    def strategy_scores(self, strategy: str, now: Optional[float] = None) -> np.ndarray:
+        """Weights of a `dwa_strategies` strategy, evaluated for every endpoint"""
+        try:
+            vectorized = VECTORIZED_STRATEGIES[strategy]
+        except KeyError:
+            raise ValueError(f"No vectorized form of strategy: {strategy}")
+        return vectorized(self, time.time() if now is None else now)
+
+    def top_k(
+        self,
+        scores: np.ndarray,
+        k: int,
+        exclude: Iterable[str] = (),
+        now: Optional[float] = None,
+    ) -> List[str]:
+        """The `k` best active endpoints by `scores`
+
+        Healthy endpoints (fewer than 5 consecutive failures) rank first,
+        ties go to the endpoint registered first.
+        """
+        active = self.active_mask(now)
+        excluded = [self.ids[name] for name in exclude if name in self.ids]
+        active[excluded] = False
+        rows = np.flatnonzero(active)
+        failing = self.column("failures")[rows] >= 5
+        if k == 1:
+            # argmax keeps the first of equal scores, so no full sort is needed
+            candidates = rows[~failing] if not failing.all() else rows
+            if not len(candidates):
+                return []
+            return [self.names[candidates[np.argmax(scores[candidates])]]]
+        order = np.lexsort((rows, -scores[rows], failing))
+        return [self.names[rows[i]] for i in order[:k]]
+
+
+def _relative_to_best(values: np.ndarray) -> np.ndarray:
+    """Smallest positive value divided by each value; 1 for non-positive ones"""
+    positive = values > 0
+    if not positive.any():
+        return np.ones_like(values)
+    best = values[positive].min()
+    with np.errstate(divide="ignore"):
+        return np.where(positive, best / values, 1.0)
+
+
+# --- Vectorized dwa_strategies ---
+# Each matches the scalar strategy of the same name for every endpoint.
+
+
+def cost_optimized(store: ColumnarMetrics, now: float) -> np.ndarray:
+    cost = store.column("cost")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = store.column("availability") * store.column("accuracy") / cost
+    return np.where(cost <= 0, 0.1, weight)
+
+
+def speed_focused(store: ColumnarMetrics, now: float) -> np.ndarray:
+    speed = store.column("speed")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = store.column("accuracy") ** 2 * store.column("availability") / speed
+    return np.where(speed <= 0, 0.1, weight)
+
+
+def balanced(store: ColumnarMetrics, now: float) -> np.ndarray:
+    cost, speed = store.column("cost"), store.column("speed")
+    cost_score = np.where(cost > 0, np.maximum(0.1, 2.0 - cost), 1.0)
+    speed_score = np.where(speed > 0, np.maximum(0.1, 3.0 - speed), 1.0)
+    return (
+        0.2 * cost_score
+        + 0.3 * speed_score
+        + 0.4 * store.column("accuracy")
+        + 0.1 * store.column("availability")
+    )
+
+
+def reliability_first(store: ColumnarMetrics, now: float) -> np.ndarray:
+    base_weight = store.column("accuracy") * store.column("availability")
+    failure_penalty = np.maximum(0.1, 1.0 - store.column("failures") * 0.2)
+    last_success = store.column("last_success_time")
+    recency_bonus = np.where(
+        np.isnan(last_success),
+        0.5,
+        np.maximum(0.5, 2.0 - (now - np.nan_to_num(last_success)) / 3600),
+    )
+    return base_weight * failure_penalty * recency_bonus
+
+
+def adaptive_learning(store: ColumnarMetrics, now: float) -> np.ndarray:
+    speed = store.column("speed")
+    consistency_score = np.where(
+        store.column("accuracy_samples") > 1,
+        np.maximum(0.1, 1.0 - store.column("accuracy_variance")),
+        0.5,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed_ratio = store.column("speed_variance") / speed
+    speed_consistency = np.where(
+        (store.column("speed_samples") > 1) & (speed > 0),
+        np.maximum(0.1, 1.0 - speed_ratio),
+        0.5,
+    )
+    performance_score = store.column("accuracy") * store.column("availability")
+    return performance_score * (consistency_score + speed_consistency) / 2
+
+
+VECTORIZED_STRATEGIES: Dict[str, Callable[[ColumnarMetrics, float], np.ndarray]] = {
+    "cost_optimized_strategy": cost_optimized,
+    "speed_focused_strategy": speed_focused,
+    "balanced_strategy": balanced,
+    "reliability_first_strategy": reliability_first,
+    "adaptive_learning_strategy": adaptive_learning,
+}
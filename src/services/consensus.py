@@ -0,0 +1,71 @@
+"""
+Consensus voting for Orchesity IDE OSS
+Groups provider answers that agree and picks a winner when none reach quorum
+"""
+
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from ..models import LLMResult
+
+
+_WHITESPACE = re.compile(r"\s+")
+# Quotes, backticks and end-of-sentence punctuation that do not change an answer
+_EDGE_PUNCTUATION = "\"'`.!?;:,"
+
+
+def normalize_answer(text: str, exact: bool = False) -> str:
+    """Key under which answers are compared
+
+    Exact matching only ignores surrounding whitespace. Normalized matching
+    also folds case and Unicode forms, collapses whitespace and drops
+    quotes and trailing punctuation around the answer.
+    """
+    if exact:
+        return text.strip()
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", folded).strip().strip(_EDGE_PUNCTUATION).strip()
+
+
+def group_answers(
+    answers: List[LLMResult], exact: bool = False
+) -> List[List[LLMResult]]:
+    """Answers grouped by normalized text, in order of each group's first answer"""
+    groups: Dict[str, List[LLMResult]] = OrderedDict()
+    for answer in answers:
+        groups.setdefault(normalize_answer(answer.response, exact), []).append(answer)
+    return list(groups.values())
+
+
+def find_agreement(
+    answers: List[LLMResult], needed: int, exact: bool = False
+) -> Optional[List[LLMResult]]:
+    """The first group of at least `needed` agreeing answers, if any"""
+    for group in group_answers(answers, exact):
+        if len(group) >= needed:
+            return group
+    return None
+
+
+def pick_fallback(
+    answers: List[LLMResult],
+    policy: str,
+    exact: bool = False,
+    rank: Optional[Callable[[List[str]], List[str]]] = None,
+) -> List[LLMResult]:
+    """Winning answers when no quorum was reached
+
+    `answers` are in completion order. `plurality` returns the largest group
+    (the earliest on ties), `fastest` the first answer and `best_provider`
+    the answer of the provider ranked first by `rank`.
+    """
+    if not answers:
+        return []
+    if policy == "fastest":
+        return answers[:1]
+    if policy == "best_provider" and rank is not None:
+        best = rank([answer.provider.value for answer in answers])[0]
+        return [next(a for a in answers if a.provider.value == best)]
+    return max(group_answers(answers, exact), key=len)
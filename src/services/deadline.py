@@ -0,0 +1,72 @@
+"""
+Request deadlines for Orchesity IDE OSS
+End-to-end latency budgets carried through each step of an orchestration
+"""
+
+import asyncio
+import time
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from .metrics import MetricsService
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a step cannot finish within the request's deadline"""
+
+    def __init__(self, step: str, timeout: float):
+        super().__init__(f"deadline of {timeout:.1f}s exceeded during {step}")
+        self.step = step
+        self.timeout = timeout
+
+
+class Deadline:
+    """Absolute deadline for one request
+
+    Created once per request from its timeout and passed down the call
+    chain, so every step bounds its work by the budget that is left rather
+    than by a fixed per-step timeout. Steps that run out of budget are
+    counted as `deadline_exceeded.<step>`.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        metrics: Optional[MetricsService] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timeout = timeout
+        self.metrics = metrics
+        self._clock = clock
+        self.expires_at = clock() + timeout
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative"""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, step: str) -> None:
+        """Raise DeadlineExceeded if no budget is left for `step`"""
+        if self.expired:
+            raise self._exceeded(step)
+
+    async def run(self, awaitable: Awaitable[T], step: str) -> T:
+        """Await `awaitable`, cancelling it when the deadline passes"""
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining())
+        except asyncio.TimeoutError:
+            raise self._exceeded(step)
+
+    def _exceeded(self, step: str) -> DeadlineExceeded:
+        logger.warning(f"Deadline of {self.timeout:.1f}s exceeded during {step}")
+        if self.metrics:
+            self.metrics.increment_counter(f"deadline_exceeded.{step}")
+        return DeadlineExceeded(step, self.timeout)
@@ -87,22 +87,17 @@ def adaptive_learning_strategy(provider: ProviderMetrics) -> float:
     """
     Strategy that adapts based on historical performance variance
     """
-    # Calculate variance in performance metrics
-    if len(provider.accuracy_history) > 1:
-        accuracy_variance = sum(
-            [(x - provider.accuracy) ** 2 for x in provider.accuracy_history]
-        ) / len(provider.accuracy_history)
+    # Variance of recent performance, tracked by the streaming statistics
+    accuracy_stats = provider.stats["accuracy"]
+    if accuracy_stats.count > 1:
         consistency_score = max(
-            0.1, 1.0 - accuracy_variance
+            0.1, 1.0 - accuracy_stats.variance
         )  # Lower variance = higher consistency
     else:
         consistency_score = 0.5
 
-    if len(provider.speed_history) > 1:
-        speed_variance = sum(
-            [(x - provider.speed) ** 2 for x in provider.speed_history]
-        ) / len(provider.speed_history)
-        speed_consistency = max(0.1, 1.0 - (speed_variance / provider.speed))
+    if provider.latency.count > 1 and provider.speed > 0:
+        speed_consistency = max(0.1, 1.0 - (provider.latency.variance / provider.speed))
     else:
         speed_consistency = 0.5
 
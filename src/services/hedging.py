@@ -0,0 +1,22 @@
+"""
+Hedged request helpers for Orchesity IDE OSS
+Decides when a speculative second-provider call should be dispatched
+"""
+
+from .stats import LatencyStats
+
+
+def hedge_delay(
+    latency: LatencyStats,
+    quantile: float,
+    default: float,
+    min_samples: int,
+) -> float:
+    """How long to wait on the primary provider before hedging
+
+    Uses the provider's observed latency quantile once enough samples exist,
+    otherwise falls back to the configured default.
+    """
+    if latency.count < min_samples:
+        return default
+    return latency.quantile(quantile)
@@ -0,0 +1,211 @@
+"""
+Job tracking for Orchesity IDE OSS
+Stores the state and results of asynchronous orchestrations with a TTL
+"""
+
+import asyncio
+import heapq
+import time
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from pydantic import BaseModel, Field
+
+from ..core.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def new_request_id(prefix: str = "req") -> str:
+    """Collision-free request identifier"""
+    return f"{prefix}_{uuid.uuid4().hex}"
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of an asynchronous orchestration"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    @property
+    def is_terminal(self) -> bool:
+        return self in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+class Job(BaseModel):
+    """State and results of one asynchronous orchestration"""
+
+    request_id: str
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+    results: List[Dict[str, Any]] = Field(default_factory=list)
+    errors: List[Dict[str, Any]] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+class JobStore(ABC):
+    """Storage for jobs; every write refreshes the job's TTL"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        """Store the job, notifying anyone waiting on it"""
+
+    @abstractmethod
+    async def get(self, request_id: str) -> Optional[Job]:
+        """Return the job, or None if it is unknown or expired"""
+
+    @abstractmethod
+    async def wait(self, request_id: str, timeout: float) -> Optional[Job]:
+        """Return the job once it is finished or `timeout` seconds passed"""
+
+    async def create(self, request_id: str) -> Job:
+        job = Job(request_id=request_id)
+        await self.save(job)
+        return job
+
+    async def update(self, request_id: str, status: JobStatus, **fields: Any) -> Job:
+        """Move a job to a new state, recreating it if it already expired"""
+        job = await self.get(request_id) or Job(request_id=request_id)
+        job = job.model_copy(
+            update={"status": status, "updated_at": time.time(), **fields}
+        )
+        await self.save(job)
+        return job
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local jobs, suitable for a single worker
+
+    Expiry times are kept in a min-heap, so purging only looks at jobs that
+    are due. A save pushes a new entry; entries made stale by a later save
+    are skipped when they reach the top.
+    """
+
+    def __init__(self, ttl: float):
+        super().__init__(ttl)
+        self._jobs: Dict[str, Job] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, request_id = heapq.heappop(heap)
+            if self._expires_at.get(request_id) == expires_at:
+                self._jobs.pop(request_id, None)
+                del self._expires_at[request_id]
+
+    async def save(self, job: Job) -> None:
+        self._purge_expired()
+        expires_at = time.time() + self.ttl
+        self._jobs[job.request_id] = job
+        self._expires_at[job.request_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, job.request_id))
+        changed = self._changed.pop(job.request_id, None)
+        if changed:
+            changed.set()
+
+    async def get(self, request_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self._jobs.get(request_id)
+
+    async def wait(self, request_id: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(request_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status.is_terminal or remaining <= 0:
+                return job
+            changed = self._changed.setdefault(request_id, asyncio.Event())
+            self._waiters[request_id] = self._waiters.get(request_id, 0) + 1
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._leave(request_id)
+
+    def _leave(self, request_id: str) -> None:
+        """Drop the change event once its last waiter is gone"""
+        left = self._waiters.pop(request_id) - 1
+        if left:
+            self._waiters[request_id] = left
+        else:
+            self._changed.pop(request_id, None)
+
+
+class RedisJobStore(JobStore):
+    """Jobs shared by every worker through Redis, with pub/sub wake-ups"""
+
+    def __init__(self, client: redis.Redis, ttl: float, prefix: str = "job:"):
+        super().__init__(ttl)
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RedisJobStore":
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            db=settings.redis_db,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            decode_responses=True,
+        )
+        return cls(client, settings.job_ttl_seconds)
+
+    def _key(self, request_id: str) -> str:
+        return f"{self._prefix}{request_id}"
+
+    async def save(self, job: Job) -> None:
+        key = self._key(job.request_id)
+        await self._client.set(key, job.model_dump_json(), ex=max(1, int(self.ttl)))
+        await self._client.publish(key, job.status.value)
+
+    async def get(self, request_id: str) -> Optional[Job]:
+        data = await self._client.get(self._key(request_id))
+        return Job.model_validate_json(data) if data else None
+
+    async def wait(self, request_id: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        pubsub = self._client.pubsub()
+        try:
+            # Subscribe before reading, so an update in between is not missed
+            await pubsub.subscribe(self._key(request_id))
+            while True:
+                job = await self.get(request_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job.status.is_terminal or remaining <= 0:
+                    return job
+                await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_job_store(settings: Settings) -> JobStore:
+    """Job store for the configured backend"""
+    if settings.job_backend == "redis":
+        return RedisJobStore.from_settings(settings)
+    return InMemoryJobStore(settings.job_ttl_seconds)
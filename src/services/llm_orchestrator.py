@@ -5,17 +5,46 @@ Handles intelligent routing across multiple LLM providers with dependency inject
 
 import asyncio
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 from dataclasses import dataclass
 from enum import Enum
-import random
 import logging
 
-from ..models import OrchestrationRequest, LLMResult, LLMProvider
+from ..models import (
+    OrchestrationRequest,
+    OrchestrationMode,
+    LLMResult,
+    LLMProvider,
+    QualityCheck,
+    SelectionWeights,
+)
 from ..core.config import Settings
 from .cache import CacheService
 from .metrics import MetricsService
 from .DWA import DynamicWeightAlgorithm, SelectionPolicy
+from .providers import ProviderAdapterRegistry, ProviderTimeoutError
+from .singleflight import SingleFlight
+from .budget import RatioBudget
+from .hedging import hedge_delay
+from .admission import AdmissionController, AdmissionRejected
+from .rate_limiter import ProviderRateLimiter, RateLimitExceeded
+from .circuit_breaker import CircuitBreaker
+from .deadline import Deadline, DeadlineExceeded
+from .scheduler import FairScheduler
+from .retry import RetryPolicy, should_fail_over
+from .cascade import check_answer
+from .consensus import find_agreement, pick_fallback
 
 
 logger = logging.getLogger(__name__)
@@ -26,6 +55,9 @@ class RoutingStrategy(Enum):
     LOAD_BALANCED = "load_balanced"
     RANDOM = "random"
     PRIORITY = "priority"
+    THOMPSON_SAMPLING = "thompson_sampling"
+    UCB1 = "ucb1"
+    WEIGHTED_RANDOM = "weighted_random"
 
 
 @dataclass
@@ -33,6 +65,7 @@ class ProviderLoad:
     provider: LLMProvider
     current_load: int = 0
     max_load: int = 10
+    queued: int = 0
     response_time: float = 0.0
     error_rate: float = 0.0
 
@@ -45,15 +78,30 @@ class LLMOrchestratorService:
         settings: Settings,
         cache: Optional[CacheService] = None,
         metrics: Optional[MetricsService] = None,
+        adapters: Optional[ProviderAdapterRegistry] = None,
     ):
         self.settings = settings
         self.cache = cache
         self.metrics = metrics
+        self.adapters = adapters
+        self._singleflight = SingleFlight()
+        self._hedge_budget = RatioBudget(settings.hedge_max_extra_ratio)
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            budget=RatioBudget(settings.retry_budget_ratio),
+            metrics=metrics,
+        )
         self.providers_load: Dict[LLMProvider, ProviderLoad] = {}
         self._is_initialized = False
 
         # Initialize components that will be set up in initialize()
         self.dwa: Optional[DynamicWeightAlgorithm] = None
+        self.admission: Optional[AdmissionController] = None
+        self.rate_limiter: Optional[ProviderRateLimiter] = None
+        self.breakers: Dict[LLMProvider, CircuitBreaker] = {}
+        self.scheduler: Optional[FairScheduler] = None
         self.routing_strategy = RoutingStrategy(settings.routing_strategy)
 
     async def initialize(self) -> None:
@@ -62,11 +110,43 @@ class LLMOrchestratorService:
             return
 
         self._initialize_provider_loads()
+        self.admission = AdmissionController(
+            self.providers_load,
+            max_queue_size=self.settings.admission_max_queue_size,
+            max_queue_time=self.settings.admission_max_queue_time,
+            metrics=self.metrics,
+        )
+        self.rate_limiter = ProviderRateLimiter(self.settings, metrics=self.metrics)
+        if self.settings.scheduler_enabled:
+            self.scheduler = FairScheduler(
+                max_concurrency=self.settings.scheduler_max_concurrency,
+                quantum=self.settings.scheduler_quantum,
+                weights=self.settings.scheduler_tenant_weights,
+                max_queue_per_tenant=self.settings.scheduler_max_queue_per_tenant,
+                metrics=self.metrics,
+            )
+        self.breakers = {
+            provider: CircuitBreaker(
+                provider,
+                failure_rate_threshold=self.settings.circuit_failure_rate_threshold,
+                window_seconds=self.settings.circuit_window_seconds,
+                min_requests=self.settings.circuit_min_requests,
+                open_seconds=self.settings.circuit_open_seconds,
+                half_open_max_calls=self.settings.circuit_half_open_max_calls,
+                metrics=self.metrics,
+            )
+            for provider in LLMProvider
+        }
+
+        if self.adapters is None:
+            self.adapters = ProviderAdapterRegistry(self.settings)
 
         # Initialize Dynamic Weight Algorithm
         self.dwa = DynamicWeightAlgorithm(
             providers=list(LLMProvider),
             selection_policy=self._map_routing_strategy_to_dwa_policy(),
+            latency_quantiles=[self.settings.hedge_quantile],
+            token_prices=self.settings.provider_token_prices,
         )
 
         self._is_initialized = True
@@ -74,6 +154,10 @@ class LLMOrchestratorService:
 
     async def shutdown(self) -> None:
         """Shutdown the orchestrator service"""
+        if self.adapters:
+            await self.adapters.aclose()
+        if self.rate_limiter:
+            await self.rate_limiter.close()
         self._is_initialized = False
         logger.info("LLM Orchestrator Service shutdown")
 
@@ -82,7 +166,9 @@ class LLMOrchestratorService:
         for provider in LLMProvider:
             self.providers_load[provider] = ProviderLoad(
                 provider=provider,
-                max_load=self.settings.max_concurrent_requests // len(LLMProvider),
+                max_load=max(
+                    1, self.settings.max_concurrent_requests // len(LLMProvider)
+                ),
             )
 
     def _map_routing_strategy_to_dwa_policy(self) -> SelectionPolicy:
@@ -90,8 +176,11 @@ class LLMOrchestratorService:
         strategy_mapping = {
             RoutingStrategy.LOAD_BALANCED: SelectionPolicy.WEIGHTED_COMPOSITE,
             RoutingStrategy.ROUND_ROBIN: SelectionPolicy.ROUND_ROBIN,
-            RoutingStrategy.RANDOM: SelectionPolicy.ROUND_ROBIN,  # Use round robin for random
+            RoutingStrategy.RANDOM: SelectionPolicy.WEIGHTED_RANDOM,
             RoutingStrategy.PRIORITY: SelectionPolicy.MAX_ACCURACY,
+            RoutingStrategy.THOMPSON_SAMPLING: SelectionPolicy.THOMPSON_SAMPLING,
+            RoutingStrategy.UCB1: SelectionPolicy.UCB1,
+            RoutingStrategy.WEIGHTED_RANDOM: SelectionPolicy.WEIGHTED_RANDOM,
         }
         return strategy_mapping.get(self.routing_strategy, SelectionPolicy.MAX_ACCURACY)
 
@@ -104,93 +193,783 @@ class LLMOrchestratorService:
         start_time = time.time()
         results = []
         errors = []
+        deadline = Deadline(
+            request.timeout or self.settings.request_timeout, metrics=self.metrics
+        )
 
         try:
-            # Determine which providers to use
-            providers_to_use = self._select_providers(request.providers)
+            async with self._scheduled(request, deadline):
+                await self._run_mode(request, results, errors, deadline)
+
+            self._raise_if_all_refused(results, errors, deadline)
+
+            # Record overall request metrics
+            total_duration = time.time() - start_time
+            if self.metrics:
+                self.metrics.record_histogram("orchestration_duration", total_duration)
+
+            return results, errors
+
+        except Exception as e:
+            logger.error(f"Orchestration failed: {e}")
+            if self.metrics:
+                self.metrics.increment_counter("orchestration_errors")
+            raise
+
+    async def _run_mode(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Gather results with the request's orchestration mode"""
+        mode, count = request.parse_mode()
+        if mode == OrchestrationMode.HEDGED:
+            await self._orchestrate_hedged(request, results, errors, deadline)
+        elif mode == OrchestrationMode.FIRST:
+            await self._orchestrate_race(request, results, errors, deadline, needed=1)
+        elif mode == OrchestrationMode.QUORUM:
+            await self._orchestrate_race(
+                request, results, errors, deadline, needed=count
+            )
+        elif mode == OrchestrationMode.FALLBACK:
+            await self._orchestrate_fallback(request, results, errors, deadline)
+        elif mode == OrchestrationMode.CASCADE:
+            await self._orchestrate_cascade(request, results, errors, deadline)
+        elif mode == OrchestrationMode.CONSENSUS:
+            await self._orchestrate_consensus(
+                request, results, errors, deadline, needed=count
+            )
+        else:
+            await self._orchestrate_all(request, results, errors, deadline)
+
+    @asynccontextmanager
+    async def _scheduled(
+        self, request: OrchestrationRequest, deadline: Deadline
+    ) -> AsyncIterator[None]:
+        """Wait for the request's fair-share turn, within its deadline
+
+        Requests are queued per `session_id`; a fan-out to several providers
+        costs one unit per provider.
+        """
+        if not self.scheduler:
+            yield
+            return
+        async with self.scheduler.slot(
+            request.session_id or "anonymous",
+            request.priority,
+            cost=len(request.providers),
+            deadline=deadline,
+        ):
+            yield
+
+    def _raise_if_all_refused(
+        self,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Turn an orchestration where no provider could serve into one error"""
+        if results or not errors:
+            return
+        # Every provider turned the request away: surface backpressure
+        if all(e.get("rejected") for e in errors):
+            raise AdmissionRejected(
+                None,
+                "all providers are at capacity",
+                min(e["retry_after"] for e in errors),
+                status_code=max(e["status_code"] for e in errors),
+            )
+        # Every provider ran out of time: the request as a whole timed out
+        if all(e.get("deadline_exceeded") for e in errors):
+            raise DeadlineExceeded("provider_call", deadline.timeout)
+
+    async def orchestrate_progressive(
+        self, request: OrchestrationRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each provider's complete result as soon as it finishes
+
+        Yields one `result` record per successful provider, fastest first,
+        then a `summary` record with the errors and timing. Only the default
+        `all` mode waits on every provider; other modes already return early,
+        so their results are yielded once the mode's condition is met.
+        """
+        start_time = time.time()
+        mode, _ = request.parse_mode()
+        if mode != OrchestrationMode.ALL:
+            results, errors = await self.orchestrate(request)
+            for result in results:
+                yield self._result_record(result)
+        else:
+            deadline = Deadline(
+                request.timeout or self.settings.request_timeout, metrics=self.metrics
+            )
+            results = []
+            errors = []
+            async with self._scheduled(request, deadline):
+                providers_to_use = self._select_providers(
+                    request.providers, deadline, request.selection_weights
+                )
+                claimed = set(providers_to_use)
+                tasks = [
+                    asyncio.create_task(
+                        self._provider_outcome(
+                            provider, request, deadline, errors, claimed
+                        )
+                    )
+                    for provider in providers_to_use
+                ]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        provider, outcome = await next_done
+                        self._record_outcome(provider, outcome, results, errors)
+                        if not isinstance(outcome, BaseException):
+                            yield self._result_record(outcome)
+                finally:
+                    # The consumer went away (or failed): stop the remaining calls
+                    pending = [task for task in tasks if not task.done()]
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        await asyncio.gather(*pending, return_exceptions=True)
+
+            self._raise_if_all_refused(results, errors, deadline)
+            if self.metrics:
+                self.metrics.record_histogram(
+                    "orchestration_duration", time.time() - start_time
+                )
+
+        yield {
+            "type": "summary",
+            "results": len(results),
+            "errors": errors,
+            "duration": time.time() - start_time,
+        }
+
+    async def _provider_outcome(
+        self,
+        provider: LLMProvider,
+        request: OrchestrationRequest,
+        deadline: Deadline,
+        errors: List[Dict[str, Any]],
+        claimed: Set[LLMProvider],
+    ) -> Tuple[LLMProvider, Any]:
+        """Run a provider request, returning the serving provider and its outcome
+
+        If the provider fails in a way another provider might not (after its
+        retries), the failure is recorded in `errors` and the request falls
+        over to the next DWA-ranked provider that is not in `claimed`.
+        """
+        failovers = 0
+        while True:
+            try:
+                return provider, await self._execute_provider_request(
+                    provider, request, deadline
+                )
+            except Exception as e:
+                backup = None
+                if (
+                    failovers < self.settings.failover_max_providers
+                    and should_fail_over(e)
+                    and not deadline.expired
+                ):
+                    backup = self._failover_target(claimed, deadline)
+                if backup is None:
+                    return provider, e
+
+                logger.warning(f"Failing over from {provider.value} to {backup.value}")
+                self._record_outcome(provider, e, [], errors)
+                errors[-1]["failed_over_to"] = backup.value
+                if self.metrics:
+                    self.metrics.increment_counter("failovers")
+                claimed.add(backup)
+                provider = backup
+                failovers += 1
 
-            # Execute requests concurrently
-            tasks = []
+    def _failover_target(
+        self, claimed: Set[LLMProvider], deadline: Deadline
+    ) -> Optional[LLMProvider]:
+        """Best-ranked available provider not already serving this request"""
+        candidates = [
+            p
+            for p in LLMProvider
+            if p not in claimed and self._is_provider_available(p)
+        ]
+        if not candidates:
+            return None
+        return self._rank_providers(candidates, deadline)[0]
+
+    @staticmethod
+    def _result_record(result: LLMResult) -> Dict[str, Any]:
+        return {"type": "result", "result": result.model_dump(mode="json")}
+
+    async def orchestrate_stream(
+        self, request: OrchestrationRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream tokens from every selected provider onto one event stream
+
+        Yields a `start` event naming the selected providers, then `token`
+        events from all providers interleaved as they arrive, one `done` or
+        `error` event per provider and a final `end` event with the errors.
+        """
+        start_time = time.time()
+        deadline = Deadline(
+            request.timeout or self.settings.request_timeout, metrics=self.metrics
+        )
+        async with self._scheduled(request, deadline):
+            providers_to_use = self._select_providers(
+                request.providers, deadline, request.selection_weights
+            )
+            yield {"event": "start", "providers": [p.value for p in providers_to_use]}
+
+            # Token events and finished tasks share one queue, so a provider's
+            # `done` event is always delivered after its last token
+            queue: asyncio.Queue = asyncio.Queue()
+            tasks: Dict[asyncio.Task, LLMProvider] = {}
             for provider in providers_to_use:
                 task = asyncio.create_task(
-                    self._execute_provider_request(provider, request)
+                    deadline.run(
+                        self._guarded_provider_call(
+                            provider,
+                            request,
+                            call=lambda p=provider: self._stream_provider_call(
+                                p, request, queue
+                            ),
+                            deadline=deadline,
+                        ),
+                        "provider_call",
+                    )
                 )
-                tasks.append(task)
-
-            # Wait for all tasks to complete
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Process results and feed back to DWA
-            for i, result in enumerate(task_results):
-                provider = providers_to_use[i]
-                if isinstance(result, Exception):
-                    error_info = {
-                        "provider": provider.value,
-                        "error": str(result),
-                        "timestamp": time.time(),
-                    }
-                    errors.append(error_info)
-                    self._update_provider_load(provider, success=False)
-
-                    # Update DWA with failure
-                    if self.dwa:
-                        self.dwa.record_request_result(
-                            provider.value,
-                            success=False,
-                            response_time=1.0,  # Default penalty time
-                            error=str(result),
-                        )
+                task.add_done_callback(queue.put_nowait)
+                tasks[task] = provider
 
-                    # Record metrics
-                    if self.metrics:
-                        self.metrics.record_request(
-                            provider.value, "unknown", 1.0, success=False
-                        )
+            results: List[LLMResult] = []
+            errors: List[Dict[str, Any]] = []
+            first_token: Dict[LLMProvider, float] = {}
+            finished = 0
+            try:
+                while finished < len(tasks):
+                    item = await queue.get()
+                    if not isinstance(item, asyncio.Task):
+                        provider = LLMProvider(item["provider"])
+                        if provider not in first_token:
+                            first_token[provider] = time.time() - start_time
+                            if len(first_token) == 1 and self.metrics:
+                                self.metrics.record_histogram(
+                                    "time_to_first_token", first_token[provider]
+                                )
+                        yield item
+                        continue
+
+                    finished += 1
+                    provider = tasks[item]
+                    outcome = self._task_outcome(item)
+                    self._record_outcome(provider, outcome, results, errors)
+                    if isinstance(outcome, BaseException):
+                        yield {"event": "error", **errors[-1]}
+                    else:
+                        yield {
+                            "event": "done",
+                            "provider": provider.value,
+                            "result": outcome.model_dump(mode="json"),
+                            "time_to_first_token": first_token.get(provider),
+                        }
+            finally:
+                # The consumer went away (or failed): stop the provider streams
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+        yield {
+            "event": "end",
+            "errors": errors,
+            "duration": time.time() - start_time,
+        }
+
+    async def _orchestrate_all(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Send the request to every selected provider and wait for all of them"""
+        # Determine which providers to use
+        providers_to_use = self._select_providers(
+            request.providers, deadline, request.selection_weights
+        )
+
+        # Execute requests concurrently, falling over to unused providers
+        claimed = set(providers_to_use)
+        tasks = [
+            asyncio.create_task(
+                self._provider_outcome(provider, request, deadline, errors, claimed)
+            )
+            for provider in providers_to_use
+        ]
+
+        # Wait for all tasks to complete
+        try:
+            outcomes = await asyncio.gather(*tasks)
+        finally:
+            # gather cancels its children when cancelled but does not wait
+            # for them, so release their slots before returning
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Process results and feed back to DWA
+        for provider, outcome in outcomes:
+            self._record_outcome(provider, outcome, results, errors)
+
+    async def _orchestrate_fallback(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Try providers one at a time in DWA order until one answers
+
+        The chain is the requested providers when several were given, and
+        every available provider otherwise.
+        """
+        deadline.check("selection")
+        candidates = request.providers if len(request.providers) > 1 else LLMProvider
+        chain = [p for p in candidates if self._is_provider_available(p)]
+        if not chain:
+            raise ValueError("No LLM providers are configured or available")
+
+        failures: Dict[LLMProvider, BaseException] = {}
+
+        async def call(provider_name: str) -> LLMResult:
+            provider = LLMProvider(provider_name)
+            try:
+                return await self._execute_provider_request(provider, request, deadline)
+            except Exception as e:
+                failures[provider] = e
+                raise
+
+        outcome = await self.dwa.multi_llm_fallback_async(
+            [p.value for p in chain],
+            call,
+            hop_timeout=self.settings.fallback_hop_timeout,
+            timeout=deadline.remaining(),
+            # Local backpressure is not a provider failure, as in _record_outcome
+            counts_as_failure=lambda e: not isinstance(e, AdmissionRejected),
+        )
+
+        # The DWA already recorded every hop; only track load and metrics here
+        for provider_name, message in outcome["errors"]:
+            provider = LLMProvider(provider_name)
+            failure = failures.get(provider)
+            if failure is None:
+                # Cut off by the chain: the request deadline only if it ran out
+                if deadline.expired:
+                    failure = DeadlineExceeded("provider_call", deadline.timeout)
                 else:
-                    results.append(result)
-                    response_time = getattr(result, "response_time", 1.0)
-                    tokens_used = getattr(result, "tokens_used", None)
+                    failure = ProviderTimeoutError(provider, message)
+            self._record_outcome(provider, failure, results, errors, update_dwa=False)
+        if "result" in outcome:
+            self._record_outcome(
+                LLMProvider(outcome["provider"]),
+                outcome["result"],
+                results,
+                errors,
+                update_dwa=False,
+            )
+
+    async def _orchestrate_cascade(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Ask the cheapest provider first and escalate only on a failed check
+
+        Tiers are ordered by DWA cost, then speed. An answer that fails the
+        request's quality check (or a provider error) escalates to the next
+        tier; if no tier passes, the last answer is returned, and every
+        failure is listed in `errors`.
+        """
+        deadline.check("selection")
+        candidates = request.providers if len(request.providers) > 1 else LLMProvider
+        available = [p for p in candidates if self._is_provider_available(p)]
+        if not available:
+            raise ValueError("No LLM providers are configured or available")
+        tiers = [
+            LLMProvider(name)
+            for name in self.dwa.rank_cheapest([p.value for p in available])
+        ][: self.settings.cascade_max_tiers]
+
+        check = request.quality_check or QualityCheck()
+        self._count("cascade_requests")
+        last_answer: Optional[LLMResult] = None
+        for tier, provider in enumerate(tiers, start=1):
+            if tier > 1:
+                self._count("cascade_escalations")
+                self._count(f"cascade_escalations.tier{tier}")
+            tier_start = time.time()
+            try:
+                result = await self._execute_provider_request(
+                    provider, request, deadline
+                )
+            except Exception as e:
+                self._record_outcome(provider, e, [], errors)
+                errors[-1]["tier"] = tier
+                if isinstance(e, DeadlineExceeded):
+                    break
+                continue
+            finally:
+                if self.metrics:
+                    name = f"cascade_tier_latency.tier{tier}"
+                    self.metrics.ensure_histogram(name)
+                    self.metrics.record_histogram(name, time.time() - tier_start)
+
+            # The provider answered: that is a success for DWA either way
+            self._record_outcome(provider, result, [], errors)
+            failure = check_answer(result.response, check)
+            if failure is None:
+                results.append(result)
+                self._count(f"cascade_answered.tier{tier}")
+                return
+            errors.append(
+                {
+                    "provider": provider.value,
+                    "error": f"quality check failed: {failure}",
+                    "timestamp": time.time(),
+                    "tier": tier,
+                    "quality_check_failed": True,
+                }
+            )
+            last_answer = result
+
+        if last_answer is not None:
+            results.append(last_answer)
+
+    def _count(self, name: str) -> None:
+        if self.metrics:
+            self.metrics.increment_counter(name)
+
+    async def _orchestrate_race(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+        needed: int,
+    ) -> None:
+        """Send to every selected provider and return once `needed` succeed"""
+        providers_to_use = self._select_providers(
+            request.providers, deadline, request.selection_weights
+        )
+        tasks = {
+            asyncio.create_task(
+                self._execute_provider_request(provider, request, deadline)
+            ): provider
+            for provider in providers_to_use
+        }
+        await self._gather_until(
+            tasks, results, errors, lambda answers: len(answers) >= needed
+        )
 
-                    self._update_provider_load(
-                        provider, success=True, response_time=response_time
+    async def _orchestrate_consensus(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+        needed: Optional[int],
+    ) -> None:
+        """Return as soon as `needed` providers agree on the answer
+
+        `needed` defaults to a majority of the selected providers. Without
+        agreement by the time every call finished (or the deadline cut them
+        off), the winner is picked by `CONSENSUS_FALLBACK`.
+        """
+        providers_to_use = self._select_providers(
+            request.providers, deadline, request.selection_weights
+        )
+        needed = needed or len(providers_to_use) // 2 + 1
+        exact = self.settings.consensus_match == "exact"
+        tasks = {
+            asyncio.create_task(
+                self._execute_provider_request(provider, request, deadline)
+            ): provider
+            for provider in providers_to_use
+        }
+        answers: List[LLMResult] = []
+        await self._gather_until(
+            tasks,
+            answers,
+            errors,
+            lambda answers: find_agreement(answers, needed, exact) is not None,
+        )
+
+        agreed = find_agreement(answers, needed, exact)
+        if agreed:
+            self._count("consensus_reached")
+            results.extend(agreed)
+        elif answers:
+            self._count("consensus_fallback")
+            results.extend(
+                pick_fallback(
+                    answers,
+                    self.settings.consensus_fallback,
+                    exact,
+                    rank=self.dwa.rank_providers if self.dwa else None,
+                )
+            )
+
+    async def _gather_until(
+        self,
+        tasks: Dict[asyncio.Task, LLMProvider],
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        done: Callable[[List[LLMResult]], bool],
+    ) -> None:
+        """Record outcomes as tasks finish until `done(results)` holds
+
+        Outcomes that arrive before the condition is met are fed back to DWA;
+        the remaining tasks are cancelled (and not counted as failures).
+        """
+        pending = set(tasks)
+        try:
+            while pending and not done(results):
+                finished, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in finished:
+                    self._record_outcome(
+                        tasks[task], self._task_outcome(task), results, errors
                     )
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                if self.metrics:
+                    self.metrics.increment_counter("race_cancelled", len(pending))
 
-                    # Update DWA with success
-                    if self.dwa:
-                        self.dwa.record_request_result(
-                            provider.value,
-                            success=True,
-                            response_time=response_time,
-                            tokens_used=int(tokens_used) if tokens_used else None,
-                        )
+    async def _orchestrate_hedged(
+        self,
+        request: OrchestrationRequest,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        deadline: Deadline,
+    ) -> None:
+        """Send to the best provider, hedging to the next-best if it is slow
 
-                    # Record metrics
-                    if self.metrics:
-                        self.metrics.record_request(
-                            provider.value,
-                            getattr(result, "model", "unknown"),
-                            response_time,
-                            success=True,
-                            tokens_used=tokens_used,
-                        )
+        The hedge fires once the primary has been running for its observed
+        latency quantile. The first successful answer wins and the other call
+        is cancelled. Hedges are limited by a budget of extra calls.
+        """
+        candidates = [p for p in request.providers if self._is_provider_available(p)]
+        if len(candidates) < 2:
+            candidates = [p for p in LLMProvider if self._is_provider_available(p)]
+        if not candidates:
+            raise ValueError("No LLM providers are configured or available")
 
-            # Record overall request metrics
-            total_duration = time.time() - start_time
+        deadline.check("selection")
+        ranked = self._rank_providers(candidates, deadline, request.selection_weights)
+        primary = ranked[0]
+        backup = ranked[1] if len(ranked) > 1 else None
+
+        self._hedge_budget.deposit()
+        if self.metrics:
+            self.metrics.increment_counter("hedge_requests")
+
+        primary_task = asyncio.create_task(
+            self._execute_provider_request(primary, request, deadline)
+        )
+        tasks = {primary_task: primary}
+        backup_task = None
+
+        try:
+            done, _ = await asyncio.wait(
+                {primary_task}, timeout=self._hedge_delay(primary)
+            )
+            primary_failed = bool(done) and primary_task.exception() is not None
+
+            if backup and (not done or primary_failed):
+                if primary_failed or self._hedge_budget.try_spend():
+                    backup_task = asyncio.create_task(
+                        self._execute_provider_request(backup, request, deadline)
+                    )
+                    tasks[backup_task] = backup
+                    if not primary_failed and self.metrics:
+                        self.metrics.increment_counter("hedge_fired")
+                elif self.metrics:
+                    self.metrics.increment_counter("hedge_budget_exhausted")
+
+            await self._gather_until(
+                tasks, results, errors, lambda answers: len(answers) >= 1
+            )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if results and backup_task is not None and backup_task.done():
+            if not backup_task.cancelled() and backup_task.exception() is None:
+                if self.metrics:
+                    self.metrics.increment_counter("hedge_won")
+
+    def _hedge_delay(self, provider: LLMProvider) -> float:
+        """Delay before hedging, from the provider's observed latency"""
+        if not self.dwa or provider.value not in self.dwa.provider_metrics:
+            return self.settings.hedge_default_delay
+        return hedge_delay(
+            self.dwa.provider_metrics[provider.value].latency,
+            self.settings.hedge_quantile,
+            self.settings.hedge_default_delay,
+            self.settings.hedge_min_samples,
+        )
+
+    @staticmethod
+    def _task_outcome(task: asyncio.Task) -> Any:
+        """Result of a finished task, or the exception it raised"""
+        exception = task.exception()
+        return exception if exception is not None else task.result()
+
+    def _record_outcome(
+        self,
+        provider: LLMProvider,
+        outcome: Any,
+        results: List[LLMResult],
+        errors: List[Dict[str, Any]],
+        update_dwa: bool = True,
+    ) -> None:
+        """Collect a provider outcome and feed it back to load tracking, DWA and metrics"""
+        if isinstance(outcome, AdmissionRejected):
+            # Local backpressure, not a provider failure: keep DWA metrics
+            # untouched, but route around a provider whose budget ran out
+            # (a single exhausted model does not take the provider out)
+            if (
+                isinstance(outcome, RateLimitExceeded)
+                and outcome.key == provider.value
+                and self.dwa
+            ):
+                self.dwa.mark_unavailable(
+                    provider.value, time.time() + outcome.retry_after
+                )
+            errors.append(
+                {
+                    "provider": provider.value,
+                    "error": str(outcome),
+                    "timestamp": time.time(),
+                    "rejected": True,
+                    "retry_after": outcome.retry_after,
+                    "status_code": outcome.status_code,
+                }
+            )
+        elif isinstance(outcome, BaseException):
+            error_info = {
+                "provider": provider.value,
+                "error": str(outcome),
+                "timestamp": time.time(),
+            }
+            if isinstance(outcome, DeadlineExceeded):
+                error_info["deadline_exceeded"] = True
+            errors.append(error_info)
+            self._update_provider_load(provider, success=False)
+
+            # Update DWA with failure
+            if self.dwa and update_dwa:
+                self.dwa.record_request_result(
+                    provider.value,
+                    success=False,
+                    response_time=1.0,  # Default penalty time
+                    error=str(outcome),
+                )
+
+            # Record metrics
             if self.metrics:
-                self.metrics.record_histogram("orchestration_duration", total_duration)
+                self.metrics.record_request(
+                    provider.value, "unknown", 1.0, success=False
+                )
+        else:
+            results.append(outcome)
+            response_time = getattr(outcome, "response_time", 1.0)
+            tokens_used = getattr(outcome, "tokens_used", None)
 
-            return results, errors
+            self._update_provider_load(
+                provider, success=True, response_time=response_time
+            )
 
-        except Exception as e:
-            logger.error(f"Orchestration failed: {e}")
+            # Update DWA with success
+            if self.dwa and update_dwa:
+                self.dwa.record_request_result(
+                    provider.value,
+                    success=True,
+                    response_time=response_time,
+                    tokens_used=int(tokens_used) if tokens_used else None,
+                )
+
+            # Record metrics
             if self.metrics:
-                self.metrics.increment_counter("orchestration_errors")
-            raise
+                self.metrics.record_request(
+                    provider.value,
+                    getattr(outcome, "model", "unknown"),
+                    response_time,
+                    success=True,
+                    tokens_used=tokens_used,
+                )
+
+    def _rank_providers(
+        self,
+        candidates: List[LLMProvider],
+        deadline: Optional[Deadline] = None,
+        weights: Optional[SelectionWeights] = None,
+    ) -> List[LLMProvider]:
+        """Order candidate providers by DWA preference, best first
+
+        With a deadline, providers whose typical latency fits the remaining
+        budget come before those that would likely be cut off. Per-request
+        `weights` replace the DWA policy for this ranking.
+        """
+        ranked = list(candidates)
+        if self.dwa:
+            # Providers the DWA considers inactive go last, in request order
+            ranked = [
+                LLMProvider(name)
+                for name in self.dwa.rank_providers(
+                    [p.value for p in candidates],
+                    weights.model_dump() if weights else None,
+                )
+            ]
+
+        if deadline:
+            ranked.sort(key=lambda p: not self._fits_deadline(p, deadline))
+        return ranked
+
+    def _fits_deadline(
+        self, provider: LLMProvider, deadline: Optional[Deadline]
+    ) -> bool:
+        """Whether the provider typically answers within the remaining budget"""
+        return not deadline or self._expected_latency(provider) <= deadline.remaining()
+
+    def _expected_latency(self, provider: LLMProvider) -> float:
+        """Typical response time of a provider, 0 while it is still unknown"""
+        if not self.dwa or provider.value not in self.dwa.provider_metrics:
+            return 0.0
+        metrics = self.dwa.provider_metrics[provider.value]
+        return metrics.speed if metrics.latency.count else 0.0
 
     def _select_providers(
-        self, requested_providers: List[LLMProvider]
+        self,
+        requested_providers: List[LLMProvider],
+        deadline: Optional[Deadline] = None,
+        weights: Optional[SelectionWeights] = None,
     ) -> List[LLMProvider]:
-        """Select providers based on routing strategy"""
+        """Select providers based on routing strategy and the remaining budget"""
+        if deadline:
+            deadline.check("selection")
         available_providers = [
             p for p in requested_providers if self._is_provider_available(p)
         ]
@@ -205,26 +984,32 @@ class LLMOrchestratorService:
             raise ValueError("No LLM providers are configured or available")
 
         # Use DWA for intelligent provider selection
-        selected_providers = []
-
         if len(requested_providers) == 1:
-            # Single provider requested
-            selected_providers = requested_providers
+            # Single provider requested; reroute if it is temporarily
+            # unavailable or too slow for the remaining budget
+            requested = requested_providers[0]
+            if requested in available_providers and self._fits_deadline(
+                requested, deadline
+            ):
+                selected_providers = requested_providers
+            else:
+                fallback = self._rank_providers(
+                    [p for p in LLMProvider if self._is_provider_available(p)],
+                    deadline,
+                    weights,
+                )
+                if requested in available_providers and not self._fits_deadline(
+                    fallback[0], deadline
+                ):
+                    # Nothing fits the budget; keep the provider that was asked for
+                    selected_providers = requested_providers
+                else:
+                    selected_providers = fallback[:1]
         else:
-            # Multiple providers - use DWA selection
-            if self.dwa:
-                for _ in range(len(requested_providers)):
-                    selected_provider = self.dwa.select_provider()
-                    if selected_provider:
-                        provider_enum = LLMProvider(selected_provider)
-                        if provider_enum not in selected_providers:
-                            selected_providers.append(provider_enum)
-                    if len(selected_providers) >= len(requested_providers):
-                        break
-
-            # Fallback to round-robin if DWA fails
-            if not selected_providers:
-                selected_providers = available_providers[: len(requested_providers)]
+            # Multiple providers - rank the available ones with DWA
+            selected_providers = self._rank_providers(
+                available_providers, deadline, weights
+            )[: len(requested_providers)]
 
         return selected_providers
 
@@ -233,18 +1018,32 @@ class LLMOrchestratorService:
         # Check if provider has API key configured
         provider_key = f"{provider.value}_api_key"
         api_key = getattr(self.settings, provider_key, None)
-        return bool(api_key)
+        if not api_key:
+            return False
+        # Providers with an open circuit are skipped until their cooldown ends
+        breaker = self.breakers.get(provider)
+        if breaker and not breaker.allows_traffic():
+            return False
+        # Providers with an exhausted rate limit budget are skipped until refilled
+        return not self.rate_limiter or self.rate_limiter.is_available(provider)
 
     async def _execute_provider_request(
-        self, provider: LLMProvider, request: OrchestrationRequest
+        self,
+        provider: LLMProvider,
+        request: OrchestrationRequest,
+        deadline: Optional[Deadline] = None,
     ) -> LLMResult:
-        """Execute a request against a specific provider"""
-        cache_key = None
+        """Execute a request against a specific provider within the deadline"""
+        if deadline is None:
+            deadline = Deadline(self.settings.request_timeout, metrics=self.metrics)
+        cache_key = self._generate_cache_key(provider, request)
+        use_cache = bool(self.cache and self.settings.enable_caching)
 
         # Check cache first if enabled
-        if self.cache and self.settings.enable_caching:
-            cache_key = self._generate_cache_key(provider, request)
-            cached_result = await self.cache.get(cache_key)
+        if use_cache:
+            cached_result = await deadline.run(
+                self.cache.get(cache_key), "cache_lookup"
+            )
             if cached_result:
                 logger.info(f"Cache hit for {provider.value}")
                 if self.metrics:
@@ -254,18 +1053,49 @@ class LLMOrchestratorService:
         if self.metrics:
             self.metrics.record_cache_operation("get", hit=False)
 
-        # Execute the actual provider request
+        # Coalesce identical in-flight requests onto a single provider call
+        result, shared = await deadline.run(
+            self._singleflight.do(
+                cache_key,
+                lambda: self._fetch_provider_result(
+                    provider, request, cache_key, use_cache, deadline
+                ),
+            ),
+            "provider_call",
+        )
+        if self.metrics:
+            self.metrics.record_singleflight(coalesced=shared)
+
+        # Waiters get their own copy so callers can't mutate each other's result
+        return result.model_copy() if shared else result
+
+    async def _fetch_provider_result(
+        self,
+        provider: LLMProvider,
+        request: OrchestrationRequest,
+        cache_key: str,
+        use_cache: bool,
+        deadline: Deadline,
+    ) -> LLMResult:
+        """Call the provider and populate the cache with the result"""
         start_time = time.time()
 
         try:
-            result = await self._call_provider_api(provider, request)
+            result = await self.retry_policy.run(
+                lambda: self._guarded_provider_call(
+                    provider, request, deadline=deadline
+                ),
+                deadline,
+                provider.value,
+            )
             response_time = time.time() - start_time
 
             # Add response time to result
             result.response_time = response_time
 
-            # Cache the result if caching is enabled
-            if self.cache and cache_key and self.settings.enable_caching:
+            # Cache the result if caching is enabled and time is left for it;
+            # the write is bounded by the caller's provider_call deadline
+            if use_cache and not deadline.expired:
                 cache_data = {
                     "provider": provider.value,
                     "model": result.model,
@@ -281,44 +1111,97 @@ class LLMOrchestratorService:
             return result
 
         except Exception as e:
-            response_time = time.time() - start_time
             logger.error(f"Provider {provider.value} request failed: {e}")
             raise
 
+    async def _guarded_provider_call(
+        self,
+        provider: LLMProvider,
+        request: OrchestrationRequest,
+        call: Optional[Callable[[], Awaitable[LLMResult]]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> LLMResult:
+        """Call the provider through its circuit breaker, rate limit and admission slot
+
+        `call` performs the actual provider call and defaults to a plain
+        (non-streaming) completion. A call cut off by `deadline` counts as a
+        failure on the provider's breaker.
+        """
+
+        async with AsyncExitStack() as stack:
+            breaker = self.breakers.get(provider)
+            if breaker:
+                await stack.enter_async_context(breaker.guard(deadline))
+
+            reservation = None
+            if self.rate_limiter:
+                reservation = await self.rate_limiter.acquire(provider, request)
+
+            try:
+                if self.admission:
+                    await stack.enter_async_context(self.admission.admit(provider))
+            except (AdmissionRejected, asyncio.CancelledError):
+                if reservation:
+                    # Never sent: return the request and its tokens to the budget
+                    await self.rate_limiter.refund(reservation)
+                raise
+
+            try:
+                if call is not None:
+                    result = await call()
+                else:
+                    result = await self._call_provider_api(provider, request)
+            except (Exception, asyncio.CancelledError):
+                # Failed or cancelled (a losing hedge, a client disconnect)
+                if reservation:
+                    # The provider produced no output; give the charge back
+                    await self.rate_limiter.reconcile(reservation, 0)
+                raise
+
+            if reservation:
+                # Correct the up-front token charge with the reported usage
+                tokens_used = result.tokens_used
+                if tokens_used is None:
+                    tokens_used = reservation.charged_tokens
+                await self.rate_limiter.reconcile(reservation, tokens_used)
+            return result
+
     async def _call_provider_api(
         self, provider: LLMProvider, request: OrchestrationRequest
     ) -> LLMResult:
-        """Call the actual provider API"""
-        # This is a placeholder - in the real implementation, this would
-        # call the specific provider SDK (OpenAI, Anthropic, etc.)
-        # For now, we'll simulate a response
-
-        # Simulate API call delay
-        await asyncio.sleep(random.uniform(0.1, 0.5))
-
-        # Simulate response based on provider
-        if provider == LLMProvider.OPENAI:
-            response = f"OpenAI GPT response to: {request.prompt[:50]}..."
-            model = "gpt-3.5-turbo"
-        elif provider == LLMProvider.ANTHROPIC:
-            response = f"Anthropic Claude response to: {request.prompt[:50]}..."
-            model = "claude-3-haiku-20240307"
-        elif provider == LLMProvider.GEMINI:
-            response = f"Google Gemini response to: {request.prompt[:50]}..."
-            model = "gemini-pro"
-        elif provider == LLMProvider.GROK:
-            response = f"Grok response to: {request.prompt[:50]}..."
-            model = "grok-beta"
-        else:
-            response = f"Unknown provider response to: {request.prompt[:50]}..."
-            model = "unknown"
+        """Call the provider API through its pooled adapter"""
+        if self.adapters is None:
+            self.adapters = ProviderAdapterRegistry(self.settings)
+        return await self.adapters.get(provider).complete(request)
+
+    async def _stream_provider_call(
+        self,
+        provider: LLMProvider,
+        request: OrchestrationRequest,
+        queue: asyncio.Queue,
+    ) -> LLMResult:
+        """Stream a provider's completion, publishing token events to `queue`"""
+        if self.adapters is None:
+            self.adapters = ProviderAdapterRegistry(self.settings)
+        adapter = self.adapters.get(provider)
+
+        start_time = time.time()
+        parts: List[str] = []
+        tokens_used = 0
+        async for chunk in adapter.stream(request):
+            if chunk.text:
+                parts.append(chunk.text)
+                queue.put_nowait(
+                    {"event": "token", "provider": provider.value, "text": chunk.text}
+                )
+            tokens_used += chunk.tokens_used or 0
 
         return LLMResult(
             provider=provider,
-            model=model,
-            response=response,
-            tokens_used=random.randint(100, 500),
-            finish_reason="stop",
+            model=request.model or adapter.default_model,
+            response="".join(parts),
+            tokens_used=tokens_used or None,
+            response_time=time.time() - start_time,
         )
 
     def _generate_cache_key(
@@ -357,15 +1240,27 @@ class LLMOrchestratorService:
             stats[provider.value] = {
                 "current_load": load_info.current_load,
                 "max_load": load_info.max_load,
+                "queued": load_info.queued,
                 "response_time": load_info.response_time,
                 "error_rate": load_info.error_rate,
                 "available": self._is_provider_available(provider),
             }
+            if provider in self.breakers:
+                stats[provider.value]["circuit"] = self.breakers[provider].snapshot()
+            if self.dwa and provider.value in self.dwa.provider_metrics:
+                latency = self.dwa.provider_metrics[provider.value].latency
+                stats[provider.value]["latency_p50"] = latency.p50
+                stats[provider.value]["latency_p95"] = latency.p95
 
         # Add DWA stats if available
         if self.dwa:
             stats["dwa"] = self.dwa.get_stats()
 
+        stats["hedging"] = self._hedge_budget.snapshot()
+        stats["retries"] = self.retry_policy.budget.snapshot()
+        if self.rate_limiter:
+            stats["rate_limits"] = self.rate_limiter.snapshot()
+
         return stats
 
     @property
@@ -106,6 +106,22 @@ class MetricsService:
         self.create_metric("cache_misses", "counter")
         self.create_metric("cache_sets", "counter")
 
+        # Single-flight metrics
+        self.create_metric("singleflight_originated", "counter")
+        self.create_metric("singleflight_coalesced", "counter")
+
+        # Admission control metrics
+        self.create_metric("admission_wait_time", "histogram")
+        self.create_metric("admission_rejected", "counter")
+        self.create_metric("admission_timeouts", "counter")
+
+        # Scheduler metrics
+        self.create_metric("scheduler_wait_time", "histogram")
+        self.create_metric("scheduler_rejected", "counter")
+
+        # Streaming metrics
+        self.create_metric("time_to_first_token", "histogram")
+
         # System metrics
         self.create_metric("memory_usage", "gauge")
         self.create_metric("cpu_usage", "gauge")
@@ -121,6 +137,11 @@ class MetricsService:
         elif metric_type == "timeseries":
             self._metrics[name] = MetricSeries(name)
 
+    def ensure_histogram(self, name: str):
+        """Create a histogram unless it already exists"""
+        if name not in self._histograms:
+            self.create_metric(name, "histogram")
+
     def increment_counter(
         self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None
     ):
@@ -192,6 +213,13 @@ class MetricsService:
         elif operation == "set":
             self.increment_counter("cache_sets")
 
+    def record_singleflight(self, coalesced: bool):
+        """Record whether a provider call was originated or coalesced"""
+        if coalesced:
+            self.increment_counter("singleflight_coalesced")
+        else:
+            self.increment_counter("singleflight_originated")
+
     def get_metric_summary(self, name: str) -> Optional[Dict[str, Any]]:
         """Get summary statistics for a metric"""
         if name in self._metrics:
@@ -0,0 +1,29 @@
+# Provider adapters package
+
+from .base import (
+    ProviderAdapter,
+    ProviderError,
+    ProviderTimeoutError,
+    StreamChunk,
+)
+from .adapters import (
+    ADAPTER_CLASSES,
+    OpenAIAdapter,
+    AnthropicAdapter,
+    GeminiAdapter,
+    GrokAdapter,
+)
+from .registry import ProviderAdapterRegistry
+
+__all__ = [
+    "ProviderAdapter",
+    "ProviderError",
+    "ProviderTimeoutError",
+    "StreamChunk",
+    "ADAPTER_CLASSES",
+    "OpenAIAdapter",
+    "AnthropicAdapter",
+    "GeminiAdapter",
+    "GrokAdapter",
+    "ProviderAdapterRegistry",
+]
@@ -0,0 +1,162 @@
+"""
+Concrete provider adapters for Orchesity IDE OSS
+One adapter per LLMProvider, each speaking the provider's native HTTP API
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from ...models import OrchestrationRequest, LLMProvider
+from .base import ProviderAdapter
+
+
+class OpenAIAdapter(ProviderAdapter):
+    """OpenAI chat completions adapter"""
+
+    provider = LLMProvider.OPENAI
+    default_base_url = "https://api.openai.com"
+    default_model = "gpt-3.5-turbo"
+    completions_path = "/v1/chat/completions"
+
+    def build_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": request.prompt}],
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        return self.completions_path, payload, headers
+
+    def parse_response(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        choice = data["choices"][0]
+        usage = data.get("usage") or {}
+        return choice["message"]["content"], usage.get("total_tokens")
+
+    def build_stream_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        path, payload, headers = super().build_stream_request(request, model)
+        # Usage is only reported in a final chunk when explicitly requested
+        payload["stream_options"] = {"include_usage": True}
+        return path, payload, headers
+
+    def parse_stream_event(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        text = ""
+        choices = data.get("choices") or []
+        if choices:
+            text = (choices[0].get("delta") or {}).get("content") or ""
+        usage = data.get("usage") or {}
+        return text, usage.get("total_tokens")
+
+
+class GrokAdapter(OpenAIAdapter):
+    """xAI Grok adapter (OpenAI-compatible API)"""
+
+    provider = LLMProvider.GROK
+    default_base_url = "https://api.x.ai"
+    default_model = "grok-beta"
+
+
+class AnthropicAdapter(ProviderAdapter):
+    """Anthropic messages API adapter"""
+
+    provider = LLMProvider.ANTHROPIC
+    default_base_url = "https://api.anthropic.com"
+    default_model = "claude-3-haiku-20240307"
+    api_version = "2023-06-01"
+
+    def build_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": request.prompt}],
+            "max_tokens": request.max_tokens or 1000,
+            "temperature": request.temperature,
+        }
+        headers = {
+            "x-api-key": self.api_key or "",
+            "anthropic-version": self.api_version,
+        }
+        return "/v1/messages", payload, headers
+
+    def parse_response(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        text = "".join(
+            block.get("text", "")
+            for block in data.get("content", [])
+            if block.get("type") == "text"
+        )
+        usage = data.get("usage") or {}
+        tokens = None
+        if usage:
+            tokens = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        return text, tokens
+
+    def parse_stream_event(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        event_type = data.get("type")
+        if event_type == "content_block_delta":
+            return (data.get("delta") or {}).get("text", ""), None
+        if event_type == "message_start":
+            # Input tokens are reported up front, output tokens at the end
+            usage = (data.get("message") or {}).get("usage") or {}
+            return "", usage.get("input_tokens")
+        if event_type == "message_delta":
+            return "", (data.get("usage") or {}).get("output_tokens")
+        return "", None
+
+
+class GeminiAdapter(ProviderAdapter):
+    """Google Gemini generateContent adapter"""
+
+    provider = LLMProvider.GEMINI
+    default_base_url = "https://generativelanguage.googleapis.com"
+    default_model = "gemini-pro"
+
+    def build_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": request.prompt}]}],
+            "generationConfig": {
+                "maxOutputTokens": request.max_tokens,
+                "temperature": request.temperature,
+            },
+        }
+        headers = {"x-goog-api-key": self.api_key or ""}
+        return f"/v1beta/models/{model}:generateContent", payload, headers
+
+    def parse_response(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        candidate = data["candidates"][0]
+        text = "".join(
+            part.get("text", "") for part in candidate["content"].get("parts", [])
+        )
+        usage = data.get("usageMetadata") or {}
+        return text, usage.get("totalTokenCount")
+
+    def build_stream_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        _, payload, headers = self.build_request(request, model)
+        return f"/v1beta/models/{model}:streamGenerateContent?alt=sse", payload, headers
+
+    def parse_stream_event(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        candidate = (data.get("candidates") or [{}])[0]
+        text = "".join(
+            part.get("text", "")
+            for part in (candidate.get("content") or {}).get("parts", [])
+        )
+        # Usage metadata is cumulative; only the final chunk's total counts
+        tokens = None
+        if candidate.get("finishReason"):
+            tokens = (data.get("usageMetadata") or {}).get("totalTokenCount")
+        return text, tokens
+
+
+ADAPTER_CLASSES = {
+    LLMProvider.OPENAI: OpenAIAdapter,
+    LLMProvider.ANTHROPIC: AnthropicAdapter,
+    LLMProvider.GEMINI: GeminiAdapter,
+    LLMProvider.GROK: GrokAdapter,
+}
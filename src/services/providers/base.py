@@ -0,0 +1,232 @@
+"""
+Base provider adapter for Orchesity IDE OSS
+Wraps a long-lived pooled HTTP client per LLM provider
+"""
+
+import json
+import time
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from ...models import OrchestrationRequest, LLMResult, LLMProvider
+from ...core.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+# What decoding or parsing an unexpected response body raises
+# (json.JSONDecodeError is a ValueError)
+MALFORMED_RESPONSE_ERRORS = (ValueError, KeyError, IndexError, TypeError)
+
+
+class ProviderError(Exception):
+    """Error raised when a provider call fails"""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(f"{provider.value}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ProviderTimeoutError(ProviderError):
+    """Error raised when a provider call times out"""
+
+
+@dataclass
+class StreamChunk:
+    """Incremental piece of a streamed completion"""
+
+    text: str = ""
+    tokens_used: Optional[int] = None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header expressed in seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class ProviderAdapter(ABC):
+    """Base class for provider adapters backed by a pooled httpx.AsyncClient"""
+
+    provider: LLMProvider
+    default_base_url: str
+    default_model: str
+
+    def __init__(
+        self,
+        settings: Settings,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.settings = settings
+        self.api_key = api_key or settings.get_provider_key(self.provider.value)
+        self.base_url = (
+            base_url
+            or settings.get_provider_base_url(self.provider.value)
+            or self.default_base_url
+        ).rstrip("/")
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived client, created on first use so it binds to the running loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create a keep-alive client sized from the orchestration settings"""
+        connect_timeout, read_timeout = self.settings.get_provider_timeouts(
+            self.provider.value
+        )
+        max_connections = self.settings.max_concurrent_requests
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=self.settings.provider_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            read_timeout,
+            connect=connect_timeout,
+            read=read_timeout,
+            pool=connect_timeout,
+        )
+
+        http2 = self.settings.provider_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "HTTP/2 requested for %s but 'h2' is not installed, "
+                    "falling back to HTTP/1.1",
+                    self.provider.value,
+                )
+                http2 = False
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            limits=limits,
+            timeout=timeout,
+            transport=self._transport,
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def complete(self, request: OrchestrationRequest) -> LLMResult:
+        """Send a completion request and return a normalized result"""
+        model = request.model or self.default_model
+        path, payload, headers = self.build_request(request, model)
+
+        start_time = time.time()
+        try:
+            response = await self.client.post(path, json=payload, headers=headers)
+        except httpx.TimeoutException as e:
+            raise ProviderTimeoutError(self.provider, f"timed out: {e!r}") from e
+        except httpx.TransportError as e:
+            raise ProviderError(self.provider, f"transport error: {e!r}") from e
+
+        self._raise_for_status(response)
+        try:
+            text, tokens_used = self.parse_response(response.json())
+        except MALFORMED_RESPONSE_ERRORS as e:
+            raise ProviderError(self.provider, f"malformed response: {e!r}") from e
+        return LLMResult(
+            provider=self.provider,
+            model=model,
+            response=text,
+            tokens_used=tokens_used,
+            response_time=time.time() - start_time,
+        )
+
+    async def stream(self, request: OrchestrationRequest) -> AsyncIterator[StreamChunk]:
+        """Send a streaming completion request and yield chunks as they arrive"""
+        model = request.model or self.default_model
+        path, payload, headers = self.build_stream_request(request, model)
+
+        try:
+            async with self.client.stream(
+                "POST", path, json=payload, headers=headers
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    self._raise_for_status(response)
+
+                # Server-sent events: only the `data:` lines carry payloads
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if not data or data == "[DONE]":
+                        continue
+                    try:
+                        event = json.loads(data)
+                        text, tokens_used = self.parse_stream_event(event)
+                    except MALFORMED_RESPONSE_ERRORS as e:
+                        raise ProviderError(
+                            self.provider, f"malformed stream event: {e!r}"
+                        ) from e
+                    if text or tokens_used:
+                        yield StreamChunk(text=text, tokens_used=tokens_used)
+        except httpx.TimeoutException as e:
+            raise ProviderTimeoutError(self.provider, f"timed out: {e!r}") from e
+        except httpx.TransportError as e:
+            raise ProviderError(self.provider, f"transport error: {e!r}") from e
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        """Raise ProviderError for an error response"""
+        if response.status_code >= 400:
+            raise ProviderError(
+                self.provider,
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get("retry-after")),
+            )
+
+    def build_stream_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Return (path, json payload, headers) for a streaming completion call"""
+        path, payload, headers = self.build_request(request, model)
+        return path, {**payload, "stream": True}, headers
+
+    @abstractmethod
+    def build_request(
+        self, request: OrchestrationRequest, model: str
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Return (path, json payload, headers) for a completion call"""
+
+    @abstractmethod
+    def parse_response(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        """Return (text, tokens used) from a provider response body"""
+
+    @abstractmethod
+    def parse_stream_event(self, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        """Return (text delta, tokens used) from one streamed event
+
+        Token counts from successive events are added up, so each event must
+        only report usage that no other event of the stream reports.
+        """
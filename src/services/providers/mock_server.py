@@ -0,0 +1,289 @@
+"""
+Mock LLM provider server for Orchesity IDE OSS
+Local ASGI app speaking the OpenAI, Anthropic, Gemini and Grok wire formats,
+used to test and benchmark the provider adapters offline.
+
+Run standalone:
+    uvicorn src.services.providers.mock_server:app --port 9100
+
+and point the orchestrator at it:
+    PROVIDER_BASE_URLS='{"openai": "http://127.0.0.1:9100/openai", ...}'
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ...models import LLMProvider
+
+
+PerProvider = Union[float, Dict[str, float]]
+
+
+def mock_base_urls(root: str = "http://mock") -> Dict[str, str]:
+    """Base URLs that route each provider to its mock endpoints"""
+    root = root.rstrip("/")
+    return {provider.value: f"{root}/{provider.value}" for provider in LLMProvider}
+
+
+def _per_provider(value: Optional[PerProvider], provider: str) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, dict):
+        return value.get(provider, 0.0)
+    return value
+
+
+def _split_words(text: str) -> List[str]:
+    """Split text into word-sized stream chunks, keeping the whitespace"""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def create_mock_app(
+    latency: PerProvider = 0.05,
+    jitter: PerProvider = 0.0,
+    failure_rate: Optional[PerProvider] = None,
+    responses: Optional[Dict[str, str]] = None,
+    seed: Optional[int] = None,
+    chunk_delay: PerProvider = 0.0,
+    fail_first: Optional[PerProvider] = None,
+    retry_after: PerProvider = 1.0,
+) -> FastAPI:
+    """Create a mock provider app with configurable latency and failures
+
+    `latency` is the time to the first byte; streamed responses then emit
+    one word every `chunk_delay` seconds. The first `fail_first` calls to a
+    provider fail, then calls fail at `failure_rate`; failures answer 503
+    with a `retry_after` Retry-After header.
+    """
+    app = FastAPI(title="Orchesity Mock LLM Provider")
+    rng = random.Random(seed)
+    app.state.request_counts = {provider.value: 0 for provider in LLMProvider}
+    # Concurrent calls per provider, and the highest concurrency seen
+    app.state.in_flight = {provider.value: 0 for provider in LLMProvider}
+    app.state.peak_in_flight = {provider.value: 0 for provider in LLMProvider}
+
+    async def simulate(provider: str, prompt: str) -> Union[str, JSONResponse]:
+        app.state.request_counts[provider] += 1
+        app.state.in_flight[provider] += 1
+        app.state.peak_in_flight[provider] = max(
+            app.state.peak_in_flight[provider], app.state.in_flight[provider]
+        )
+        delay = _per_provider(latency, provider)
+        delay += rng.uniform(0, _per_provider(jitter, provider))
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            app.state.in_flight[provider] -= 1
+
+        failing = app.state.request_counts[provider] <= _per_provider(
+            fail_first, provider
+        )
+        if failing or rng.random() < _per_provider(failure_rate, provider):
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"message": "mock provider overloaded"}},
+                headers={"Retry-After": f"{_per_provider(retry_after, provider):g}"},
+            )
+
+        if responses and provider in responses:
+            return responses[provider]
+        return f"Mock {provider} response to: {prompt[:50]}"
+
+    def count_tokens(*texts: str) -> int:
+        return sum(len(text.split()) for text in texts)
+
+    def sse(provider: str, events: Iterable[Dict[str, Any]]) -> StreamingResponse:
+        """Stream events as server-sent events, pacing them by chunk_delay"""
+        delay = _per_provider(chunk_delay, provider)
+
+        async def body() -> AsyncIterator[str]:
+            for index, event in enumerate(events):
+                if index and delay > 0:
+                    await asyncio.sleep(delay)
+                if "event" in event:
+                    yield f"event: {event['event']}\n"
+                data = event["data"]
+                if not isinstance(data, str):
+                    data = json.dumps(data)
+                yield f"data: {data}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    def chat_completion_stream(
+        provider: str, body: Dict[str, Any], prompt: str, text: str
+    ) -> StreamingResponse:
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None):
+            return {
+                "data": {
+                    "id": f"mock-{provider}",
+                    "object": "chat.completion.chunk",
+                    "model": body.get("model"),
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+            }
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word}) for word in _split_words(text)]
+        events.append(chunk({}, "stop"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(text)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+            events.append(
+                {"data": {"id": f"mock-{provider}", "choices": [], "usage": usage}}
+            )
+        events.append({"data": "[DONE]"})
+        return sse(provider, events)
+
+    async def chat_completion(provider: str, body: Dict[str, Any]) -> Any:
+        prompt = body["messages"][-1]["content"]
+        text = await simulate(provider, prompt)
+        if isinstance(text, JSONResponse):
+            return text
+        if body.get("stream"):
+            return chat_completion_stream(provider, body, prompt, text)
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(text)
+        return {
+            "id": f"mock-{provider}",
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/openai/v1/chat/completions")
+    async def openai_completions(request: Request):
+        return await chat_completion(LLMProvider.OPENAI.value, await request.json())
+
+    @app.post("/grok/v1/chat/completions")
+    async def grok_completions(request: Request):
+        return await chat_completion(LLMProvider.GROK.value, await request.json())
+
+    @app.post("/anthropic/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        text = await simulate(LLMProvider.ANTHROPIC.value, prompt)
+        if isinstance(text, JSONResponse):
+            return text
+        if body.get("stream"):
+            message = {
+                "id": "mock-anthropic",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model"),
+                "content": [],
+                "usage": {"input_tokens": count_tokens(prompt), "output_tokens": 0},
+            }
+            events = [
+                {"type": "message_start", "message": message},
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+            ]
+            events += [
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": word},
+                }
+                for word in _split_words(text)
+            ]
+            events += [
+                {"type": "content_block_stop", "index": 0},
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn"},
+                    "usage": {"output_tokens": count_tokens(text)},
+                },
+                {"type": "message_stop"},
+            ]
+            return sse(
+                LLMProvider.ANTHROPIC.value,
+                [{"event": event["type"], "data": event} for event in events],
+            )
+        return {
+            "id": "mock-anthropic",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {
+                "input_tokens": count_tokens(prompt),
+                "output_tokens": count_tokens(text),
+            },
+        }
+
+    @app.post("/gemini/v1beta/models/{model_action}")
+    async def gemini_generate(model_action: str, request: Request):
+        body = await request.json()
+        prompt = body["contents"][-1]["parts"][0]["text"]
+        text = await simulate(LLMProvider.GEMINI.value, prompt)
+        if isinstance(text, JSONResponse):
+            return text
+        if model_action.endswith(":streamGenerateContent"):
+            words = _split_words(text)
+            events = []
+            for index, word in enumerate(words):
+                candidate = {"content": {"role": "model", "parts": [{"text": word}]}}
+                if index == len(words) - 1:
+                    candidate["finishReason"] = "STOP"
+                sent = "".join(words[: index + 1])
+                usage = {
+                    "promptTokenCount": count_tokens(prompt),
+                    "candidatesTokenCount": count_tokens(sent),
+                    "totalTokenCount": count_tokens(prompt, sent),
+                }
+                events.append(
+                    {"data": {"candidates": [candidate], "usageMetadata": usage}}
+                )
+            return sse(LLMProvider.GEMINI.value, events)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": count_tokens(prompt),
+                "candidatesTokenCount": count_tokens(text),
+                "totalTokenCount": count_tokens(prompt, text),
+            },
+        }
+
+    return app
+
+
+app = create_mock_app(
+    latency=float(os.getenv("MOCK_PROVIDER_LATENCY", "0.05")),
+    jitter=float(os.getenv("MOCK_PROVIDER_JITTER", "0.0")),
+    failure_rate=float(os.getenv("MOCK_PROVIDER_FAILURE_RATE", "0.0")),
+    chunk_delay=float(os.getenv("MOCK_PROVIDER_CHUNK_DELAY", "0.0")),
+)
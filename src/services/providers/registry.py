@@ -0,0 +1,55 @@
+"""
+Provider adapter registry for Orchesity IDE OSS
+Owns one long-lived adapter (and connection pool) per LLM provider
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from ...models import LLMProvider
+from ...core.config import Settings
+from .adapters import ADAPTER_CLASSES
+from .base import ProviderAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderAdapterRegistry:
+    """Lazily creates and caches provider adapters"""
+
+    def __init__(
+        self,
+        settings: Settings,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.settings = settings
+        self._transport = transport
+        self._adapters: Dict[LLMProvider, ProviderAdapter] = {}
+
+    def get(self, provider: LLMProvider) -> ProviderAdapter:
+        """Get the adapter for a provider, creating it on first use"""
+        adapter = self._adapters.get(provider)
+        if adapter is None:
+            adapter_class = ADAPTER_CLASSES.get(provider)
+            if adapter_class is None:
+                raise ValueError(f"No adapter registered for provider: {provider}")
+            adapter = adapter_class(self.settings, transport=self._transport)
+            self._adapters[provider] = adapter
+            logger.info(f"Created {provider.value} adapter for {adapter.base_url}")
+        return adapter
+
+    def register(self, adapter: ProviderAdapter) -> None:
+        """Register a custom adapter, replacing any existing one"""
+        self._adapters[adapter.provider] = adapter
+
+    async def aclose(self) -> None:
+        """Close all provider connection pools"""
+        for adapter in self._adapters.values():
+            try:
+                await adapter.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close {adapter.provider.value} adapter: {e}")
+        self._adapters.clear()
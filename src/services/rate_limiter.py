@@ -0,0 +1,349 @@
+"""
+Provider rate limiting for Orchesity IDE OSS
+Token buckets for requests-per-minute and tokens-per-minute per provider/model
+"""
+
+import asyncio
+import time
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from ..models import OrchestrationRequest, LLMProvider
+from ..core.config import Settings
+from .admission import AdmissionRejected
+from .metrics import MetricsService
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(AdmissionRejected):
+    """Raised when a provider's request or token budget is exhausted
+
+    `key` is the exhausted bucket: the provider ("openai") or one of its
+    models ("openai:gpt-4").
+    """
+
+    def __init__(
+        self, provider: LLMProvider, retry_after: float, key: Optional[str] = None
+    ):
+        super().__init__(
+            provider, "provider rate limit exhausted", retry_after, status_code=429
+        )
+        self.key = key or provider.value
+
+
+@dataclass
+class Limits:
+    """Per-minute limits for one bucket key; 0 disables a bucket"""
+
+    rpm: int = 0
+    tpm: int = 0
+
+
+@dataclass
+class RateLimitReservation:
+    """Tokens charged up front for a call, corrected once usage is known
+
+    `charged_tokens` is what the bucket was actually debited: the estimate,
+    capped at the TPM limit (and 0 without one).
+    """
+
+    key: str
+    provider: LLMProvider
+    limits: Limits
+    estimated_tokens: int
+    charged_tokens: int
+
+
+@dataclass
+class TokenBucket:
+    """Classic token bucket refilled continuously up to its capacity"""
+
+    capacity: float
+    tokens: float
+    updated_at: float
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens per second for a per-minute capacity"""
+        return self.capacity / 60.0
+
+    def refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (after refill)"""
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+
+def estimate_tokens(request: OrchestrationRequest) -> int:
+    """Pre-call token estimate: ~4 characters per prompt token plus max output"""
+    return len(request.prompt) // 4 + 1 + (request.max_tokens or 0)
+
+
+class RateLimitBackend(ABC):
+    """Storage for rate limit buckets"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limits: Limits, tokens: int) -> float:
+        """Charge one request and `tokens`; returns 0 on success or seconds to wait"""
+
+    @abstractmethod
+    async def adjust(
+        self, key: str, limits: Limits, delta: int, requests: int = 0
+    ) -> None:
+        """Correct the token bucket by `delta` and the request bucket by
+        `requests` (positive values refund)"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local buckets, suitable for a single worker"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = asyncio.Lock()
+
+    def _bucket(self, key: str, kind: str, capacity: int, now: float) -> TokenBucket:
+        bucket = self._buckets.get((key, kind))
+        if bucket is None or bucket.capacity != capacity:
+            bucket = TokenBucket(capacity=capacity, tokens=capacity, updated_at=now)
+            self._buckets[(key, kind)] = bucket
+        bucket.refill(now)
+        return bucket
+
+    async def acquire(self, key: str, limits: Limits, tokens: int) -> float:
+        async with self._lock:
+            now = time.monotonic()
+            charges = []
+            if limits.rpm > 0:
+                charges.append((self._bucket(key, "requests", limits.rpm, now), 1))
+            if limits.tpm > 0:
+                amount = min(tokens, limits.tpm)
+                charges.append((self._bucket(key, "tokens", limits.tpm, now), amount))
+
+            wait = max((b.wait_time(amount) for b, amount in charges), default=0.0)
+            if wait > 0:
+                return wait
+            for bucket, amount in charges:
+                bucket.tokens -= amount
+            return 0.0
+
+    async def adjust(
+        self, key: str, limits: Limits, delta: int, requests: int = 0
+    ) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if limits.tpm > 0 and delta:
+                bucket = self._bucket(key, "tokens", limits.tpm, now)
+                # May go negative: usage above the estimate is carried as debt
+                bucket.tokens = min(bucket.capacity, bucket.tokens + delta)
+            if limits.rpm > 0 and requests:
+                bucket = self._bucket(key, "requests", limits.rpm, now)
+                bucket.tokens = min(bucket.capacity, bucket.tokens + requests)
+
+
+# Both buckets live in one hash and are updated atomically, using the Redis
+# server clock so every worker sees the same refill timeline.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm, tpm, need = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(state[1]) or rpm
+local tok = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+if rpm > 0 then req = math.min(rpm, req + elapsed * rpm / 60) end
+if tpm > 0 then tok = math.min(tpm, tok + elapsed * tpm / 60) end
+if tpm > 0 then need = math.min(need, tpm) else need = 0 end
+local wait = 0
+if rpm > 0 and req < 1 then wait = (1 - req) * 60 / rpm end
+if tpm > 0 and tok < need then wait = math.max(wait, (need - tok) * 60 / tpm) end
+if wait == 0 then
+  if rpm > 0 then req = req - 1 end
+  tok = tok - need
+end
+redis.call('HSET', KEYS[1], 'req', req, 'tok', tok, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return tostring(wait)
+"""
+
+_ADJUST_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tpm, delta = tonumber(ARGV[1]), tonumber(ARGV[2])
+local rpm, requests = tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(state[1]) or rpm
+local tok = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+if rpm > 0 then req = math.min(rpm, req + elapsed * rpm / 60 + requests) end
+if tpm > 0 then tok = math.min(tpm, tok + elapsed * tpm / 60 + delta) end
+redis.call('HSET', KEYS[1], 'req', req, 'tok', tok, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return 1
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker through Redis"""
+
+    def __init__(self, client: redis.Redis, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._adjust = client.register_script(_ADJUST_SCRIPT)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RedisRateLimitBackend":
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            db=settings.redis_db,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            decode_responses=True,
+        )
+        return cls(client)
+
+    async def acquire(self, key: str, limits: Limits, tokens: int) -> float:
+        try:
+            wait = await self._acquire(
+                keys=[self._prefix + key], args=[limits.rpm, limits.tpm, tokens]
+            )
+            return float(wait)
+        except RedisError as e:
+            # Fail open: an unreachable limiter must not take the API down
+            logger.warning(f"Redis rate limit acquire failed for '{key}': {e}")
+            return 0.0
+
+    async def adjust(
+        self, key: str, limits: Limits, delta: int, requests: int = 0
+    ) -> None:
+        try:
+            await self._adjust(
+                keys=[self._prefix + key],
+                args=[limits.tpm, delta, limits.rpm, requests],
+            )
+        except RedisError as e:
+            logger.warning(f"Redis rate limit adjust failed for '{key}': {e}")
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class ProviderRateLimiter:
+    """RPM/TPM budgets per provider, optionally per provider model
+
+    Limits come from `provider_rpm_limits` / `provider_tpm_limits`, keyed by
+    provider ("openai") or provider and model ("openai:gpt-4"). A provider
+    that runs out of budget is reported unavailable until it refills, so the
+    orchestrator routes traffic elsewhere instead of collecting 429s.
+    An exhausted model bucket only blocks that model.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        backend: Optional[RateLimitBackend] = None,
+        metrics: Optional[MetricsService] = None,
+    ):
+        self.settings = settings
+        self.metrics = metrics
+        if backend is None:
+            if settings.provider_rate_limit_backend == "redis":
+                backend = RedisRateLimitBackend.from_settings(settings)
+            else:
+                backend = InMemoryRateLimitBackend()
+        self.backend = backend
+        # Bucket key -> when its budget has refilled enough for a request
+        self._blocked_until: Dict[str, float] = {}
+
+    def limits_for(
+        self, provider: LLMProvider, model: Optional[str] = None
+    ) -> Tuple[str, Limits]:
+        """Resolve the bucket key and limits for a provider/model"""
+        rpm_limits = self.settings.provider_rpm_limits
+        tpm_limits = self.settings.provider_tpm_limits
+        if model:
+            model_key = f"{provider.value}:{model}"
+            if model_key in rpm_limits or model_key in tpm_limits:
+                return model_key, Limits(
+                    rpm_limits.get(model_key, 0), tpm_limits.get(model_key, 0)
+                )
+        return provider.value, Limits(
+            rpm_limits.get(provider.value, 0), tpm_limits.get(provider.value, 0)
+        )
+
+    def is_available(self, provider: LLMProvider, model: Optional[str] = None) -> bool:
+        """Whether the provider's (or model's) budget was not exhausted on the
+        last attempt"""
+        key, _ = self.limits_for(provider, model)
+        return self._blocked_until.get(key, 0.0) <= time.time()
+
+    async def acquire(
+        self, provider: LLMProvider, request: OrchestrationRequest
+    ) -> Optional[RateLimitReservation]:
+        """Charge a request; raises RateLimitExceeded if the budget is exhausted"""
+        key, limits = self.limits_for(provider, request.model)
+        if not limits.rpm and not limits.tpm:
+            return None
+
+        tokens = estimate_tokens(request)
+        wait = await self.backend.acquire(key, limits, tokens)
+        if wait > 0:
+            self._blocked_until[key] = time.time() + wait
+            if self.metrics:
+                self.metrics.increment_counter("rate_limited")
+            raise RateLimitExceeded(provider, wait, key)
+
+        self._blocked_until.pop(key, None)
+        # Backends charge at most one bucket's worth of tokens
+        charged = min(tokens, limits.tpm) if limits.tpm > 0 else 0
+        return RateLimitReservation(key, provider, limits, tokens, charged)
+
+    async def reconcile(
+        self, reservation: Optional[RateLimitReservation], tokens_used: int
+    ) -> None:
+        """Correct the up-front token charge with the tokens actually used"""
+        if reservation is None:
+            return
+        delta = reservation.charged_tokens - tokens_used
+        if delta:
+            await self.backend.adjust(reservation.key, reservation.limits, delta)
+
+    async def refund(self, reservation: Optional[RateLimitReservation]) -> None:
+        """Give back the whole charge of a call that never reached the provider"""
+        if reservation is None:
+            return
+        await self.backend.adjust(
+            reservation.key, reservation.limits, reservation.charged_tokens, 1
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Buckets (providers or provider models) currently throttled and when
+        they become available"""
+        now = time.time()
+        return {
+            "backend": type(self.backend).__name__,
+            "throttled": {
+                key: round(until - now, 3)
+                for key, until in self._blocked_until.items()
+                if until > now
+            },
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
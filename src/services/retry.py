@@ -0,0 +1,114 @@
+"""
+Retry policy for Orchesity IDE OSS
+Exponential backoff with full jitter, Retry-After hints and a global retry budget
+"""
+
+import asyncio
+import random
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from .budget import RatioBudget
+from .deadline import Deadline
+from .metrics import MetricsService
+from .providers.base import ProviderError
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether calling the same provider again may succeed
+
+    Timeouts, throttling (408/429), 5xx and transport errors are transient.
+    Other client errors will fail again, and local refusals (admission,
+    rate limits, open circuits, deadlines) are not provider failures.
+    """
+    if isinstance(error, ProviderError):
+        if error.status_code is None:
+            return True
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    return False
+
+
+def should_fail_over(error: BaseException) -> bool:
+    """Whether another provider may serve a request this provider failed
+
+    Only provider failures that outlived their retries fail over; local
+    refusals are surfaced as backpressure instead (429/503 with Retry-After).
+    """
+    return is_retryable(error)
+
+
+class RetryPolicy:
+    """Retry transient provider failures without amplifying outages
+
+    Attempt `n` waits a random delay in `[0, min(max_delay, base_delay *
+    2**(n-1))]` (full jitter), or the provider's Retry-After hint if that is
+    longer. A hint above `max_delay`, a delay that would not fit in the
+    deadline or an empty retry budget ends the retries, leaving the caller
+    to fail over. Every call deposits into the shared `RatioBudget`, so
+    retries stay below its ratio of all calls system-wide.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RatioBudget,
+        metrics: Optional[MetricsService] = None,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.metrics = metrics
+        self._rng = rng
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number `attempt` (starting at 1)"""
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Delay before retrying `error`, or None if it should not be retried"""
+        delay = self.backoff(attempt)
+        hint = getattr(error, "retry_after", None)
+        if hint is not None:
+            if hint > self.max_delay:
+                return None
+            delay = max(delay, hint)
+        return delay
+
+    async def run(
+        self, call: Callable[[], Awaitable[T]], deadline: Deadline, label: str
+    ) -> T:
+        """Await `call()`, retrying transient failures within the deadline"""
+        self.budget.deposit()
+        attempt = 1
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.retry_delay(e, attempt)
+                if delay is None or delay >= deadline.remaining():
+                    raise
+                if not self.budget.try_spend():
+                    self._count("retry_budget_exhausted")
+                    raise
+                self._count("retries")
+                logger.warning(
+                    f"Retrying {label} in {delay:.2f}s "
+                    f"(attempt {attempt + 1}/{self.max_attempts}): {e}"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _count(self, name: str) -> None:
+        if self.metrics:
+            self.metrics.increment_counter(name)
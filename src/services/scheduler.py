@@ -0,0 +1,223 @@
+"""
+Fair scheduling for Orchesity IDE OSS
+Deficit round robin over per-session queues with strict priority classes
+"""
+
+import asyncio
+import time
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from ..models import RequestPriority
+from .admission import AdmissionRejected
+from .deadline import Deadline
+from .metrics import MetricsService
+
+
+logger = logging.getLogger(__name__)
+
+# Classes are served strictly in this order
+PRIORITY_ORDER = [RequestPriority.INTERACTIVE, RequestPriority.BATCH]
+
+# Metric series shared by every session without a configured weight
+OTHER_TENANTS = "other"
+
+
+@dataclass
+class _Waiter:
+    tenant: str
+    cost: float
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class FairScheduler:
+    """Admit orchestrations fairly across sessions
+
+    At most `max_concurrency` orchestrations run at once. Beyond that,
+    requests wait in one FIFO queue per tenant (session) and priority class.
+    Interactive requests are always dispatched before batch requests; within
+    a class, tenants take turns by deficit round robin: each turn adds
+    `quantum * weight` to a tenant's deficit, and the tenant runs requests
+    while the deficit covers their cost. A session firing hundreds of
+    requests therefore only gets its share instead of everyone's slots.
+
+    Sessions with a configured weight get their own queue depth and wait
+    time series; every other session is folded into one `other` series, so
+    client-chosen session ids cannot grow the metrics without bound.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        quantum: float = 1.0,
+        weights: Optional[Dict[str, float]] = None,
+        max_queue_per_tenant: int = 500,
+        metrics: Optional[MetricsService] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.quantum = quantum
+        self.weights = weights or {}
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self.metrics = metrics
+        self.in_flight = 0
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_ORDER
+        }
+        self._deficits: Dict[RequestPriority, Dict[str, float]] = {
+            priority: {} for priority in PRIORITY_ORDER
+        }
+        self._avg_hold_time = 1.0
+
+    def weight(self, tenant: str) -> float:
+        return self.weights.get(tenant, 1.0)
+
+    def metric_tenant(self, tenant: str) -> str:
+        """The series a session's metrics are published under"""
+        return tenant if tenant in self.weights else OTHER_TENANTS
+
+    def queue_depth(self, tenant: str) -> int:
+        return sum(len(queues.get(tenant, ())) for queues in self._queues.values())
+
+    @property
+    def queued(self) -> int:
+        return sum(
+            len(queue) for queues in self._queues.values() for queue in queues.values()
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tenant: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        cost: float = 1.0,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[None]:
+        """Hold a scheduling slot for the duration of one orchestration"""
+        if self.in_flight < self.max_concurrency and not self.queued:
+            # Nothing is waiting: run without yielding to the event loop
+            self.in_flight += 1
+            self._record_wait(tenant, 0.0)
+        else:
+            await self._wait_for_turn(tenant, priority, cost, deadline)
+
+        self._publish_in_flight()
+        started = time.time()
+        try:
+            yield
+        finally:
+            held = time.time() - started
+            self._avg_hold_time = 0.9 * self._avg_hold_time + 0.1 * held
+            self.in_flight -= 1
+            self._dispatch()
+            self._publish_in_flight()
+
+    async def _wait_for_turn(
+        self,
+        tenant: str,
+        priority: RequestPriority,
+        cost: float,
+        deadline: Optional[Deadline],
+    ) -> None:
+        """Queue until the scheduler hands this request a slot"""
+        if self.queue_depth(tenant) >= self.max_queue_per_tenant:
+            if self.metrics:
+                self.metrics.increment_counter("scheduler_rejected")
+            raise AdmissionRejected(
+                None,
+                f"too many queued requests for session {tenant}",
+                self._avg_hold_time
+                * (self.queue_depth(tenant) + 1)
+                / self.max_concurrency,
+                status_code=429,
+            )
+
+        waiter = _Waiter(tenant, cost, asyncio.get_running_loop().create_future())
+        self._queues[priority].setdefault(tenant, deque()).append(waiter)
+        self._publish_depth(tenant)
+        self._dispatch()
+        try:
+            if deadline:
+                await deadline.run(waiter.future, "scheduling")
+            else:
+                await waiter.future
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted a slot just as the caller gave up: hand it back
+                self.in_flight -= 1
+                self._dispatch()
+            else:
+                self._remove(priority, waiter)
+            raise
+
+        self._record_wait(tenant, time.time() - waiter.enqueued_at)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting requests in fair order"""
+        while self.in_flight < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                # Cancelled while queued; its caller is removing it
+                continue
+            self.in_flight += 1
+            waiter.future.set_result(None)
+            self._publish_depth(waiter.tenant)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in PRIORITY_ORDER:
+            queues = self._queues[priority]
+            deficits = self._deficits[priority]
+            while queues:
+                tenant, queue = next(iter(queues.items()))
+                head = queue[0]
+                if deficits.get(tenant, 0.0) >= head.cost:
+                    deficits[tenant] -= head.cost
+                    queue.popleft()
+                    if not queue:
+                        # An idle tenant does not bank credit for later
+                        del queues[tenant]
+                        deficits.pop(tenant, None)
+                    return head
+                # Out of credit: top up for the next turn and go to the back
+                deficits[tenant] = deficits.get(
+                    tenant, 0.0
+                ) + self.quantum * self.weight(tenant)
+                queues.move_to_end(tenant)
+        return None
+
+    def _remove(self, priority: RequestPriority, waiter: _Waiter) -> None:
+        queues = self._queues[priority]
+        queue = queues.get(waiter.tenant)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del queues[waiter.tenant]
+                self._deficits[priority].pop(waiter.tenant, None)
+        self._publish_depth(waiter.tenant)
+
+    def _record_wait(self, tenant: str, wait_time: float) -> None:
+        if not self.metrics:
+            return
+        self.metrics.record_histogram("scheduler_wait_time", wait_time)
+        name = f"scheduler_wait_time.{self.metric_tenant(tenant)}"
+        self.metrics.ensure_histogram(name)
+        self.metrics.record_histogram(name, wait_time)
+
+    def _publish_depth(self, tenant: str) -> None:
+        if not self.metrics:
+            return
+        series = self.metric_tenant(tenant)
+        if series == OTHER_TENANTS:
+            depth = self.queued - sum(self.queue_depth(t) for t in self.weights)
+        else:
+            depth = self.queue_depth(tenant)
+        self.metrics.set_gauge(f"scheduler_queue_depth.{series}", depth)
+
+    def _publish_in_flight(self) -> None:
+        if self.metrics:
+            self.metrics.set_gauge("scheduler_in_flight", self.in_flight)
@@ -0,0 +1,65 @@
+"""
+Single-flight request coalescing for Orchesity IDE OSS
+Concurrent callers with the same key share one in-flight call
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Call:
+    """An in-flight call and the number of callers awaiting it"""
+
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls keyed by an identifier
+
+    The first caller for a key originates the call; later callers await the
+    same task. A cancelled waiter only detaches itself - the shared call keeps
+    running for the others and is cancelled once nobody is waiting on it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn once per key; returns (result, shared) for this caller"""
+        call = self._calls.get(key)
+        shared = call is not None
+
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call) -> None:
+        """Drop a finished call so the next caller starts a fresh one"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            # Retrieve the exception so an unawaited failure is not logged twice
+            logger.debug(f"Single-flight call {key} failed: {call.task.exception()}")
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        return len(self._calls)
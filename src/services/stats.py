@@ -0,0 +1,221 @@
+"""
+Streaming statistics for Orchesity IDE OSS
+Constant-time, fixed-memory estimators for provider metrics
+"""
+
+import math
+import time
+from bisect import bisect_right, insort
+from typing import Callable, Dict, Iterable, Optional
+
+
+DEFAULT_QUANTILES = (0.5, 0.95)
+
+
+def window_alpha(window: int) -> float:
+    """Smoothing factor whose EMA has the same center of mass as a window mean"""
+    return 2.0 / (window + 1)
+
+
+class Ewma:
+    """Exponentially weighted moving mean and variance
+
+    Each update moves the mean `alpha` of the way towards the sample, so
+    older samples fade out geometrically. The variance uses the matching
+    incremental EWMA form, so neither needs the samples themselves.
+    """
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        diff = value - self.mean
+        step = self.alpha * diff
+        self.mean += step
+        self.variance = (1 - self.alpha) * (self.variance + diff * step)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def reset(self) -> None:
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+
+class DecayedAverage:
+    """Average whose samples lose half their weight every `half_life` seconds
+
+    Unlike an EMA, the weight of a sample depends on its age rather than on
+    how many samples came after it, so a burst of traffic does not wash out
+    what was seen a moment ago, and `weight` tells how much recent evidence
+    the average rests on. `mean`, `count` and `reset` match `Ewma`, so it can
+    back a provider metric in place of one.
+    """
+
+    __slots__ = ("half_life", "count", "_clock", "_total", "_weight", "_updated_at")
+
+    def __init__(self, half_life: float, clock: Callable[[], float] = time.monotonic):
+        if half_life <= 0:
+            raise ValueError(f"half_life must be positive, got {half_life}")
+        self.half_life = half_life
+        self._clock = clock
+        self.reset()
+
+    def _decay(self, now: float) -> None:
+        if self._updated_at is not None and now > self._updated_at:
+            factor = 0.5 ** ((now - self._updated_at) / self.half_life)
+            self._total *= factor
+            self._weight *= factor
+        self._updated_at = now
+
+    def update(self, value: float, now: Optional[float] = None) -> None:
+        self._decay(self._clock() if now is None else now)
+        self._total += value
+        self._weight += 1.0
+        self.count += 1
+
+    @property
+    def value(self) -> float:
+        return self._total / self._weight if self._weight else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.value
+
+    def weight(self, now: Optional[float] = None) -> float:
+        """Number of samples the average is worth at `now`"""
+        self._decay(self._clock() if now is None else now)
+        return self._weight
+
+    def reset(self) -> None:
+        self.count = 0
+        self._total = 0.0
+        self._weight = 0.0
+        self._updated_at: Optional[float] = None
+
+
+class P2Quantile:
+    """Streaming quantile estimate with the P² algorithm (Jain & Chlamtac)
+
+    Five markers track the minimum, the quantile, the maximum and two points
+    in between; each sample shifts marker positions and adjusts heights by
+    piecewise-parabolic interpolation. Memory and update cost are constant,
+    and the first five samples are answered exactly.
+    """
+
+    __slots__ = ("q", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, q: float):
+        if not 0 < q < 1:
+            raise ValueError(f"quantile must be in (0, 1), got {q}")
+        self.q = q
+        self.count = 0
+        self._heights: list = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value) - 1
+
+        positions = self._positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            offset = self._desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (
+                offset <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self) -> float:
+        if not self.count:
+            return 0.0
+        if self.count <= 5:
+            # Nearest rank over the samples seen so far
+            rank = max(1, math.ceil(self.q * self.count))
+            return self._heights[rank - 1]
+        return self._heights[2]
+
+
+class LatencyStats(Ewma):
+    """EWMA latency with streaming quantile sketches
+
+    `mean` and `variance` follow recent latency; `quantile(q)` reads the P²
+    estimate for each quantile chosen at construction.
+    """
+
+    __slots__ = ("sketches",)
+
+    def __init__(self, alpha: float, quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        super().__init__(alpha)
+        self.sketches: Dict[float, P2Quantile] = {q: P2Quantile(q) for q in quantiles}
+
+    def update(self, value: float) -> None:
+        super().update(value)
+        for sketch in self.sketches.values():
+            sketch.update(value)
+
+    def quantile(self, q: float) -> float:
+        sketch = self.sketches.get(q)
+        if sketch is None:
+            raise ValueError(f"quantile {q} is not tracked")
+        return sketch.value
+
+    @property
+    def p50(self) -> float:
+        return self.quantile(0.5)
+
+    @property
+    def p95(self) -> float:
+        return self.quantile(0.95)
+
+    def reset(self) -> None:
+        super().reset()
+        self.sketches = {q: P2Quantile(q) for q in self.sketches}
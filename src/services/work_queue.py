@@ -0,0 +1,164 @@
+"""
+Work queue for Orchesity IDE OSS
+Redis Streams queue that hands async orchestrations to separate worker processes
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from ..models import OrchestrationRequest
+from ..core.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueuedJob:
+    """An orchestration delivered to a worker, to be acknowledged when done"""
+
+    message_id: str
+    request_id: str
+    request: OrchestrationRequest
+    deliveries: int = 1
+
+
+class RedisWorkQueue:
+    """Redis Streams queue consumed through a consumer group
+
+    Every worker reads with its own consumer name, so each message goes to
+    one worker and stays pending until it is acknowledged. Messages left
+    pending by a worker that died are claimed by another worker once they
+    have been idle for `claim_idle_seconds`. Workers call `heartbeat` while
+    a job runs, so a live worker's long job is never claimed away.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        stream: str = "orchesity:jobs",
+        group: str = "orchesity-workers",
+        claim_idle_seconds: float = 60.0,
+    ):
+        self._client = client
+        self.stream = stream
+        self.group = group
+        self.claim_idle_seconds = claim_idle_seconds
+        self._group_ready = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RedisWorkQueue":
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            db=settings.redis_db,
+            max_connections=settings.redis_max_connections,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            decode_responses=True,
+        )
+        return cls(
+            client,
+            stream=settings.job_queue_stream,
+            claim_idle_seconds=settings.worker_claim_idle_seconds,
+        )
+
+    async def ensure_group(self) -> None:
+        """Create the stream and consumer group if they do not exist yet"""
+        if self._group_ready:
+            return
+        try:
+            await self._client.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, request_id: str, request: OrchestrationRequest) -> str:
+        """Add an orchestration to the queue; returns the stream message ID"""
+        await self.ensure_group()
+        return await self._client.xadd(
+            self.stream,
+            {"request_id": request_id, "request": request.model_dump_json()},
+        )
+
+    async def read(
+        self, consumer: str, count: int, block_ms: int = 1000
+    ) -> List[QueuedJob]:
+        """Claim stale messages from dead workers, then read new ones"""
+        await self.ensure_group()
+        jobs = await self._claim_stale(consumer, count)
+        if len(jobs) < count:
+            response = await self._client.xreadgroup(
+                self.group,
+                consumer,
+                {self.stream: ">"},
+                count=count - len(jobs),
+                block=block_ms,
+            )
+            for _, messages in response or []:
+                for message_id, fields in messages:
+                    job = await self._decode(message_id, fields)
+                    if job:
+                        jobs.append(job)
+        return jobs
+
+    async def _claim_stale(self, consumer: str, count: int) -> List[QueuedJob]:
+        response = await self._client.xautoclaim(
+            self.stream,
+            self.group,
+            consumer,
+            min_idle_time=int(self.claim_idle_seconds * 1000),
+            start_id="0-0",
+            count=count,
+        )
+        claimed = []
+        for message_id, fields in response[1]:
+            job = await self._decode(message_id, fields)
+            if job is None:
+                continue
+            pending = await self._client.xpending_range(
+                self.stream, self.group, min=message_id, max=message_id, count=1
+            )
+            if pending:
+                job.deliveries = pending[0]["times_delivered"]
+            logger.warning(
+                f"Reclaimed job {job.request_id} (delivery {job.deliveries})"
+            )
+            claimed.append(job)
+        return claimed
+
+    async def _decode(self, message_id: str, fields: dict) -> Optional[QueuedJob]:
+        try:
+            return QueuedJob(
+                message_id=message_id,
+                request_id=fields["request_id"],
+                request=OrchestrationRequest.model_validate_json(fields["request"]),
+            )
+        except (KeyError, ValueError) as e:
+            # Unreadable messages can never succeed; drop them from the group
+            logger.error(f"Dropping malformed queue message {message_id}: {e}")
+            await self.ack(message_id)
+            return None
+
+    async def heartbeat(self, consumer: str, message_id: str) -> None:
+        """Reset the idle time of a message this consumer is still working on"""
+        await self._client.xclaim(
+            self.stream,
+            self.group,
+            consumer,
+            min_idle_time=0,
+            message_ids=[message_id],
+            justid=True,
+        )
+
+    async def ack(self, message_id: str) -> None:
+        """Acknowledge a processed message so it is not redelivered"""
+        await self._client.xack(self.stream, self.group, message_id)
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,150 @@
+"""
+Orchestration worker for Orchesity IDE OSS
+Consumes queued async orchestrations and records their outcome as jobs
+"""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+from redis.exceptions import RedisError
+
+from ..models import OrchestrationRequest
+from .jobs import JobStatus, JobStore
+from .llm_orchestrator import LLMOrchestratorService
+from .work_queue import QueuedJob, RedisWorkQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_orchestration_job(
+    request_id: str,
+    request: OrchestrationRequest,
+    orchestrator: LLMOrchestratorService,
+    jobs: JobStore,
+) -> None:
+    """Run one async orchestration, recording its state transitions"""
+    try:
+        await jobs.update(request_id, JobStatus.RUNNING)
+        results, errors = await orchestrator.orchestrate(request)
+
+        await jobs.update(
+            request_id,
+            JobStatus.COMPLETED,
+            results=[result.model_dump(mode="json") for result in results],
+            errors=errors,
+        )
+        logger.info(
+            f"Async orchestration completed: {request_id} - "
+            f"{len(results)} results, {len(errors)} errors"
+        )
+
+    except Exception as e:
+        logger.error(f"Async orchestration failed: {request_id} - {e}")
+        await jobs.update(request_id, JobStatus.FAILED, error=str(e))
+
+
+class OrchestrationWorker:
+    """Pulls jobs from the work queue and runs up to `concurrency` at once
+
+    A message is acknowledged only after its outcome was stored, so a job
+    interrupted by a crash is redelivered to another worker. Jobs that were
+    delivered more than `max_deliveries` times are marked failed instead of
+    being retried forever. While a job runs, its message is claimed again
+    every third of the claim idle time, so other workers do not take over a
+    job that is merely slow. Redis errors are logged and retried after
+    `error_backoff` seconds instead of stopping the worker.
+    """
+
+    def __init__(
+        self,
+        orchestrator: LLMOrchestratorService,
+        queue: RedisWorkQueue,
+        jobs: JobStore,
+        consumer: str,
+        concurrency: int = 4,
+        max_deliveries: int = 3,
+        error_backoff: float = 1.0,
+    ):
+        self.orchestrator = orchestrator
+        self.queue = queue
+        self.jobs = jobs
+        self.consumer = consumer
+        self.concurrency = concurrency
+        self.max_deliveries = max_deliveries
+        self.error_backoff = error_backoff
+        self.processed = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Process jobs until `stop` is set, then finish the jobs in progress"""
+        stop = stop or asyncio.Event()
+        logger.info(
+            f"Worker {self.consumer} consuming {self.queue.stream} "
+            f"with concurrency {self.concurrency}"
+        )
+        try:
+            while not stop.is_set():
+                free = self.concurrency - len(self._tasks)
+                if free <= 0:
+                    await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    queued = await self.queue.read(self.consumer, free, block_ms=500)
+                except RedisError as e:
+                    logger.warning(f"Worker {self.consumer} failed to read jobs: {e}")
+                    await asyncio.sleep(self.error_backoff)
+                    continue
+
+                for job in queued:
+                    task = asyncio.create_task(self._process(job))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info(f"Worker {self.consumer} stopped after {self.processed} jobs")
+
+    async def _heartbeat(self, job: QueuedJob) -> None:
+        interval = self.queue.claim_idle_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.heartbeat(self.consumer, job.message_id)
+            except RedisError as e:
+                logger.warning(f"Heartbeat for job {job.request_id} failed: {e}")
+
+    async def _process(self, job: QueuedJob) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self._run(job)
+        finally:
+            heartbeat.cancel()
+        try:
+            await self.queue.ack(job.message_id)
+        except RedisError as e:
+            # Stays pending; whoever claims it next finds the outcome stored
+            logger.warning(f"Acknowledging job {job.request_id} failed: {e}")
+            return
+        self.processed += 1
+
+    async def _run(self, job: QueuedJob) -> None:
+        existing = await self.jobs.get(job.request_id)
+        if existing and existing.status.is_terminal:
+            # Finished before a crash prevented the acknowledgement
+            pass
+        elif job.deliveries > self.max_deliveries:
+            logger.error(
+                f"Giving up on job {job.request_id} after {job.deliveries} deliveries"
+            )
+            await self.jobs.update(
+                job.request_id,
+                JobStatus.FAILED,
+                error=f"abandoned after {job.deliveries} deliveries",
+            )
+        else:
+            await run_orchestration_job(
+                job.request_id, job.request, self.orchestrator, self.jobs
+            )
@@ -0,0 +1,82 @@
+"""
+Shared fixtures for Orchesity IDE OSS tests
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core.config import Settings
+from src.core.container import ServiceContainer
+from src.services.llm_orchestrator import LLMOrchestratorService
+from src.services.metrics import MetricsService
+from src.services.jobs import create_job_store
+from src.services.providers import ProviderAdapterRegistry
+from src.services.providers.mock_server import create_mock_app, mock_base_urls
+from src.routers import llm
+
+
+def make_settings(**overrides) -> Settings:
+    """Settings with every provider configured against the mock server"""
+    values = {
+        "openai_api_key": "test-key",
+        "anthropic_api_key": "test-key",
+        "gemini_api_key": "test-key",
+        "grok_api_key": "test-key",
+        "provider_base_urls": mock_base_urls(),
+        "lightweight_mode": True,
+        "enable_caching": False,
+        "max_concurrent_requests": 20,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.fixture
+def make_orchestrator(event_loop):
+    """Factory for initialized orchestrators backed by an in-process mock provider
+
+    Every orchestrator made is shut down after the test, closing its pooled
+    provider clients.
+    """
+    created = []
+
+    async def factory(mock_app=None, cache=None, **overrides):
+        settings = make_settings(**overrides)
+        mock_app = mock_app or create_mock_app(latency=0.0)
+        adapters = ProviderAdapterRegistry(
+            settings, transport=httpx.ASGITransport(app=mock_app)
+        )
+        metrics = MetricsService(settings)
+        await metrics.initialize()
+        orchestrator = LLMOrchestratorService(
+            settings, cache=cache, metrics=metrics, adapters=adapters
+        )
+        await orchestrator.initialize()
+        created.append(orchestrator)
+        return orchestrator
+
+    yield factory
+    for orchestrator in created:
+        event_loop.run_until_complete(orchestrator.shutdown())
+
+
+def make_api_app(orchestrator: LLMOrchestratorService) -> FastAPI:
+    """App serving the LLM router from the given orchestrator"""
+    container = ServiceContainer(
+        settings=orchestrator.settings,
+        metrics=orchestrator.metrics,
+        orchestrator=orchestrator,
+        jobs=create_job_store(orchestrator.settings),
+    )
+    app = FastAPI()
+    app.include_router(llm.create_router(container), prefix="/api/llm")
+    return app
+
+
+def make_api_client(orchestrator: LLMOrchestratorService) -> httpx.AsyncClient:
+    """HTTP client for the LLM router, served by the given orchestrator"""
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=make_api_app(orchestrator)),
+        base_url="http://testserver",
+    )
@@ -0,0 +1,214 @@
+"""
+Tests for the LLM orchestration API against the mock provider server
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.models import LLMProvider
+from src.services.providers.mock_server import create_mock_app
+
+from conftest import make_api_app, make_api_client
+
+
+def parse_sse(body: str):
+    """Decode a server-sent event stream into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_streams_server_sent_events(make_orchestrator):
+    """stream=true returns provider-tagged SSE events instead of 'processing'"""
+    orchestrator = await make_orchestrator(create_mock_app(latency=0.0))
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate",
+            json={
+                "prompt": "stream over http",
+                "providers": ["openai", "anthropic"],
+                "stream": True,
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert events[0][0] == "start" and events[0][1]["request_id"]
+    assert {data["provider"] for name, data in events if name == "token"} == {
+        "openai",
+        "anthropic",
+    }
+    assert [name for name, _ in events].count("done") == 2
+    assert events[-1][0] == "end"
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_returns_ndjson_results_as_they_finish(make_orchestrator):
+    """Accept: application/x-ndjson emits each result as soon as it is ready"""
+    app = create_mock_app(
+        latency={"openai": 0.15, "anthropic": 0.0, "gemini": 0.05},
+        failure_rate={"gemini": 1.0},
+    )
+    orchestrator = await make_orchestrator(app, failover_max_providers=0)
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate",
+            json={
+                "prompt": "progressive",
+                "providers": ["openai", "anthropic", "gemini"],
+            },
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["type"] for r in records] == ["result", "result", "summary"]
+    assert [r["result"]["provider"] for r in records[:2]] == ["anthropic", "openai"]
+
+    summary = records[-1]
+    assert summary["status"] == "completed" and summary["request_id"]
+    assert summary["results"] == 2
+    assert [e["provider"] for e in summary["errors"]] == ["gemini"]
+    assert summary["duration"] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_indexed_results_under_caps(make_orchestrator):
+    """Batch items run under the concurrency caps and come back keyed by index"""
+    app = create_mock_app(latency=0.02, failure_rate={"gemini": 1.0})
+    orchestrator = await make_orchestrator(
+        app, max_concurrent_requests=8, failover_max_providers=0
+    )
+    items = [{"prompt": f"item {i}", "providers": ["openai"]} for i in range(10)] + [
+        {"prompt": "broken", "providers": ["gemini"]}
+    ]
+
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate/batch",
+            json={"items": items, "max_concurrency": 4},
+        )
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    results, summary = records[:-1], records[-1]
+    assert sorted(r["index"] for r in results) == list(range(11))
+    assert summary["type"] == "summary" and summary["items"] == 11
+
+    gemini = next(r for r in results if r["index"] == 10)
+    assert gemini["status"] == "failed" and gemini["status_code"] == 502
+    assert gemini["errors"][0]["provider"] == "gemini"
+    assert summary["completed"] == 10 and summary["failed"] == 1
+    # openai's max_load is 2 and no call was rejected by admission control
+    assert app.state.peak_in_flight["openai"] == 2
+    assert app.state.request_counts["openai"] == 10
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_oversized_batches(make_orchestrator):
+    orchestrator = await make_orchestrator(batch_max_items=2)
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate/batch",
+            json={"items": [{"prompt": str(i)} for i in range(3)]},
+        )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_rejects_empty_selection_weights(make_orchestrator):
+    orchestrator = await make_orchestrator()
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate",
+            json={"prompt": "hi", "selection_weights": {}},
+        )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_rejects_unreachable_quorum(make_orchestrator):
+    orchestrator = await make_orchestrator()
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate",
+            json={"prompt": "hi", "providers": ["openai"], "mode": "quorum:2"},
+        )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_async_orchestration_results_are_retrievable(make_orchestrator):
+    """Background orchestrations store their results under the request id"""
+    orchestrator = await make_orchestrator(create_mock_app(latency=0.0))
+    async with make_api_client(orchestrator) as client:
+        response = await client.post(
+            "/api/llm/orchestrate",
+            json={"prompt": "in the background", "providers": ["openai", "grok"]},
+        )
+        assert response.status_code == 200
+        request_id = response.json()["request_id"]
+        assert response.json()["status"] == "queued"
+
+        status = await client.get(f"/api/llm/status/{request_id}", params={"wait": 5})
+        missing = await client.get("/api/llm/status/req_unknown")
+
+    assert status.status_code == 200
+    job = status.json()
+    assert job["status"] == "completed"
+    assert {r["provider"] for r in job["results"]} == {"openai", "grok"}
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_provider_calls(make_orchestrator):
+    """Closing the connection cancels in-flight calls and releases their slots"""
+    app = create_mock_app(latency=2.0)
+    orchestrator = await make_orchestrator(app)
+    api = make_api_app(orchestrator)
+
+    body = json.dumps({"prompt": "abandoned", "providers": ["openai"]}).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0.1)
+        return {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/llm/orchestrate",
+        "raw_path": b"/api/llm/orchestrate",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    started = asyncio.get_running_loop().time()
+    await api(scope, receive, send)
+
+    assert asyncio.get_running_loop().time() - started < 1.0
+    assert sent[0]["status"] == 499
+    assert app.state.in_flight["openai"] == 0
+    assert orchestrator.providers_load[LLMProvider.OPENAI].current_load == 0
+    assert orchestrator.scheduler.in_flight == 0
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["client_disconnects"] == 1
@@ -0,0 +1,111 @@
+"""
+Tests for offline batch runs over JSONL files
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.models import OrchestrationRequest
+
+from src.services.batch import BatchFileJob, BatchRunner
+from src.services.providers.mock_server import create_mock_app
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_batch_file_resumes_without_redoing_finished_items(
+    make_orchestrator, tmp_path
+):
+    """An interrupted run leaves a checkpoint that the next run continues from"""
+    orchestrator = await make_orchestrator()
+    source = tmp_path / "requests.jsonl"
+    output = tmp_path / "results.jsonl"
+    lines = [
+        json.dumps({"id": f"item-{i}", "prompt": f"p{i}", "providers": ["openai"]})
+        for i in range(5)
+    ]
+    source.write_text("\n".join(lines + ["{not json"]) + "\n")
+
+    # Items 0 and 1 finished before the previous run was killed mid-write
+    output.write_text(
+        json.dumps({"type": "result", "index": 0, "status": "completed"})
+        + "\n"
+        + json.dumps({"type": "result", "index": 1, "status": "failed"})
+        + "\n"
+        + '{"type": "result", "ind'
+    )
+
+    runner = BatchRunner(orchestrator, max_concurrency=2)
+    report = await BatchFileJob(runner, source, output).run()
+
+    assert report["skipped"] == 2
+    assert report["completed"] == 3 and report["failed"] == 1
+    assert report["latency_p50"] is not None and report["throughput"] > 0
+    records = read_records(output)
+    assert sorted(r["index"] for r in records) == [0, 1, 2, 3, 4, 5]
+    assert {r["id"] for r in records if r["index"] in (2, 3, 4)} == {
+        "item-2",
+        "item-3",
+        "item-4",
+    }
+    invalid = next(r for r in records if r["index"] == 5)
+    assert invalid["status"] == "failed" and invalid["status_code"] == 422
+
+    # Nothing is left, except the failed items when asked to retry them
+    report = await BatchFileJob(runner, source, output).run()
+    assert report["items"] == 0 and report["skipped"] == 6
+    report = await BatchFileJob(runner, source, output, retry_failed=True).run()
+    assert report["items"] == 2 and report["completed"] == 1
+    assert len(read_records(output)) == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_run_raises_when_dispatch_fails(make_orchestrator):
+    """A failing dispatcher ends the run instead of leaving it waiting"""
+    orchestrator = await make_orchestrator()
+    runner = BatchRunner(orchestrator, max_concurrency=2)
+    requests = [OrchestrationRequest(prompt=f"p{i}") for i in range(4)]
+
+    def groups(items):
+        yield items[:1]
+        raise RuntimeError("dispatch failed")
+
+    runner._groups = groups
+
+    async def consume():
+        return [record async for record in runner.run(requests)]
+
+    with pytest.raises(RuntimeError, match="dispatch failed"):
+        await asyncio.wait_for(consume(), 2.0)
+    assert orchestrator.scheduler is None or orchestrator.scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_file_reruns_items_every_provider_failed(
+    make_orchestrator, tmp_path
+):
+    """Items no provider answered are failures, and retried on request"""
+    orchestrator = await make_orchestrator(
+        mock_app=create_mock_app(latency=0.0, failure_rate=1.0)
+    )
+    source = tmp_path / "requests.jsonl"
+    output = tmp_path / "results.jsonl"
+    lines = [json.dumps({"prompt": f"p{i}", "providers": ["openai"]}) for i in range(2)]
+    source.write_text("\n".join(lines + ["[1, 2]"]) + "\n")
+
+    runner = BatchRunner(orchestrator, max_concurrency=2)
+    report = await BatchFileJob(runner, source, output).run()
+
+    assert report["completed"] == 0 and report["failed"] == 3
+    records = {r["index"]: r for r in read_records(output)}
+    assert records[0]["status"] == "failed" and records[0]["status_code"] == 502
+    assert records[0]["errors"]
+    assert records[2]["status"] == "failed" and records[2]["status_code"] == 422
+
+    report = await BatchFileJob(runner, source, output, retry_failed=True).run()
+    assert report["skipped"] == 0 and report["items"] == 3
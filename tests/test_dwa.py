@@ -0,0 +1,275 @@
+"""
+Tests for DWA provider ranking and selection
+"""
+
+import random
+import time
+
+import pytest
+
+from src.models import LLMProvider, OrchestrationRequest, SelectionWeights
+from src.services import dwa_strategies
+from src.services.DWA import (
+    AliasTable,
+    DynamicWeightAlgorithm,
+    ProviderMetrics,
+    SelectionPolicy,
+    choose_provider,
+)
+from src.services.columnar import VECTORIZED_STRATEGIES, ColumnarMetrics
+from src.services.providers.mock_server import create_mock_app
+
+
+def test_top_k_matches_repeated_selection_across_updates():
+    """The incremental index ranks like re-running choose_provider each time"""
+    rng = random.Random(3)
+    dwa = DynamicWeightAlgorithm(providers=list(LLMProvider))
+    names = list(dwa.provider_metrics)
+
+    for step in range(200):
+        if step % 50 == 0:
+            dwa.selection_policy = list(SelectionPolicy)[step // 50 % 4]
+        name = rng.choice(names)
+        dwa.record_request_result(name, rng.random() < 0.7, rng.uniform(0.1, 2.0))
+        dwa.sync_cost(name, rng.uniform(0.001, 0.02))
+
+        expected, remaining = [], dwa.get_active_providers()
+        while remaining:
+            best, _, _ = choose_provider(remaining, dwa.selection_policy)
+            expected.append(best)
+            remaining = [p for p in remaining if p.name != best]
+        assert dwa.select_top_k(len(names)) == expected
+
+    top = dwa.select_top_k(2, exclude=[expected[0]])
+    assert top == expected[1:3] and len(set(top)) == 2
+
+
+def test_index_is_reused_until_metrics_change_or_cooldown_ends():
+    """Lookups without updates do no work; cooled-down providers come back"""
+    dwa = DynamicWeightAlgorithm(
+        providers=[LLMProvider.OPENAI, LLMProvider.ANTHROPIC],
+        selection_policy=SelectionPolicy.MIN_LATENCY,
+    )
+    dwa.sync_speed("anthropic", 0.2)
+    assert dwa.select_top_k(1) == ["anthropic"]
+    generation, entries = dwa._index.generation, list(dwa._index.entries)
+    assert dwa.select_top_k(2) == ["anthropic", "openai"]
+    assert dwa._index.generation == generation and dwa._index.entries == entries
+
+    dwa.mark_unavailable("anthropic", until=time.time() + 0.05)
+    assert dwa.select_top_k(2) == ["openai"]
+    assert dwa.rank_providers(["anthropic", "openai"]) == ["openai", "anthropic"]
+    assert dwa.get_stats()["generation"] > generation
+
+    # The cooldown ending is noticed without a metrics update
+    time.sleep(0.06)
+    assert dwa.select_top_k(2) == ["anthropic", "openai"]
+
+
+def test_vectorized_scores_match_scalar_policies_and_strategies():
+    """Columnar scoring picks what choose_provider and the strategies compute"""
+    rng = random.Random(11)
+    store = ColumnarMetrics(capacity=4)
+    endpoints = []
+    for i in range(60):
+        endpoint = ProviderMetrics(
+            name=f"endpoint-{i}",
+            provider_type=LLMProvider.OPENAI,
+            cost=rng.choice([0.0, rng.uniform(0.001, 0.05)]),
+            speed=rng.uniform(0.1, 4.0),
+            accuracy=rng.random(),
+            availability=rng.choice([0.05, rng.random()]),
+            consecutive_failures=rng.choice([0, 0, 2, 6]),
+            last_success_time=rng.choice([None, time.time() - rng.uniform(0, 7200)]),
+        )
+        for _ in range(3):
+            endpoint.stats["accuracy"].update(rng.random())
+            endpoint.latency.update(rng.uniform(0.1, 4.0))
+        endpoints.append(endpoint)
+        store.upsert(endpoint)
+
+    now = time.time()
+    active = [e for e in endpoints if e.availability > 0.1]
+    for policy in list(SelectionPolicy)[:4]:
+        expected, _, _ = choose_provider(active, policy)
+        scores = store.policy_scores(policy.value)
+        assert store.top_k(scores, 1, now=now) == [expected]
+
+    for name, vectorized in VECTORIZED_STRATEGIES.items():
+        scalar = getattr(dwa_strategies, name)
+        weights = vectorized(store, now)
+        # reliability_first reads the clock itself, a moment after `now`
+        expected = [scalar(e) for e in endpoints]
+        assert weights.tolist() == pytest.approx(expected, rel=1e-4)
+
+
+@pytest.mark.asyncio
+async def test_selection_weights_rank_providers_per_request(make_orchestrator):
+    """A request's weight vector overrides the policy for that request only"""
+    orchestrator = await make_orchestrator(create_mock_app(latency=0.0))
+    dwa = orchestrator.dwa
+    dwa.selection_policy = SelectionPolicy.MAX_ACCURACY
+    dwa.sync_cost("gemini", 0.0001)
+    dwa.sync_speed("anthropic", 0.01)
+    dwa.set_custom_weighting_strategy(dwa_strategies.cost_optimized_strategy)
+    assert max(dwa.get_weights().items(), key=lambda kv: kv[1])[0] == "gemini"
+
+    providers = [LLMProvider.OPENAI, LLMProvider.ANTHROPIC, LLMProvider.GEMINI]
+    cheap = OrchestrationRequest(
+        prompt="cheap",
+        providers=providers,
+        mode="hedged",
+        selection_weights=SelectionWeights(cost=1.0),
+    )
+    fast = cheap.model_copy(update={"selection_weights": SelectionWeights(speed=1.0)})
+
+    assert orchestrator._select_providers(providers, weights=cheap.selection_weights)[
+        0
+    ] == (LLMProvider.GEMINI)
+    assert orchestrator._select_providers(providers, weights=fast.selection_weights)[
+        0
+    ] == (LLMProvider.ANTHROPIC)
+    results, _ = await orchestrator.orchestrate(fast)
+    assert results[0].provider == LLMProvider.ANTHROPIC
+
+
+def test_round_robin_rotates_through_healthy_providers():
+    """Round robin starts each selection at the next provider"""
+    dwa = DynamicWeightAlgorithm(
+        providers=list(LLMProvider), selection_policy=SelectionPolicy.ROUND_ROBIN
+    )
+    names = list(dwa.provider_metrics)
+
+    picks = [dwa.select_best_provider() for _ in range(2 * len(names))]
+    assert picks == names + names
+    providers = list(dwa.provider_metrics.values())
+    assert [
+        choose_provider(providers, dwa.selection_policy, i)[0] for i in range(4)
+    ] == names
+
+    for _ in range(5):
+        dwa.record_request_result(names[1], False, 1.0)
+    picks = [dwa.select_best_provider() for _ in range(len(names) - 1)]
+    assert sorted(picks) == sorted(set(names) - {names[1]})
+
+
+@pytest.mark.parametrize(
+    "policy", [SelectionPolicy.THOMPSON_SAMPLING, SelectionPolicy.UCB1]
+)
+def test_bandit_policies_explore_then_favor_best_provider(policy):
+    """Every provider gets tried, then most traffic goes to the best one"""
+    rng = random.Random(7)
+    dwa = DynamicWeightAlgorithm(
+        providers=list(LLMProvider), selection_policy=policy, rng=random.Random(7)
+    )
+    # provider -> (success probability, latency)
+    behaviour = {
+        "openai": (0.95, 1.0),
+        "anthropic": (0.99, 0.4),
+        "gemini": (0.6, 0.8),
+        "grok": (0.8, 2.0),
+    }
+
+    picks = {name: 0 for name in behaviour}
+    for _ in range(400):
+        name = dwa.select_best_provider()
+        success_rate, latency = behaviour[name]
+        dwa.record_request_result(name, rng.random() < success_rate, latency)
+        picks[name] += 1
+
+    assert all(count > 0 for count in picks.values())
+    assert max(picks, key=picks.get) == "anthropic"
+    assert picks["anthropic"] > 200
+    assert dwa.provider_metrics["anthropic"].pulls == picks["anthropic"]
+
+
+def test_alias_table_samples_in_proportion_to_weights():
+    """Draw frequencies follow the weights; zero weights are never drawn"""
+    weights = {"a": 1.0, "b": 2.0, "c": 7.0, "d": 0.0, "e": -1.0}
+    table = AliasTable(weights)
+    rng = random.Random(5)
+    draws = 50000
+    counts = {name: 0 for name in weights}
+    for _ in range(draws):
+        counts[table.sample(rng)] += 1
+
+    assert counts["d"] == counts["e"] == 0
+    for name in ("a", "b", "c"):
+        assert counts[name] / draws == pytest.approx(weights[name] / 10, abs=0.01)
+
+    uniform = AliasTable({"a": 0.0, "b": 0.0})
+    assert {uniform.sample(rng) for _ in range(100)} == {"a", "b"}
+
+
+def test_weighted_random_follows_strategy_and_rebuilds_lazily():
+    """Selections spread by weight; the table is rebuilt only on changes"""
+    dwa = DynamicWeightAlgorithm(
+        providers=list(LLMProvider),
+        selection_policy=SelectionPolicy.WEIGHTED_RANDOM,
+        rng=random.Random(9),
+    )
+    shares = {"openai": 0.1, "anthropic": 0.2, "gemini": 0.3, "grok": 0.4}
+    dwa.set_custom_weighting_strategy(lambda p: shares[p.name])
+
+    counts = {name: 0 for name in shares}
+    for _ in range(20000):
+        counts[dwa.select_best_provider()] += 1
+    for name, share in shares.items():
+        assert counts[name] / 20000 == pytest.approx(share, abs=0.015)
+
+    table = dwa._alias_table()
+    dwa.select_top_k(2)
+    assert dwa._alias_table() is table
+    dwa.record_request_result("grok", True, 0.5)
+    dwa.select_top_k(2)
+    assert dwa._alias_table() is not table
+
+    picks = dwa.select_top_k(4, exclude=["grok"])
+    assert sorted(picks) == ["anthropic", "gemini", "openai"]
+    assert dwa.rank_providers(["gemini", "openai"]) in (
+        ["gemini", "openai"],
+        ["openai", "gemini"],
+    )
+
+    dwa.set_custom_weighting_strategy(dwa_strategies.balanced_strategy)
+    assert dwa._alias_table().weights == pytest.approx(
+        {
+            name: dwa_strategies.balanced_strategy(p)
+            for name, p in dwa.provider_metrics.items()
+        }
+    )
+
+
+def test_empty_selection_weights_keep_the_routing_policy():
+    """`selection_weights: {}` is rejected; zero weights fall back to the policy"""
+    with pytest.raises(ValueError, match="selection weight"):
+        OrchestrationRequest(prompt="hi", selection_weights={})
+
+    dwa = DynamicWeightAlgorithm(
+        providers=list(LLMProvider), selection_policy=SelectionPolicy.MIN_COST
+    )
+    dwa.sync_cost("grok", 0.001)
+    zero = {"cost": 0.0, "speed": 0.0, "accuracy": 0.0, "availability": 0.0}
+    assert dwa.select_top_k(1, weights=zero) == ["grok"]
+
+
+def test_vectorized_weighted_random_uses_the_weighting_strategy():
+    """Vectorized sampling follows the strategy weights the DWA samples by"""
+    dwa = DynamicWeightAlgorithm(
+        providers=list(LLMProvider), selection_policy=SelectionPolicy.WEIGHTED_RANDOM
+    )
+    dwa.sync_cost("grok", 0.0001)
+    dwa.set_custom_weighting_strategy(dwa_strategies.cost_optimized_strategy)
+    expected = dwa._alias_table().weights
+    total = sum(expected.values())
+
+    store = dwa.columns
+    counts = {name: 0 for name in store.names}
+    for _ in range(5000):
+        scores = store.policy_scores("weighted_random", "cost_optimized_strategy")
+        counts[store.top_k(scores, 1)[0]] += 1
+    for name, weight in expected.items():
+        assert counts[name] / 5000 == pytest.approx(weight / total, abs=0.02)
+
+    with pytest.raises(ValueError, match="round_robin"):
+        store.policy_scores("round_robin")
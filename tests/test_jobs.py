@@ -0,0 +1,208 @@
+"""
+Tests for async job tracking
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.jobs import InMemoryJobStore, JobStatus, new_request_id
+
+
+def test_request_ids_are_unique():
+    ids = {new_request_id() for _ in range(1000)}
+    assert len(ids) == 1000
+    assert all(request_id.startswith("req_") for request_id in ids)
+
+
+@pytest.mark.asyncio
+async def test_memory_store_long_poll_and_ttl():
+    """wait() returns as soon as the job finishes; jobs expire after the TTL"""
+    store = InMemoryJobStore(ttl=0.2)
+    await store.create("job-1")
+
+    async def finish():
+        await asyncio.sleep(0.05)
+        await store.update("job-1", JobStatus.RUNNING)
+        await asyncio.sleep(0.05)
+        await store.update("job-1", JobStatus.COMPLETED, results=[{"response": "ok"}])
+
+    started = asyncio.get_running_loop().time()
+    asyncio.create_task(finish())
+    job = await store.wait("job-1", timeout=5)
+    assert asyncio.get_running_loop().time() - started < 1
+    assert job.status == JobStatus.COMPLETED and job.results == [{"response": "ok"}]
+
+    # A wait on an unfinished job gives up after the timeout
+    await store.create("job-2")
+    assert (await store.wait("job-2", timeout=0.05)).status == JobStatus.QUEUED
+
+    # Timed-out waiters leave no change events behind
+    assert not store._changed and not store._waiters
+
+    await asyncio.sleep(0.25)
+    assert await store.get("job-1") is None
+    assert not store._expires_at and not store._expiry_heap
+
+
+@pytest.mark.asyncio
+async def test_redis_store_long_poll():
+    """Redis-backed jobs are shared across stores and wake waiters via pub/sub"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.services.jobs import RedisJobStore
+
+    server = fakeredis.FakeServer()
+    writer, reader = (
+        RedisJobStore(
+            fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), ttl=60
+        )
+        for _ in range(2)
+    )
+    await writer.create("job-1")
+    assert (await reader.get("job-1")).status == JobStatus.QUEUED
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        await writer.update("job-1", JobStatus.FAILED, error="boom")
+
+    asyncio.create_task(fail())
+    job = await reader.wait("job-1", timeout=5)
+    assert job.status == JobStatus.FAILED and job.error == "boom"
+    assert await reader.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_queue_and_reclaims_dead_consumers(make_orchestrator):
+    """Workers ack finished jobs and pick up jobs a crashed worker left pending"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.models import OrchestrationRequest, LLMProvider
+    from src.services.work_queue import RedisWorkQueue
+    from src.services.worker import OrchestrationWorker
+
+    orchestrator = await make_orchestrator()
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    queue = RedisWorkQueue(client, claim_idle_seconds=0.05)
+    jobs = InMemoryJobStore(ttl=60)
+
+    for i in range(3):
+        request_id = new_request_id()
+        await jobs.create(request_id)
+        await queue.enqueue(
+            request_id,
+            OrchestrationRequest(prompt=f"queued {i}", providers=[LLMProvider.OPENAI]),
+        )
+
+    # A worker that crashes after taking a job without acknowledging it
+    [abandoned] = await queue.read("crashed-worker", 1, block_ms=10)
+    await asyncio.sleep(0.1)
+
+    worker = OrchestrationWorker(
+        orchestrator, queue, jobs, consumer="worker-1", concurrency=2
+    )
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop))
+    for _ in range(100):
+        if worker.processed == 3:
+            break
+        await asyncio.sleep(0.02)
+    stop.set()
+    await run
+
+    assert worker.processed == 3
+    assert (await jobs.get(abandoned.request_id)).status == JobStatus.COMPLETED
+    pending = await client.xpending(queue.stream, queue.group)
+    assert pending["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_heartbeat_keeps_long_jobs_from_being_reclaimed(
+    make_orchestrator,
+):
+    """A job running longer than the claim idle time stays with its worker"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.models import OrchestrationRequest, LLMProvider
+    from src.services.providers.mock_server import create_mock_app
+    from src.services.work_queue import RedisWorkQueue
+    from src.services.worker import OrchestrationWorker
+
+    app = create_mock_app(latency=0.4)
+    orchestrator = await make_orchestrator(app)
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    queue = RedisWorkQueue(client, claim_idle_seconds=0.1)
+    jobs = InMemoryJobStore(ttl=60)
+    request_id = new_request_id()
+    await jobs.create(request_id)
+    await queue.enqueue(
+        request_id, OrchestrationRequest(prompt="slow", providers=[LLMProvider.OPENAI])
+    )
+
+    worker = OrchestrationWorker(orchestrator, queue, jobs, consumer="worker-1")
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop))
+    await asyncio.sleep(0.25)
+    [entry] = await client.xpending_range(
+        queue.stream, queue.group, min="-", max="+", count=1
+    )
+    assert entry["times_delivered"] == 1
+    assert await queue.read("worker-2", 1, block_ms=10) == []
+    for _ in range(50):
+        if worker.processed:
+            break
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.1)
+    stop.set()
+    await run
+
+    assert worker.processed == 1
+    assert (await jobs.get(request_id)).status == JobStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_redis_errors(make_orchestrator):
+    """A failed read or ack is retried instead of stopping the worker"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis.exceptions import ConnectionError
+    from src.models import OrchestrationRequest, LLMProvider
+    from src.services.work_queue import RedisWorkQueue
+    from src.services.worker import OrchestrationWorker
+
+    orchestrator = await make_orchestrator()
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    queue = RedisWorkQueue(client, claim_idle_seconds=0.05)
+    jobs = InMemoryJobStore(ttl=60)
+    request_id = new_request_id()
+    await jobs.create(request_id)
+    await queue.enqueue(
+        request_id, OrchestrationRequest(prompt="blip", providers=[LLMProvider.OPENAI])
+    )
+
+    failures = {"read": 1, "ack": 1}
+
+    def flaky(name):
+        method = getattr(queue, name)
+
+        async def call(*args, **kwargs):
+            if failures[name]:
+                failures[name] -= 1
+                raise ConnectionError(f"{name} blip")
+            return await method(*args, **kwargs)
+
+        return call
+
+    queue.read, queue.ack = flaky("read"), flaky("ack")
+    worker = OrchestrationWorker(
+        orchestrator, queue, jobs, consumer="worker-1", error_backoff=0.01
+    )
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop))
+    for _ in range(100):
+        if worker.processed:
+            break
+        await asyncio.sleep(0.02)
+    stop.set()
+    await run
+
+    assert worker.processed == 1
+    assert (await jobs.get(request_id)).status == JobStatus.COMPLETED
+    pending = await client.xpending(queue.stream, queue.group)
+    assert pending["pending"] == 0
@@ -0,0 +1,400 @@
+"""
+Tests for orchestration request paths and modes
+"""
+
+import asyncio
+
+import pytest
+
+from src.models import (
+    PATTERN_MAX_INPUT,
+    OrchestrationRequest,
+    LLMProvider,
+    QualityCheck,
+)
+from src.services.cascade import check_answer
+from src.services.DWA import SelectionPolicy
+from src.services.providers.mock_server import create_mock_app
+from src.services.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced(make_orchestrator):
+    """Concurrent identical prompts share a single provider call"""
+    app = create_mock_app(latency=0.05)
+    orchestrator = await make_orchestrator(app)
+    request = OrchestrationRequest(prompt="same prompt", providers=[LLMProvider.GROK])
+
+    outcomes = await asyncio.gather(
+        *(orchestrator.orchestrate(request) for _ in range(5))
+    )
+
+    assert all(len(results) == 1 for results, _ in outcomes)
+    assert app.state.request_counts["grok"] == 1
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["singleflight_originated"] == 1
+    assert counters["singleflight_coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_singleflight_waiter_cancellation_is_isolated():
+    """Cancelling one waiter leaves the shared call running for the others"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ("done", True)
+    assert calls == 1
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_uses_faster_backup(make_orchestrator):
+    """A slow primary is hedged to the next-best provider, which wins"""
+    app = create_mock_app(latency={"openai": 1.0, "anthropic": 0.0})
+    orchestrator = await make_orchestrator(
+        app, hedge_default_delay=0.05, hedge_max_extra_ratio=1.0
+    )
+    request = OrchestrationRequest(
+        prompt="hedge me",
+        providers=[LLMProvider.OPENAI, LLMProvider.ANTHROPIC],
+        mode="hedged",
+    )
+
+    results, errors = await asyncio.wait_for(orchestrator.orchestrate(request), 0.5)
+
+    assert [r.provider for r in results] == [LLMProvider.ANTHROPIC]
+    assert errors == []
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["hedge_fired"] == 1
+    assert counters["hedge_won"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_limits_extra_calls(make_orchestrator):
+    """With no hedge budget the request waits for the primary alone"""
+    app = create_mock_app(latency={"openai": 0.1, "anthropic": 0.0})
+    orchestrator = await make_orchestrator(
+        app, hedge_default_delay=0.01, hedge_max_extra_ratio=0.0
+    )
+    request = OrchestrationRequest(
+        prompt="no budget",
+        providers=[LLMProvider.OPENAI, LLMProvider.ANTHROPIC],
+        mode="hedged",
+    )
+
+    results, _ = await orchestrator.orchestrate(request)
+
+    assert [r.provider for r in results] == [LLMProvider.OPENAI]
+    assert app.state.request_counts["anthropic"] == 0
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["hedge_budget_exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_first_mode_returns_fastest_and_cancels_losers(make_orchestrator):
+    """mode=first returns the first success and cancels the slower providers"""
+    app = create_mock_app(latency={"openai": 1.0, "gemini": 1.0, "grok": 0.0})
+    orchestrator = await make_orchestrator(app)
+    request = OrchestrationRequest(
+        prompt="race",
+        providers=[LLMProvider.OPENAI, LLMProvider.GEMINI, LLMProvider.GROK],
+        mode="first",
+    )
+
+    results, errors = await asyncio.wait_for(orchestrator.orchestrate(request), 0.5)
+
+    assert [r.provider for r in results] == [LLMProvider.GROK]
+    assert errors == []
+    assert orchestrator.metrics.get_all_metrics()["counters"]["race_cancelled"] == 2
+    assert orchestrator.dwa.provider_metrics["openai"].consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_quorum_mode_waits_for_n_successes(make_orchestrator):
+    """mode=quorum:N skips failures and returns after N successes"""
+    app = create_mock_app(
+        latency={"openai": 0.0, "anthropic": 0.02, "gemini": 0.04, "grok": 1.0},
+        failure_rate={"openai": 1.0},
+    )
+    orchestrator = await make_orchestrator(app)
+    request = OrchestrationRequest(
+        prompt="quorum", providers=list(LLMProvider), mode="quorum:2"
+    )
+
+    results, errors = await asyncio.wait_for(orchestrator.orchestrate(request), 0.5)
+
+    assert {r.provider for r in results} == {
+        LLMProvider.ANTHROPIC,
+        LLMProvider.GEMINI,
+    }
+    assert [e["provider"] for e in errors] == ["openai"]
+
+
+@pytest.mark.asyncio
+async def test_fallback_mode_walks_ranked_chain(make_orchestrator):
+    """mode=fallback tries one provider at a time, cutting off slow hops"""
+    app = create_mock_app(
+        latency={"openai": 1.0, "anthropic": 0.0, "gemini": 0.0},
+        failure_rate={"anthropic": 1.0},
+    )
+    orchestrator = await make_orchestrator(
+        app, retry_max_attempts=1, fallback_hop_timeout=0.1
+    )
+    dwa = orchestrator.dwa
+    dwa.selection_policy = SelectionPolicy.MIN_LATENCY
+    for name, speed in [("openai", 0.1), ("anthropic", 0.2), ("gemini", 0.3)]:
+        dwa.sync_speed(name, speed)
+    request = OrchestrationRequest(
+        prompt="keep trying",
+        providers=[LLMProvider.GEMINI, LLMProvider.ANTHROPIC, LLMProvider.OPENAI],
+        mode="fallback",
+    )
+
+    results, errors = await asyncio.wait_for(orchestrator.orchestrate(request), 0.5)
+
+    assert [r.provider for r in results] == [LLMProvider.GEMINI]
+    assert [e["provider"] for e in errors] == ["openai", "anthropic"]
+    # A hop timeout is a provider failure, not the request's deadline
+    assert "timed out" in errors[0]["error"].lower()
+    assert "deadline_exceeded" not in errors[0]
+    # Each hop is recorded once, by the fallback chain
+    assert dwa.provider_metrics["openai"].consecutive_failures == 1
+    assert dwa.provider_metrics["anthropic"].consecutive_failures == 1
+    assert dwa.provider_metrics["gemini"].latency.count == 2
+    assert app.state.request_counts["gemini"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_hop_timeouts_do_not_time_out_the_request(make_orchestrator):
+    """Slow hops fail like providers; only the request deadline raises"""
+    app = create_mock_app(latency=1.0)
+    orchestrator = await make_orchestrator(
+        app, retry_max_attempts=1, fallback_hop_timeout=0.05
+    )
+    request = OrchestrationRequest(
+        prompt="too slow",
+        providers=[LLMProvider.OPENAI, LLMProvider.ANTHROPIC],
+        mode="fallback",
+    )
+
+    results, errors = await asyncio.wait_for(orchestrator.orchestrate(request), 0.5)
+
+    assert not results
+    assert len(errors) == 2
+    assert not any(e.get("deadline_exceeded") for e in errors)
+
+
+@pytest.mark.asyncio
+async def test_fallback_rate_limit_rejections_leave_dwa_metrics(make_orchestrator):
+    """Our own throttling moves the chain on without blaming the provider"""
+    orchestrator = await make_orchestrator(
+        create_mock_app(latency=0.0), provider_rpm_limits={"openai": 1}
+    )
+    dwa = orchestrator.dwa
+    dwa.selection_policy = SelectionPolicy.MIN_LATENCY
+    dwa.sync_speed("openai", 0.1)
+    dwa.sync_speed("anthropic", 0.2)
+    providers = [LLMProvider.OPENAI, LLMProvider.ANTHROPIC]
+
+    await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="first", providers=providers, mode="fallback")
+    )
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="second", providers=providers, mode="fallback")
+    )
+
+    assert [r.provider for r in results] == [LLMProvider.ANTHROPIC]
+    assert errors[0]["provider"] == "openai" and errors[0]["rejected"]
+    assert dwa.provider_metrics["openai"].consecutive_failures == 0
+    assert (
+        dwa.provider_metrics["openai"].successes == dwa.provider_metrics["openai"].pulls
+    )
+
+
+@pytest.mark.asyncio
+async def test_cascade_ranks_tiers_by_priced_token_usage(make_orchestrator):
+    """Cost is synced from token usage, so the cheaper provider answers first"""
+    orchestrator = await make_orchestrator(
+        create_mock_app(latency=0.0),
+        provider_token_prices={"openai": 0.03, "anthropic": 0.001},
+    )
+    providers = [LLMProvider.OPENAI, LLMProvider.ANTHROPIC]
+    await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="warm up", providers=providers)
+    )
+    dwa = orchestrator.dwa
+    assert dwa.provider_metrics["openai"].cost > dwa.provider_metrics["anthropic"].cost
+    dwa.sync_speed("openai", 0.01)
+
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="cheap first", providers=providers, mode="cascade")
+    )
+    assert [r.provider for r in results] == [LLMProvider.ANTHROPIC]
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_only_when_quality_check_fails(make_orchestrator):
+    """mode=cascade answers from the cheapest tier unless its answer is rejected"""
+    app = create_mock_app(
+        latency=0.0, responses={"openai": "Sure! Here it is", "anthropic": '{"a": 1}'}
+    )
+    orchestrator = await make_orchestrator(app)
+    for name, cost in [("openai", 0.001), ("anthropic", 0.002), ("gemini", 0.003)]:
+        orchestrator.dwa.sync_cost(name, cost)
+    providers = [LLMProvider.GEMINI, LLMProvider.ANTHROPIC, LLMProvider.OPENAI]
+
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="chat", providers=providers, mode="cascade")
+    )
+    assert [r.provider for r in results] == [LLMProvider.OPENAI] and not errors
+
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(
+            prompt="json please",
+            providers=providers,
+            mode="cascade",
+            quality_check={"require_json": True},
+        )
+    )
+    assert [r.provider for r in results] == [LLMProvider.ANTHROPIC]
+    assert errors[0]["provider"] == "openai" and errors[0]["quality_check_failed"]
+    assert app.state.request_counts["gemini"] == 0
+
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["cascade_requests"] == 2
+    assert counters["cascade_escalations"] == 1
+    assert counters["cascade_answered.tier1"] == 1
+    assert counters["cascade_answered.tier2"] == 1
+    latency = orchestrator.metrics.get_metric_summary("cascade_tier_latency.tier1")
+    assert latency["count"] == 2
+
+
+def test_quality_check_rules():
+    """Answers are checked for emptiness, length, JSON and a pattern"""
+    assert check_answer("  ", QualityCheck()) == "answer is empty"
+    assert check_answer("hello", QualityCheck(max_length=3))
+    assert (
+        check_answer('```json\n{"a": 1}\n```', QualityCheck(require_json=True)) is None
+    )
+    assert check_answer("{a: 1}", QualityCheck(require_json=True))
+    assert check_answer("def f(): pass", QualityCheck(pattern=r"def \w+")) is None
+    assert check_answer("no code", QualityCheck(pattern=r"def \w+"))
+    with pytest.raises(ValueError):
+        QualityCheck(pattern="(")
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(a|aa)*b", r"((ab)*c)+", "a" * 201])
+def test_quality_check_refuses_backtracking_patterns(pattern):
+    """Patterns that can backtrack exponentially, or are too long, are refused"""
+    with pytest.raises(ValueError):
+        QualityCheck(pattern=pattern)
+
+
+def test_quality_check_pattern_limits_keep_matching_bounded():
+    for pattern in (r"^(?:def|class) \w+", r"(ab)+", r"[(+]+\)", r"\(a+\)+"):
+        QualityCheck(pattern=pattern)
+    # Only the start of a long answer is searched
+    answer = "x" * PATTERN_MAX_INPUT + " def f"
+    assert check_answer(answer, QualityCheck(pattern=r"def \w+"))
+
+
+@pytest.mark.asyncio
+async def test_consensus_returns_at_quorum_or_falls_back(make_orchestrator):
+    """mode=consensus stops once enough answers agree, else picks a plurality"""
+    app = create_mock_app(
+        latency={"gemini": 0.0, "openai": 0.02, "anthropic": 0.04, "grok": 1.0},
+        responses={
+            "gemini": "London",
+            "openai": "Paris.",
+            "anthropic": " paris",
+            "grok": "Rome",
+        },
+    )
+    orchestrator = await make_orchestrator(app)
+    providers = list(LLMProvider)
+
+    results, _ = await asyncio.wait_for(
+        orchestrator.orchestrate(
+            OrchestrationRequest(
+                prompt="capital?", providers=providers, mode="consensus:2"
+            )
+        ),
+        0.5,
+    )
+    assert [r.provider for r in results] == [LLMProvider.OPENAI, LLMProvider.ANTHROPIC]
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["consensus_reached"] == 1 and counters["race_cancelled"] == 1
+
+    # A majority of four needs three matching answers; none is reached
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="capital?", providers=providers, mode="consensus")
+    )
+    assert [r.provider for r in results] == [LLMProvider.OPENAI, LLMProvider.ANTHROPIC]
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["consensus_fallback"] == 1
+
+
+def test_mode_validation():
+    """Modes are validated, including the quorum count"""
+    providers = list(LLMProvider)[:3]
+    request = OrchestrationRequest(prompt="x", providers=providers, mode="quorum:3")
+    assert request.parse_mode()[1] == 3
+    assert OrchestrationRequest(prompt="x", mode="consensus").parse_mode()[1] is None
+    for bad in ["quorum", "quorum:0", "first:2", "fastest", "consensus:0"]:
+        with pytest.raises(ValueError):
+            OrchestrationRequest(prompt="x", mode=bad)
+    # A quorum or consensus larger than the requested providers can never be met
+    for mode in ["quorum:4", "consensus:4"]:
+        with pytest.raises(ValueError, match="needs at least 4 providers"):
+            OrchestrationRequest(
+                prompt="x", providers=providers + providers[:1], mode=mode
+            )
+
+
+@pytest.mark.asyncio
+async def test_stream_multiplexes_provider_tokens(make_orchestrator):
+    """Tokens from several providers share one stream, tagged by provider"""
+    from src.routers.llm import format_sse
+
+    app = create_mock_app(latency={"openai": 0.0, "gemini": 0.05})
+    orchestrator = await make_orchestrator(app)
+    request = OrchestrationRequest(
+        prompt="stream me",
+        providers=[LLMProvider.OPENAI, LLMProvider.GEMINI],
+        stream=True,
+    )
+
+    events = [event async for event in orchestrator.orchestrate_stream(request)]
+
+    assert events[0]["event"] == "start"
+    assert set(events[0]["providers"]) == {"openai", "gemini"}
+    assert events[-1]["event"] == "end" and events[-1]["errors"] == []
+
+    for provider in ("openai", "gemini"):
+        tokens = [
+            e["text"]
+            for e in events
+            if e["event"] == "token" and e["provider"] == provider
+        ]
+        done = next(
+            e for e in events if e["event"] == "done" and e["provider"] == provider
+        )
+        assert "".join(tokens) == done["result"]["response"]
+        assert done["time_to_first_token"] is not None
+
+    # The faster provider's tokens arrive first
+    first_token = next(e for e in events if e["event"] == "token")
+    assert first_token["provider"] == "openai"
+    assert orchestrator.metrics.get_metric_summary("time_to_first_token")["count"] == 1
+    assert format_sse(events[-1]).startswith("event: end\ndata: {")
@@ -0,0 +1,118 @@
+"""
+Tests for provider adapters against the mock provider server
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.models import OrchestrationRequest, LLMProvider
+from src.services.providers import ProviderAdapterRegistry, ProviderError
+from src.services.providers.mock_server import create_mock_app
+
+from conftest import make_settings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("provider", list(LLMProvider))
+async def test_adapter_round_trip(provider):
+    """Each adapter speaks its provider's wire format"""
+    settings = make_settings()
+    app = create_mock_app(latency=0.0)
+    registry = ProviderAdapterRegistry(settings, transport=httpx.ASGITransport(app=app))
+
+    result = await registry.get(provider).complete(
+        OrchestrationRequest(prompt="Hello adapters", providers=[provider])
+    )
+    await registry.aclose()
+
+    assert result.provider == provider
+    assert result.response == f"Mock {provider.value} response to: Hello adapters"
+    assert result.tokens_used and result.tokens_used > 0
+    assert app.state.request_counts[provider.value] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("provider", list(LLMProvider))
+async def test_adapter_stream_round_trip(provider):
+    """Each adapter parses its provider's streaming event format"""
+    settings = make_settings()
+    app = create_mock_app(latency=0.0)
+    registry = ProviderAdapterRegistry(settings, transport=httpx.ASGITransport(app=app))
+
+    chunks = [
+        chunk
+        async for chunk in registry.get(provider).stream(
+            OrchestrationRequest(prompt="Hello streams", providers=[provider])
+        )
+    ]
+    await registry.aclose()
+
+    expected = f"Mock {provider.value} response to: Hello streams"
+    assert len([chunk for chunk in chunks if chunk.text]) == len(expected.split())
+    assert "".join(chunk.text for chunk in chunks) == expected
+    # Usage is counted once: prompt and response words
+    assert sum(chunk.tokens_used or 0 for chunk in chunks) == 2 + len(expected.split())
+
+
+@pytest.mark.asyncio
+async def test_adapter_reuses_client_and_raises_provider_error():
+    """Adapters keep one pooled client and surface HTTP failures with Retry-After"""
+    settings = make_settings(provider_read_timeouts={"openai": 2.5})
+    app = create_mock_app(latency=0.0, failure_rate={"openai": 1.0})
+    registry = ProviderAdapterRegistry(settings, transport=httpx.ASGITransport(app=app))
+    adapter = registry.get(LLMProvider.OPENAI)
+
+    assert adapter.client is adapter.client
+    assert adapter.client.timeout.read == 2.5
+
+    with pytest.raises(ProviderError) as exc_info:
+        await adapter.complete(OrchestrationRequest(prompt="fail"))
+    await registry.aclose()
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after == 1.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"<html>busy</html>", b'{"unexpected": []}'])
+async def test_adapter_wraps_malformed_responses(body):
+    """Unparseable success responses are retryable provider errors"""
+    from src.services.retry import is_retryable
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    registry = ProviderAdapterRegistry(make_settings(), transport=transport)
+
+    with pytest.raises(ProviderError, match="malformed response") as exc_info:
+        await registry.get(LLMProvider.OPENAI).complete(
+            OrchestrationRequest(prompt="parse me")
+        )
+    await registry.aclose()
+
+    assert is_retryable(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_uses_adapters(make_orchestrator):
+    """The orchestrator routes provider calls through the adapter registry"""
+    orchestrator = await make_orchestrator()
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="Hi", providers=[LLMProvider.ANTHROPIC])
+    )
+
+    assert errors == []
+    assert results[0].response.startswith("Mock anthropic response")
+
+
+def test_mock_server_imports_standalone():
+    """The module uvicorn loads in a fresh interpreter imports without cycles"""
+    completed = subprocess.run(
+        [sys.executable, "-c", "import src.services.providers.mock_server"],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+    )
+    assert completed.returncode == 0, completed.stderr
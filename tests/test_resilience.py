@@ -0,0 +1,413 @@
+"""
+Tests for admission control, rate limiting and other resilience features
+"""
+
+import asyncio
+
+import pytest
+
+from src.models import OrchestrationRequest, LLMProvider
+from src.services.admission import AdmissionRejected
+from src.services.budget import RatioBudget
+from src.services.deadline import Deadline
+from src.services.providers.base import ProviderError
+from src.services.retry import RetryPolicy, is_retryable
+from src.services.rate_limiter import RateLimitExceeded
+from src.services.providers.mock_server import create_mock_app
+
+
+@pytest.mark.asyncio
+async def test_admission_bounds_concurrency_and_rejects_overflow(make_orchestrator):
+    """Calls beyond max_load queue, and a full queue is rejected with Retry-After"""
+    app = create_mock_app(latency=0.1)
+    orchestrator = await make_orchestrator(
+        app, max_concurrent_requests=4, admission_max_queue_size=1
+    )
+    load = orchestrator.providers_load[LLMProvider.OPENAI]
+    assert load.max_load == 1
+
+    requests = [
+        OrchestrationRequest(prompt=f"prompt {i}", providers=[LLMProvider.OPENAI])
+        for i in range(3)
+    ]
+    outcomes = await asyncio.gather(
+        *(orchestrator.orchestrate(r) for r in requests), return_exceptions=True
+    )
+
+    rejected = [o for o in outcomes if isinstance(o, AdmissionRejected)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 429
+    assert int(rejected[0].retry_after_header) >= 1
+    assert load.current_load == 0 and load.queued == 0
+    assert orchestrator.metrics.get_all_metrics()["counters"]["admission_rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_times_out_with_503(make_orchestrator):
+    """Callers that cannot get a slot within the queue time get a 503"""
+    app = create_mock_app(latency=0.2)
+    orchestrator = await make_orchestrator(
+        app, max_concurrent_requests=4, admission_max_queue_time=0.05
+    )
+    requests = [
+        OrchestrationRequest(prompt=f"slow {i}", providers=[LLMProvider.GEMINI])
+        for i in range(2)
+    ]
+
+    outcomes = await asyncio.gather(
+        *(orchestrator.orchestrate(r) for r in requests), return_exceptions=True
+    )
+
+    assert [o.status_code for o in outcomes if isinstance(o, Exception)] == [503]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_provider_is_routed_around(make_orchestrator):
+    """An exhausted RPM budget makes the provider unavailable to selection"""
+    orchestrator = await make_orchestrator(provider_rpm_limits={"openai": 1})
+    request = OrchestrationRequest(prompt="limited", providers=[LLMProvider.OPENAI])
+
+    first, _ = await orchestrator.orchestrate(request)
+    assert first[0].provider == LLMProvider.OPENAI
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await orchestrator.orchestrate(
+            OrchestrationRequest(prompt="limited again", providers=[LLMProvider.OPENAI])
+        )
+    assert exc_info.value.status_code == 429
+
+    third, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="rerouted", providers=[LLMProvider.OPENAI])
+    )
+    assert third[0].provider != LLMProvider.OPENAI
+    assert "openai" in orchestrator.rate_limiter.snapshot()["throttled"]
+    assert orchestrator.dwa.provider_metrics["openai"].consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_is_corrected_from_usage():
+    """Estimated tokens are charged up front and refunded from actual usage"""
+    from src.services.rate_limiter import ProviderRateLimiter
+
+    from conftest import make_settings
+
+    limiter = ProviderRateLimiter(make_settings(provider_tpm_limits={"grok": 1000}))
+    request = OrchestrationRequest(prompt="x" * 40, max_tokens=600)
+
+    reservation = await limiter.acquire(LLMProvider.GROK, request)
+    assert reservation.estimated_tokens == 611
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(LLMProvider.GROK, request)
+
+    await limiter.reconcile(reservation, 20)
+    assert await limiter.acquire(LLMProvider.GROK, request)
+
+
+@pytest.mark.asyncio
+async def test_capped_token_charge_is_reconciled_against_the_cap():
+    """An estimate above the TPM limit only charges, and refunds, the limit"""
+    from src.services.rate_limiter import ProviderRateLimiter
+
+    from conftest import make_settings
+
+    limiter = ProviderRateLimiter(make_settings(provider_tpm_limits={"grok": 1000}))
+    huge = await limiter.acquire(
+        LLMProvider.GROK, OrchestrationRequest(prompt="x", max_tokens=5000)
+    )
+    assert huge.estimated_tokens > 5000 and huge.charged_tokens == 1000
+
+    await limiter.reconcile(huge, 900)
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(
+            LLMProvider.GROK, OrchestrationRequest(prompt="x", max_tokens=600)
+        )
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_gives_its_token_charge_back(make_orchestrator):
+    """A call cancelled mid-flight does not keep its estimate charged"""
+    app = create_mock_app(latency=1.0)
+    orchestrator = await make_orchestrator(app, provider_tpm_limits={"openai": 1000})
+    request = OrchestrationRequest(
+        prompt="abandoned", providers=[LLMProvider.OPENAI], max_tokens=900
+    )
+
+    call = asyncio.create_task(
+        orchestrator._guarded_provider_call(LLMProvider.OPENAI, request)
+    )
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert await orchestrator.rate_limiter.acquire(LLMProvider.OPENAI, request)
+
+
+@pytest.mark.asyncio
+async def test_exhausted_model_budget_only_blocks_that_model():
+    """A throttled provider model leaves the provider's other models usable"""
+    from src.services.rate_limiter import ProviderRateLimiter
+
+    from conftest import make_settings
+
+    limiter = ProviderRateLimiter(
+        make_settings(provider_rpm_limits={"openai:gpt-4": 1, "openai": 10})
+    )
+    gpt4 = OrchestrationRequest(prompt="x", model="gpt-4")
+
+    await limiter.acquire(LLMProvider.OPENAI, gpt4)
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await limiter.acquire(LLMProvider.OPENAI, gpt4)
+    assert exc_info.value.key == "openai:gpt-4"
+
+    assert not limiter.is_available(LLMProvider.OPENAI, "gpt-4")
+    assert limiter.is_available(LLMProvider.OPENAI)
+    assert await limiter.acquire(LLMProvider.OPENAI, OrchestrationRequest(prompt="y"))
+    assert list(limiter.snapshot()["throttled"]) == ["openai:gpt-4"]
+
+
+@pytest.mark.asyncio
+async def test_admission_rejection_refunds_rate_limit(make_orchestrator):
+    """A call turned away by admission gives its RPM charge back"""
+    app = create_mock_app(latency=0.1)
+    orchestrator = await make_orchestrator(
+        app,
+        max_concurrent_requests=4,
+        admission_max_queue_size=1,
+        provider_rpm_limits={"openai": 3},
+    )
+    requests = [
+        OrchestrationRequest(prompt=f"prompt {i}", providers=[LLMProvider.OPENAI])
+        for i in range(3)
+    ]
+    outcomes = await asyncio.gather(
+        *(orchestrator.orchestrate(r) for r in requests), return_exceptions=True
+    )
+    rejected = [o for o in outcomes if isinstance(o, AdmissionRejected)]
+    assert len(rejected) == 1 and not isinstance(rejected[0], RateLimitExceeded)
+
+    # Two calls were made, so one of the three requests per minute is left
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="refunded", providers=[LLMProvider.OPENAI])
+    )
+    assert results[0].provider == LLMProvider.OPENAI
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_shares_budget():
+    """Two limiters on the same Redis share one budget"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.services.rate_limiter import ProviderRateLimiter, RedisRateLimitBackend
+
+    from conftest import make_settings
+
+    server = fakeredis.FakeServer()
+    settings = make_settings(provider_rpm_limits={"openai:gpt-4": 2})
+    limiters = [
+        ProviderRateLimiter(
+            settings,
+            backend=RedisRateLimitBackend(
+                fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+            ),
+        )
+        for _ in range(2)
+    ]
+    request = OrchestrationRequest(prompt="shared", model="gpt-4")
+
+    await limiters[0].acquire(LLMProvider.OPENAI, request)
+    await limiters[1].acquire(LLMProvider.OPENAI, request)
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await limiters[0].acquire(LLMProvider.OPENAI, request)
+    assert 0 < exc_info.value.retry_after <= 30
+    # Other models of the same provider are not limited
+    assert (
+        await limiters[0].acquire(LLMProvider.OPENAI, OrchestrationRequest(prompt="x"))
+        is None
+    )
+
+
+def test_circuit_breaker_state_machine():
+    """Closed -> open on failure rate, half-open after cooldown, then close/re-open"""
+    from src.services.circuit_breaker import (
+        CircuitBreaker,
+        CircuitOpenError,
+        CircuitState,
+    )
+
+    now = [0.0]
+    breaker = CircuitBreaker(
+        LLMProvider.OPENAI,
+        failure_rate_threshold=0.5,
+        min_requests=4,
+        open_seconds=10.0,
+        clock=lambda: now[0],
+    )
+
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.acquire()
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after == 10.0
+
+    now[0] = 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.acquire()
+    assert not breaker.allows_traffic()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    now[0] = 20.0
+    breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_routes_around_failing_provider(make_orchestrator):
+    """A provider that keeps failing is skipped once its circuit opens"""
+    app = create_mock_app(latency=0.0, failure_rate={"openai": 1.0})
+    orchestrator = await make_orchestrator(app, circuit_min_requests=2)
+    request = OrchestrationRequest(prompt="trip", providers=[LLMProvider.OPENAI])
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            await orchestrator._execute_provider_request(LLMProvider.OPENAI, request)
+
+    stats = await orchestrator.get_provider_stats()
+    assert stats["openai"]["circuit"]["state"] == "open"
+    assert not orchestrator._is_provider_available(LLMProvider.OPENAI)
+
+    calls = app.state.request_counts["openai"]
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="rerouted", providers=[LLMProvider.OPENAI])
+    )
+    assert results[0].provider != LLMProvider.OPENAI
+    assert app.state.request_counts["openai"] == calls
+
+
+@pytest.mark.asyncio
+async def test_deadline_cuts_off_slow_provider(make_orchestrator):
+    """A hung provider is cut off at the request deadline and counted"""
+    from src.services.deadline import DeadlineExceeded
+
+    app = create_mock_app(latency={"anthropic": 2.0})
+    orchestrator = await make_orchestrator(app)
+    request = OrchestrationRequest(
+        prompt="hang", providers=[LLMProvider.ANTHROPIC], timeout=0.1
+    )
+
+    started = asyncio.get_running_loop().time()
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        await orchestrator.orchestrate(request)
+    assert asyncio.get_running_loop().time() - started < 1.0
+    assert exc_info.value.step == "provider_call"
+
+    counters = orchestrator.metrics.get_all_metrics()["counters"]
+    assert counters["deadline_exceeded.provider_call"] == 1
+    assert orchestrator.providers_load[LLMProvider.ANTHROPIC].current_load == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_cutoffs_trip_the_circuit(make_orchestrator):
+    """A provider that hangs past every deadline counts as failing"""
+    from src.services.deadline import DeadlineExceeded
+
+    app = create_mock_app(latency={"anthropic": 2.0})
+    orchestrator = await make_orchestrator(app, circuit_min_requests=2)
+
+    for i in range(2):
+        request = OrchestrationRequest(
+            prompt=f"hang {i}", providers=[LLMProvider.ANTHROPIC]
+        )
+        with pytest.raises(DeadlineExceeded):
+            await orchestrator._execute_provider_request(
+                LLMProvider.ANTHROPIC, request, Deadline(0.1)
+            )
+
+    breaker = orchestrator.breakers[LLMProvider.ANTHROPIC]
+    assert breaker.snapshot()["state"] == "open"
+    assert not orchestrator._is_provider_available(LLMProvider.ANTHROPIC)
+
+
+@pytest.mark.asyncio
+async def test_selection_uses_remaining_budget(make_orchestrator):
+    """A provider too slow for the remaining budget is routed around"""
+    orchestrator = await make_orchestrator()
+    for _ in range(3):
+        orchestrator.dwa.record_request_result("openai", True, 5.0)
+
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="tight", providers=[LLMProvider.OPENAI], timeout=1)
+    )
+    assert results[0].provider != LLMProvider.OPENAI
+
+    results, _ = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="loose", providers=[LLMProvider.OPENAI], timeout=30)
+    )
+    assert results[0].provider == LLMProvider.OPENAI
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_backs_off_within_budget_and_hints():
+    """Transient errors are retried with jittered backoff until the budget is spent"""
+    budget = RatioBudget(ratio=1.0)
+    policy = RetryPolicy(
+        max_attempts=5, base_delay=0.01, max_delay=0.05, budget=budget, rng=lambda: 1.0
+    )
+    assert [policy.backoff(n) for n in (1, 2, 3, 4)] == [0.01, 0.02, 0.04, 0.05]
+
+    throttled = ProviderError(LLMProvider.OPENAI, "slow down", 429, retry_after=0.03)
+    assert policy.retry_delay(throttled, 1) == 0.03
+    too_long = ProviderError(LLMProvider.OPENAI, "later", 503, retry_after=60)
+    assert policy.retry_delay(too_long, 1) is None
+    assert not is_retryable(ProviderError(LLMProvider.OPENAI, "bad request", 400))
+
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        raise ProviderError(LLMProvider.OPENAI, "overloaded", 503)
+
+    # One call deposits one token: a single retry, then the budget says no
+    with pytest.raises(ProviderError):
+        await policy.run(flaky, Deadline(5), "openai")
+    assert calls == 2
+    assert budget.snapshot()["denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_provider_is_retried_then_falls_over(make_orchestrator):
+    """A transient failure is retried; a provider that stays down fails over"""
+    app = create_mock_app(
+        latency=0.0,
+        fail_first={"openai": 1},
+        failure_rate={"gemini": 1.0},
+        retry_after={"openai": 0.0, "gemini": 1.0},
+    )
+    orchestrator = await make_orchestrator(
+        app, retry_budget_ratio=1.0, retry_base_delay=0.01
+    )
+
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="retry me", providers=[LLMProvider.OPENAI])
+    )
+    assert results[0].provider == LLMProvider.OPENAI and not errors
+    assert app.state.request_counts["openai"] == 2
+    assert orchestrator.metrics.get_all_metrics()["counters"]["retries"] == 1
+
+    # Gemini's Retry-After (1s) is too long to wait for, so it fails over
+    orchestrator.retry_policy.max_delay = 0.5
+    results, errors = await orchestrator.orchestrate(
+        OrchestrationRequest(prompt="fail over", providers=[LLMProvider.GEMINI])
+    )
+    assert app.state.request_counts["gemini"] == 1
+    assert len(results) == 1 and results[0].provider != LLMProvider.GEMINI
+    assert errors[0]["provider"] == "gemini"
+    assert errors[0]["failed_over_to"] == results[0].provider.value
+    assert orchestrator.metrics.get_all_metrics()["counters"]["failovers"] == 1
@@ -0,0 +1,98 @@
+"""
+Tests for fair scheduling of orchestrations across sessions
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.config import Settings
+from src.models import RequestPriority
+from src.services.admission import AdmissionRejected
+from src.services.deadline import Deadline, DeadlineExceeded
+from src.services.metrics import MetricsService
+from src.services.scheduler import FairScheduler
+
+
+@pytest.mark.asyncio
+async def test_sessions_take_weighted_turns_and_interactive_goes_first():
+    """A flooding session gets its share, not every slot, and batch work waits"""
+    metrics = MetricsService(Settings())
+    scheduler = FairScheduler(1, weights={"alice": 2.0}, metrics=metrics)
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("holder"):
+            await release.wait()
+
+    async def run(tenant, priority=RequestPriority.INTERACTIVE):
+        async with scheduler.slot(tenant, priority):
+            order.append(tenant)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = []
+    for tenant, priority in (
+        [("bob", RequestPriority.BATCH)]
+        + [("flood", RequestPriority.INTERACTIVE)] * 4
+        + [("alice", RequestPriority.INTERACTIVE)] * 3
+        + [("carol", RequestPriority.INTERACTIVE)]
+    ):
+        tasks.append(asyncio.create_task(run(tenant, priority)))
+        await asyncio.sleep(0)
+
+    assert scheduler.queue_depth("flood") == 4
+    # Sessions without a configured weight share the `other` series
+    assert metrics.get_metric_summary("scheduler_queue_depth.alice")["value"] == 3
+    assert metrics.get_metric_summary("scheduler_queue_depth.other")["value"] == 6
+    assert metrics.get_metric_summary("scheduler_queue_depth.flood") is None
+
+    release.set()
+    await asyncio.gather(holder, *tasks)
+
+    assert order == [
+        "flood",
+        "alice",
+        "alice",
+        "carol",
+        "flood",
+        "alice",
+        "flood",
+        "flood",
+        "bob",
+    ]
+    assert scheduler.in_flight == 0 and scheduler.queued == 0
+    assert metrics.get_metric_summary("scheduler_wait_time.alice")["count"] == 3
+    assert metrics.get_metric_summary("scheduler_wait_time.other")["count"] == 7
+
+
+@pytest.mark.asyncio
+async def test_queue_limits_and_deadlines_bound_waiting():
+    """Full session queues are rejected and waits end with the deadline"""
+    scheduler = FairScheduler(1, max_queue_per_tenant=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("holder"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(DeadlineExceeded):
+        async with scheduler.slot("alice", deadline=Deadline(0.05)):
+            pass
+    assert scheduler.queued == 0
+
+    waiting = asyncio.create_task(scheduler.slot("alice").__aenter__())
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with scheduler.slot("alice"):
+            pass
+    assert rejected.value.status_code == 429
+
+    waiting.cancel()
+    release.set()
+    await asyncio.gather(holder, waiting, return_exceptions=True)
+    assert scheduler.in_flight == 0 and scheduler.queued == 0
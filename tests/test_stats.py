@@ -0,0 +1,86 @@
+"""
+Tests for the streaming statistics behind DWA provider metrics
+"""
+
+import random
+import statistics
+
+from src.models import LLMProvider
+from src.services.DWA import DynamicWeightAlgorithm
+from src.services.stats import DecayedAverage, Ewma, P2Quantile
+
+
+def test_estimators_track_mean_variance_and_decay():
+    """EWMA follows a level shift; decayed weights halve every half-life"""
+    ewma = Ewma(0.5)
+    for value in [1.0, 1.0, 1.0]:
+        ewma.update(value)
+    assert ewma.mean == 1.0 and ewma.variance == 0.0
+    ewma.update(3.0)
+    assert ewma.mean == 2.0
+    assert ewma.variance == 1.0  # 0.5 * (0 + 2 * 1)
+
+    decayed = DecayedAverage(half_life=10.0, clock=lambda: 0.0)
+    decayed.update(1.0, now=0.0)
+    decayed.update(0.0, now=10.0)
+    # The first sample is worth half of the second after one half-life
+    assert abs(decayed.value - 1 / 3) < 1e-9
+    assert abs(decayed.weight(now=20.0) - 0.75) < 1e-9
+
+
+def test_p2_quantiles_match_exact_quantiles():
+    """P² estimates stay close to exact quantiles of a skewed distribution"""
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(0, 0.5) for _ in range(20000)]
+    exact = statistics.quantiles(samples, n=100)
+
+    for q, expected in [(0.5, exact[49]), (0.95, exact[94])]:
+        sketch = P2Quantile(q)
+        for value in samples:
+            sketch.update(value)
+        assert abs(sketch.value - expected) / expected < 0.02
+
+    small = P2Quantile(0.5)
+    for value in [5.0, 1.0, 3.0]:
+        small.update(value)
+    assert small.value == 3.0
+
+
+def test_provider_metrics_expose_latency_quantiles():
+    """DWA keeps fixed-size history and reads p50/p95 from the sketches"""
+    dwa = DynamicWeightAlgorithm(
+        providers=[LLMProvider.OPENAI], latency_quantiles=[0.9]
+    )
+    for i in range(1, 101):
+        dwa.record_request_result("openai", True, i / 100)
+
+    metrics = dwa.provider_metrics["openai"]
+    assert len(metrics.speed_history) == 10
+    assert metrics.speed == metrics.latency.mean
+    assert 0.45 < metrics.latency.p50 < 0.55
+    assert 0.85 < metrics.latency.quantile(0.9) < 0.95
+    assert dwa.get_provider_stats()["openai"]["latency_p95"] > 0.9
+
+    dwa.reset_provider_metrics("openai")
+    assert metrics.latency.count == 0 and not metrics.speed_history
+
+
+def test_provider_availability_decays_by_age():
+    """Availability weighs outcomes by age, so old successes fade out"""
+    dwa = DynamicWeightAlgorithm(providers=[LLMProvider.OPENAI])
+    metrics = dwa.provider_metrics["openai"]
+    clock = [0.0]
+    metrics.stats["availability"] = DecayedAverage(60.0, clock=lambda: clock[0])
+
+    for _ in range(50):
+        dwa.record_request_result("openai", True, 0.1)
+    clock[0] = 300.0  # five half-lives later
+    for _ in range(3):
+        dwa.record_request_result("openai", False, 0.1)
+
+    # 50 successes now weigh about 1.6 samples against 3 fresh failures
+    assert metrics.availability < 0.4
+    assert metrics.stats["availability"].count == 53
+
+    dwa.reset_provider_metrics("openai")
+    assert metrics.stats["availability"].count == 0